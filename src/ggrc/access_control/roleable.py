@@ -17,6 +17,8 @@ from ggrc import db
 from ggrc.access_control.list import AccessControlList
 from ggrc.access_control import role
 from ggrc.fulltext.attributes import CustomRoleAttr
+from ggrc.fulltext.mixin import Indexed
+from ggrc.fulltext.mixin import ReindexRule
 from ggrc.models import reflection
 from ggrc.utils import errors
 from ggrc.utils import referenced_objects
@@ -28,6 +30,16 @@ logger = logging.getLogger(__name__)
 AclRecord = namedtuple("AclRecord", "person, acl_item")
 
 
+def _get_acl_objects(acp):
+  """Get objects which base ACL people were changed."""
+  acl = acp.ac_list
+  if acl is None or acl.parent_id is not None:
+    # Propagated ACL entries are not indexed
+    return []
+  obj = acl.object
+  return [obj] if isinstance(obj, Indexed) else []
+
+
 class Roleable(object):
   """Roleable Mixin
 
@@ -41,6 +53,10 @@ class Roleable(object):
 
   _update_raw = ['access_control_list', ]
   _fulltext_attrs = [CustomRoleAttr('access_control_list'), ]
+  AUTO_REINDEX_RULES = [
+      ReindexRule("AccessControlPerson", _get_acl_objects,
+                  attrs=["access_control_list"]),
+  ]
   _api_attrs = reflection.ApiAttributes(
       reflection.Attribute('access_control_list', True, True, True))
   MAX_ASSIGNEE_NUM = 1
@@ -161,9 +161,13 @@ def init_extra_listeners():
   from ggrc.automapper import register_automapping_listeners
   from ggrc.snapshotter.listeners import register_snapshot_listeners
   from ggrc.fulltext import listeners
+  from ggrc.fulltext import shadow
+  from ggrc.query import result_cache
   register_automapping_listeners()
   register_snapshot_listeners()
   listeners.register_fulltext_listeners()
+  shadow.register_listeners()
+  result_cache.register_listeners()
 
 
 def _enable_debug_toolbar():
@@ -277,6 +281,7 @@ def _display_request_time():
 
 def register_indexing():
   """Register indexing after request hook"""
+  from ggrc.fulltext import queue
   from ggrc.models import background_task
   from ggrc.views import bg_update_ft_records
 
@@ -287,14 +292,27 @@ def register_indexing():
     Adds header 'X-GGRC-Indexing-Task-Id' with BG task id
     """
     if hasattr(db.session, "reindex_set"):
+      if db.session.reindex_set.queued_count:
+        db.session.reindex_set.queued_count = 0
+        bg_task = queue.schedule_worker()
+        if bg_task:
+          db.session.expunge_all()
+          db.session.add(bg_task)
+        # Releases the workers lock even if no worker was created
+        db.session.plain_commit()
+        if bg_task:
+          response.headers.add("X-GGRC-Indexing-Task-Id", bg_task.id)
+        return response
       model_ids = db.session.reindex_set.model_ids_to_reindex
       if model_ids:
         with benchmark("Create indexing bg task"):
           chunk_size = db.session.reindex_set.CHUNK_SIZE
+          model_attrs = db.session.reindex_set.model_attrs_to_reindex
           bg_task = background_task.create_task(
               name="indexing",
               url=url_for(bg_update_ft_records.__name__),
               parameters={"models_ids": model_ids,
+                          "models_attrs": model_attrs,
                           "chunk_size": chunk_size},
               queued_callback=bg_update_ft_records
           )
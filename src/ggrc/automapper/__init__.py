@@ -21,6 +21,7 @@ from ggrc.models.issue import Issue
 from ggrc.models import exceptions
 from ggrc.rbac import permissions
 from ggrc.models.cache import Cache
+from ggrc.query import result_cache
 from ggrc.utils import benchmark
 
 
@@ -153,6 +154,7 @@ class AutomapperGenerator(object):
           "is_external": False}
           for src, dst in self.auto_mappings
           if (src, dst) != original]))  # (src, dst) is sorted
+      result_cache.mark_changed(["Relationship"])
 
       self._set_audit_id_for_issues(automapping_id)
 
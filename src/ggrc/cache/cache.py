@@ -7,6 +7,7 @@ from collections import namedtuple
 
 CacheEntry = namedtuple('CacheEntry', 'model_plural class_name cache_type')
 MappingEntry = namedtuple('MappingEntry', 'class_name attr polymorph')
+CacheLookup = namedtuple('CacheLookup', 'hits misses')
 
 
 def resource(model_plural, class_name, cache_type='memcache'):
@@ -149,6 +150,9 @@ class Cache(object):
   def get(self, *_):
     return None
 
+  def lookup(self, *_):
+    return None
+
   def add(self, *_):
     return None
 
@@ -70,6 +70,22 @@ class CacheManager:
     ret = self.cache_object.get(category, resource, filter)
     return ret
 
+  def lookup_collection(self, category, resource, filter):
+    """Get collection entries from cache with per id hit/miss reporting.
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      filter: dictionary containing ids and optional attrs
+
+    Returns:
+      CacheLookup tuple of found entries and missing ids
+    """
+    if not self.is_caching_supported(category, resource, filter,
+                                     'lookup_collection'):
+      return None
+    return self.cache_object.lookup(category, resource, filter)
+
   def add_collection(self, category, resource, data, expiration_time=0):
     """Add collection in cache.
 
@@ -23,11 +23,11 @@ def has_memcache():
 class MemCache(cache.Cache):
   """MemCache class."""
 
-  def __init__(self):
+  def __init__(self, memcache_client=None):
     super(MemCache, self).__init__()
     self.name = 'memcache'
     self.client = None
-    self.memcache_client = memcache.Client()
+    self.memcache_client = memcache_client or memcache.Client()
     self.supported_resources.update({
         cache_entry.model_plural: cache_entry.class_name
         for cache_entry in cache.all_cache_entries()
@@ -36,8 +36,17 @@ class MemCache(cache.Cache):
   def get_name(self):
     return self.name
 
-  def get(self, category, resource, filter):
-    """ get items from mem cache for specified filter
+  def _item_keys(self, category, resource, ids):
+    """Return ordered mapping of memcache keys to resource ids."""
+    cache_key = self.get_key(category, resource)
+    if cache_key is None:
+      return None
+    return OrderedDict(
+        (cache_key + ":" + str(id_), id_) for id_ in ids
+    )
+
+  def lookup(self, category, resource, filter):
+    """ lookup items in mem cache for specified filter in one round trip
 
     Args:
       category: collection or stub
@@ -45,47 +54,63 @@ class MemCache(cache.Cache):
       filter: dictionary containing ids and optional attrs
 
     Returns:
-      All or None policy is applied by default
       None on any errors
-      otherwise returns JSON string representation
+      otherwise returns CacheLookup tuple with ordered mapping of found ids
+      to their values and list of ids missing in cache
     """
-
+    # pylint: disable=redefined-builtin
     if not self.is_caching_supported(category, resource):
       return None
-    # TODO(dan): use memcache.Client.get_multi() instead of gets()
-    #
-    data = OrderedDict()
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
-      return None
     ids, attrs = self.parse_filter(filter)
-    if ids is None and attrs is None:
+    if ids is None:
+      return None
+    item_keys = self._item_keys(category, resource, ids)
+    if item_keys is None:
       return None
-    else:
-      if ids is None:
-        return None
-    for id_ in ids:
-      attrvalues = self.memcache_client.gets(cache_key + ":" + str(id_))
-      if attrvalues is not None:
-        if attrs is None:
-          data[id_] = attrvalues
-        else:
-          attr_dict = OrderedDict()
-          for attr in attrs:
-            if attr in attrvalues:
-              attr_dict[attr] = deepcopy(attrvalues.get(attr))
-          data[id_] = attr_dict
+    values = self.memcache_client.get_multi(item_keys.keys())
+    # Network failures and missing ids are both reported by get_multi as
+    # absent keys, in both cases the ids have to be loaded from the database.
+    hits = OrderedDict()
+    misses = []
+    for key, id_ in item_keys.iteritems():
+      attrvalues = values.get(key)
+      if attrvalues is None:
+        misses.append(id_)
+      elif attrs is None:
+        hits[id_] = attrvalues
       else:
-        # All or None policy is enforced, if one of the objects
-        # is not available in cache, then we return empty
-        # TODO(dan): cannot distinguish network failures vs
-        # id not found in memcache, both scenarios return empty list
-        return None
-    return data
+        hits[id_] = OrderedDict(
+            (attr, deepcopy(attrvalues.get(attr)))
+            for attr in attrs if attr in attrvalues
+        )
+    return cache.CacheLookup(hits, misses)
+
+  def get(self, category, resource, filter):
+    """ get items from mem cache for specified filter
+
+    Args:
+      category: collection or stub
+      resource: regulation, controls, etc.
+      filter: dictionary containing ids and optional attrs
+
+    Returns:
+      All or None policy is applied by default
+      None on any errors
+      otherwise returns JSON string representation
+    """
+    # pylint: disable=redefined-builtin
+    result = self.lookup(category, resource, filter)
+    if result is None or result.misses:
+      return None
+    return result.hits
 
   def add(self, category, resource, data, expiration_time=0):
     """ add data to mem cache
 
+    New entries are added with a single add_multi call, entries already
+    present in cache (import scenarios) are replaced with get_multi and
+    cas_multi calls.
+
     Args:
       category: collection or stub
       resource: regulation, controls, etc.
@@ -93,41 +118,42 @@ class MemCache(cache.Cache):
 
     Returns:
       None on any errors
-      Mapping of DTO formatted string, e.g. JSON string representation
+      Mapping of stored ids to DTO formatted string, e.g. JSON string
+      representation
     """
     if not self.is_caching_supported(category, resource):
       return None
-    entries = {}
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
+    item_keys = self._item_keys(category, resource, data.keys())
+    if item_keys is None:
       return None
-    # TODO(dan): use memcache.Client.add_multi() instead of add()
-    for key in data.keys():
-      cache_key = cache_key + ":" + str(key)
-      cache_data = self.memcache_client.gets(cache_key)
-      if cache_data is None:
-        if self.memcache_client.add(cache_key,
-                                    data.get(key),
-                                    expiration_time) is False:
-          # We stop processing any further
-          # TODO(ggrcdev): Should we throw exceptions
-          # and/or log critical events
-          return None
-        else:
-          entries[key] = data
-      else:
-        # This could occur on import scenarios
-        #
-        if self.memcache_client.cas(cache_key,
-                                    data.get(key),
-                                    expiration_time) is False:
-          # We stop processing any further
-          # TODO(ggrcdev): Should we throw exceptions
-          # and/or log critical events
-          return None
-        else:
-          entries[key] = data
-    return entries
+    if not item_keys:
+      return {}
+    mapping = {key: data.get(id_) for key, id_ in item_keys.iteritems()}
+    not_added = self.memcache_client.add_multi(mapping, expiration_time)
+    if not_added:
+      # This could occur on import scenarios
+      not_added = self._cas_multi(
+          {key: mapping[key] for key in not_added}, expiration_time)
+    if not_added:
+      logger.warning("CACHE: Unable to add %s entries", len(not_added))
+    if len(not_added) == len(mapping):
+      return None
+    not_added = set(not_added)
+    return {id_: data.get(id_) for key, id_ in item_keys.iteritems()
+            if key not in not_added}
+
+  def _cas_multi(self, mapping, expiration_time):
+    """Compare and set entries present in cache.
+
+    Returns:
+      list of keys that were not set.
+    """
+    present = self.memcache_client.get_multi(mapping.keys(), for_cas=True)
+    missing = [key for key in mapping if key not in present]
+    if present:
+      missing.extend(self.memcache_client.cas_multi(
+          {key: mapping[key] for key in present}, expiration_time))
+    return missing
 
   def update(self, category, resource, data, expiration_time):
     """ Update items from mem cache for specified data
@@ -139,28 +165,22 @@ class MemCache(cache.Cache):
 
     Returns:
       None on any errors
-      Mapping of DTO formatted string, e.g. JSON string representation
+      Mapping of updated ids to DTO formatted string, e.g. JSON string
+      representation. Ids missing in cache are not updated.
     """
     if not self.is_caching_supported(category, resource):
       return None
-    entries = {}
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
+    item_keys = self._item_keys(category, resource, data.keys())
+    if item_keys is None:
       return None
-    # TODO(ggrcdev): use memcache.Client.cas_multi(),
-    # get_multi() instead of cas(), gets()
-    #
-    for key in data.keys():
-      id_ = cache_key + ":" + str(key)
-      if self.memcache_client.cas(id_,
-                                  data.get(key),
-                                  expiration_time) is False:
-        # RPC Error or value is not id is not found in cache.
-        # Cannot proceed further with update (All or None) policy
-        return None
-      else:
-        entries[key] = data
-    return entries
+    not_updated = set(self._cas_multi(
+        {key: data.get(id_) for key, id_ in item_keys.iteritems()},
+        expiration_time,
+    ))
+    if item_keys and len(not_updated) == len(item_keys):
+      return None
+    return {id_: data.get(id_) for key, id_ in item_keys.iteritems()
+            if key not in not_updated}
 
   def remove(self, category, resource, data, lockadd_seconds=0):
     """ delete items from mem cache for specified data
@@ -176,34 +196,14 @@ class MemCache(cache.Cache):
     """
     if not self.is_caching_supported(category, resource):
       return None
-    entries = {}
-    cache_key = self.get_key(category, resource)
-    if cache_key is None:
+    item_keys = self._item_keys(category, resource, data.keys())
+    if item_keys is None:
       return None
-    # TODO(dan): use memcache.Client.delete_multi(),
-    # get_multi() instead of delete(), gets()
-    #
-    for key in data.keys():
-      id_ = cache_key + ":" + str(key)
-      retvalue = self.memcache_client.delete(id_, lockadd_seconds)
-      # Log the event of delete failures
-      if retvalue == 0:
-        # retvalue of 0 indicates Network failure,
-        # Cannot proceed further with delete (All or None) policy
-        return None
-      elif retvalue == 2:
-        # retvalue of 2 indicates Success
-        entries[key] = data
-      elif retvalue == 1:
-        # retvalue of 1 indicates id_ is not present in memcache
-        # (could be expired), proceed with next entry
-        continue
-      else:
-        # Any other return value,
-        # Cannot proceed further with delete (All or None) policy
-        #
-        return None
-    return entries
+    if not self.memcache_client.delete_multi(item_keys.keys(),
+                                             lockadd_seconds):
+      # Network failure, cannot tell which entries were deleted
+      return None
+    return {id_: data.get(id_) for id_ in item_keys.itervalues()}
 
   def add_multi(self, data, expiration_time=0):
     """ Add multiple entries to memcache
@@ -0,0 +1,209 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""In-process stand-in for the AppEngine memcache client.
+
+LocalMemcacheClient implements the subset of ``memcache.Client`` interface
+used by GGRC (single and ``*_multi`` get/set/add/cas/delete/incr operations) on
+top of a plain dictionary. It is meant for deployments without AppEngine
+memcache service and for measuring cache usage: every call that would be a
+memcache RPC increments ``rpc_count``.
+"""
+
+import copy
+import threading
+import time
+
+
+# Return values of AppEngine memcache.Client.delete()
+DELETE_NETWORK_FAILURE = 0
+DELETE_ITEM_MISSING = 1
+DELETE_SUCCESSFUL = 2
+
+# Relative expiration times bigger than this value are treated as absolute
+# unix timestamps, the same way AppEngine memcache does.
+MAX_RELATIVE_EXPIRATION = 86400 * 30
+
+
+class LocalMemcacheClient(object):
+  """Dictionary based memcache client with round trip accounting.
+
+  Attributes:
+    rpc_count: number of emulated memcache round trips.
+  """
+  # pylint: disable=too-many-arguments,unused-argument
+  # Arguments are kept for compatibility with memcache.Client signatures.
+
+  def __init__(self):
+    self._lock = threading.RLock()
+    self._storage = {}
+    self._cas_seen = {}
+    self._version = 0
+    self.rpc_count = 0
+
+  def reset_stats(self):
+    """Reset round trip counter."""
+    self.rpc_count = 0
+
+  @staticmethod
+  def _full_key(key, key_prefix="", namespace=None):
+    return (namespace or "", "{}{}".format(key_prefix, key))
+
+  @staticmethod
+  def _expires_at(exp_time):
+    if not exp_time:
+      return None
+    if exp_time > MAX_RELATIVE_EXPIRATION:
+      return exp_time
+    return time.time() + exp_time
+
+  def _lookup(self, full_key):
+    """Return stored (value, version) pair or None if missing/expired."""
+    item = self._storage.get(full_key)
+    if item is None:
+      return None
+    value, version, expires_at = item
+    if expires_at is not None and expires_at <= time.time():
+      del self._storage[full_key]
+      return None
+    return value, version
+
+  def _store(self, full_key, value, exp_time):
+    self._version += 1
+    self._storage[full_key] = (
+        copy.deepcopy(value), self._version, self._expires_at(exp_time),
+    )
+
+  def get_multi(self, keys, key_prefix="", namespace=None, for_cas=False):
+    """Get values for several keys in one round trip.
+
+    Returns:
+      dict of found keys (without key_prefix) and their values.
+    """
+    with self._lock:
+      self.rpc_count += 1
+      result = {}
+      for key in keys:
+        full_key = self._full_key(key, key_prefix, namespace)
+        item = self._lookup(full_key)
+        if item is None:
+          continue
+        value, version = item
+        if for_cas:
+          self._cas_seen[full_key] = version
+        result[key] = copy.deepcopy(value)
+      return result
+
+  def get(self, key, namespace=None, for_cas=False):
+    return self.get_multi([key], namespace=namespace, for_cas=for_cas).get(key)
+
+  def gets(self, key, namespace=None):
+    return self.get(key, namespace=namespace, for_cas=True)
+
+  def _set_multi(self, mapping, time_, key_prefix, namespace, policy):
+    """Store values according to policy, return list of not stored keys."""
+    with self._lock:
+      self.rpc_count += 1
+      not_set = []
+      for key, value in mapping.iteritems():
+        full_key = self._full_key(key, key_prefix, namespace)
+        item = self._lookup(full_key)
+        if policy == "add" and item is not None:
+          not_set.append(key)
+          continue
+        if policy == "cas":
+          seen = self._cas_seen.pop(full_key, None)
+          if item is None or seen != item[1]:
+            not_set.append(key)
+            continue
+        self._store(full_key, value, time_)
+      return not_set
+
+  def set_multi(self, mapping, time=0, key_prefix="", min_compress_len=0,
+                namespace=None):
+    # pylint: disable=redefined-outer-name
+    return self._set_multi(mapping, time, key_prefix, namespace, "set")
+
+  def add_multi(self, mapping, time=0, key_prefix="", min_compress_len=0,
+                namespace=None):
+    # pylint: disable=redefined-outer-name
+    return self._set_multi(mapping, time, key_prefix, namespace, "add")
+
+  def cas_multi(self, mapping, time=0, key_prefix="", min_compress_len=0,
+                namespace=None):
+    # pylint: disable=redefined-outer-name
+    return self._set_multi(mapping, time, key_prefix, namespace, "cas")
+
+  def set(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name
+    return not self.set_multi({key: value}, time, namespace=namespace)
+
+  def add(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name
+    return not self.add_multi({key: value}, time, namespace=namespace)
+
+  def cas(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name
+    return not self.cas_multi({key: value}, time, namespace=namespace)
+
+  def offset_multi(self, mapping, key_prefix="", namespace=None,
+                   initial_value=None):
+    """Increment integer values of several keys in one round trip.
+
+    Returns:
+      dict of keys and their new values, None for keys that are missing and
+      have no initial_value.
+    """
+    with self._lock:
+      self.rpc_count += 1
+      result = {}
+      for key, delta in mapping.iteritems():
+        full_key = self._full_key(key, key_prefix, namespace)
+        item = self._lookup(full_key)
+        if item is None and initial_value is None:
+          result[key] = None
+          continue
+        value = (item[0] if item is not None else initial_value) + delta
+        self._store(full_key, value, 0)
+        result[key] = value
+      return result
+
+  def incr(self, key, delta=1, namespace=None, initial_value=None):
+    return self.offset_multi({key: delta}, namespace=namespace,
+                             initial_value=initial_value)[key]
+
+  def delete_multi_statuses(self, keys, seconds=0, key_prefix="",
+                            namespace=None):
+    """Delete several keys and return per key DELETE_* statuses."""
+    with self._lock:
+      self.rpc_count += 1
+      statuses = []
+      for key in keys:
+        full_key = self._full_key(key, key_prefix, namespace)
+        if self._lookup(full_key) is None:
+          statuses.append(DELETE_ITEM_MISSING)
+        else:
+          del self._storage[full_key]
+          statuses.append(DELETE_SUCCESSFUL)
+      return statuses
+
+  def delete_multi(self, keys, seconds=0, key_prefix="", namespace=None):
+    self.delete_multi_statuses(keys, seconds, key_prefix, namespace)
+    return True
+
+  def delete(self, key, seconds=0, namespace=None):
+    return self.delete_multi_statuses([key], seconds, namespace=namespace)[0]
+
+  def flush_all(self):
+    with self._lock:
+      self.rpc_count += 1
+      self._storage.clear()
+      self._cas_seen.clear()
+      return True
+
+  def get_stats(self):
+    with self._lock:
+      return {
+          "items": len(self._storage),
+          "rpc_count": self.rpc_count,
+      }
@@ -4,12 +4,13 @@
 """Common operations on cache managers."""
 
 import logging
+import time
 
 import flask
 
 from ggrc import cache
 import ggrc.models
-from ggrc.utils.memcache import blob_get_chunk_keys
+from ggrc.utils import metrics
 from ggrc.cache.memcache import has_memcache
 
 
@@ -211,21 +212,56 @@ def build_cache_status(data, key, expiry_timeout, status):
   data[key] = {'expiry': expiry_timeout, 'status': status}
 
 
+# Cached permissions of a user are stored under a key with the global
+# generation and the generation of the user. Invalidation bumps generations
+# instead of deleting the cached values, which expire on their own.
+PERMISSIONS_GENERATION_KEY = "permissions:generation"
+USER_PERMISSIONS_GENERATION_KEY = "permissions:generation:{}"
+PERMISSIONS_KEY = "permissions:{user_id}:{generation}:{user_generation}"
+
+PERMISSIONS_CACHE_METRIC = "permissions_cache"
+
+
+def initial_generation():
+  """Get initial value for generation counters.
+
+  Evicted counters are recreated with a value never used before, so values
+  cached with the evicted generation can not be served again.
+  """
+  return int(time.time() * 1000)
+
+
+def get_permissions_cache_key(client, user_id):
+  """Get key of cached permissions of the user for current generations.
+
+  The key must be taken before permissions are loaded from the DB, so that
+  permissions invalidated during the loading are stored under an outdated
+  key.
+  """
+  user_generation_key = USER_PERMISSIONS_GENERATION_KEY.format(user_id)
+  generation_keys = [PERMISSIONS_GENERATION_KEY, user_generation_key]
+  generations = client.get_multi(generation_keys)
+  missing = {key: initial_generation() for key in generation_keys
+             if key not in generations}
+  if missing:
+    client.add_multi(missing)
+    generations = client.get_multi(generation_keys)
+  return PERMISSIONS_KEY.format(
+      user_id=user_id,
+      generation=generations.get(PERMISSIONS_GENERATION_KEY),
+      user_generation=generations.get(user_generation_key),
+  )
+
+
 def clear_permission_cache():
   """Drop cached permissions for all users."""
   if not has_memcache():
     return
 
   client = get_cache_manager().cache_object.memcache_client
-
-  # We delete all the cached user permissions as well as
-  # the permissions:list value itself
-  keys_to_delete = ['permissions:list']
-  for user_key in client.get('permissions:list') or set():
-    keys_to_delete.append(user_key)
-    keys_to_delete.extend(blob_get_chunk_keys(client, user_key))
-
-  client.delete_multi(keys_to_delete)
+  client.incr(PERMISSIONS_GENERATION_KEY,
+              initial_value=initial_generation())
+  metrics.incr(PERMISSIONS_CACHE_METRIC, "global_invalidations")
 
 
 def clear_users_permission_cache(user_ids):
@@ -234,18 +270,20 @@ def clear_users_permission_cache(user_ids):
     return
 
   client = get_cache_manager().cache_object.memcache_client
+  client.offset_multi(
+      {USER_PERMISSIONS_GENERATION_KEY.format(user_id): 1
+       for user_id in user_ids},
+      initial_value=initial_generation(),
+  )
+  metrics.incr(PERMISSIONS_CACHE_METRIC, "user_invalidations", len(user_ids))
 
-  keys_to_delete = list()
-  cached_keys_set = client.get('permissions:list') or set()
-  for user_id in user_ids:
-    key = 'permissions:{}'.format(user_id)
-    if key in cached_keys_set:
-      cached_keys_set.remove(key)
-      keys_to_delete.append(key)
-      keys_to_delete.extend(blob_get_chunk_keys(client, key))
 
-  client.set('permissions:list', cached_keys_set)
-  client.delete_multi(keys_to_delete)
+def get_permissions_cache_stats():
+  """Get permissions cache counters with hit ratio."""
+  stats = metrics.get(PERMISSIONS_CACHE_METRIC)
+  hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+  stats["hit_ratio"] = metrics.ratio(hits, hits + misses)
+  return stats
 
 
 def clear_memcache():
@@ -257,6 +295,34 @@ def clear_memcache():
   get_cache_manager().clean()
 
 
+COLLECTION_CACHE_METRIC = "collection_cache"
+
+
+def record_collection_cache_lookup(model_name, hits, misses):
+  """Count collection cache hits and misses for model."""
+  metrics.incr(COLLECTION_CACHE_METRIC, model_name + ".hits", hits)
+  metrics.incr(COLLECTION_CACHE_METRIC, model_name + ".misses", misses)
+
+
+def get_collection_cache_stats():
+  """Get collection cache hits, misses and hit ratio per model."""
+  stats = {}
+  for key, value in metrics.get(COLLECTION_CACHE_METRIC).iteritems():
+    model_name, counter = key.rsplit(".", 1)
+    stats.setdefault(model_name, {"hits": 0, "misses": 0})[counter] = value
+  for model_stats in stats.itervalues():
+    model_stats["hit_ratio"] = metrics.ratio(
+        model_stats["hits"], model_stats["hits"] + model_stats["misses"])
+  return stats
+
+
+def get_cache_op(cache_objs, database_objs):
+  """Get value of X-GGRC-Cache header for collection response."""
+  if cache_objs and database_objs:
+    return 'Partial'
+  return 'Hit' if cache_objs else 'Miss'
+
+
 def get_ie_cache_key(ie_job):
   """Create key for export status entry"""
   return "ImportExport:{}".format(ie_job.id)
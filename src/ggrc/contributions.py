@@ -3,6 +3,7 @@
 
 """Lists of ggrc contributions."""
 
+from ggrc.fulltext import queue as fulltext_queue
 from ggrc.integrations import synchronization_jobs
 from ggrc.models import import_export
 from ggrc.notifications import common
@@ -35,6 +36,10 @@ IMPORT_EXPORT_JOBS = [
     import_export_notifications.check_import_export_jobs,
 ]
 
+FULLTEXT_INDEXING_JOBS = [
+    fulltext_queue.schedule_worker_job,
+]
+
 
 def contributed_notifications():
   """Get handler functions for ggrc notification file types."""
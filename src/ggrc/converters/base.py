@@ -16,9 +16,12 @@ from ggrc import settings
 from ggrc.cache import utils as cache_utils
 from ggrc.cache.utils import clear_memcache
 from ggrc.converters import base_block
+from ggrc.converters import export_parts
 from ggrc.converters import get_exportables
 from ggrc.converters import import_helper
+from ggrc.converters import import_plan
 from ggrc.converters import snapshot_block
+from ggrc.converters import status_watcher
 from ggrc.fulltext import get_indexer
 from ggrc.models import exceptions
 from ggrc.models import all_models
@@ -39,6 +42,8 @@ class BaseConverter(object):
     self.cache_manager = cache_utils.get_cache_manager()
     self.ie_job = ie_job
     self.exportable = get_exportables()
+    self.status_watcher = status_watcher.JobStatusWatcher(
+        ie_job.id if ie_job else None, self.get_job_status)
 
   def get_info(self):
     raise NotImplementedError()
@@ -99,10 +104,11 @@ class ImportConverter(BaseConverter):
       "status",
   ]
 
-  def __init__(self, ie_job, dry_run=True, csv_data=None):
+  def __init__(self, ie_job, dry_run=True, csv_data=None, plan=None):
     self.user = getattr(g, '_current_user', None)
     self.dry_run = dry_run
     self.csv_data = csv_data or []
+    self.plan = plan or import_plan.ImportPlan()
     self.indexer = get_indexer()
     self.comment_created_notif_type = all_models.NotificationType.query. \
         filter_by(name="comment_created").one().id
@@ -111,6 +117,14 @@ class ImportConverter(BaseConverter):
   def get_info(self):
     return self.response_data
 
+  def find_object(self, model, key, value):
+    """Find object by key value reusing lookups of the analysis phase."""
+    obj = self.plan.get(model.__name__, key, value)
+    if obj is None:
+      obj = model.query.filter_by(**{key: value}).first()
+      self.plan.add(model.__name__, key, value, obj)
+    return obj
+
   def initialize_block_converters(self):
     """Initialize block converters."""
     offsets_and_data_blocks = import_helper.split_blocks(self.csv_data)
@@ -230,24 +244,39 @@ class ExportConverter(BaseConverter):
         )
         self.block_converters.append(block_converter)
 
-  def export_csv_data(self):
-    """Export csv data."""
+  def export_csv_data(self, output_buffer=None):
+    """Export csv data.
+
+    Args:
+      output_buffer: file-like object csv lines are written to as soon as
+          they are generated. If it isn't set, csv data is returned as string.
+    """
     with benchmark("Initialize block converters."):
       self.initialize_block_converters()
     with benchmark("Build csv data."):
       try:
-        return self.build_csv_from_row_data()
+        return self.build_csv_from_row_data(output_buffer)
       except ValueError:
         return ""
 
-  def build_csv_from_row_data(self):
-    """Export each block separated by empty lines."""
+  def build_csv_from_row_data(self, output_buffer=None):
+    """Export each block separated by empty lines.
+
+    Rows of background exports are rendered in worker processes if it is
+    enabled by EXPORT_MAX_WORKERS setting, see ggrc.converters.export_parts.
+    """
     table_width = max([converter.block_width
                        for converter in self.block_converters])
     table_width += 1  # One line for 'Object line' column
 
-    csv_string_builder = import_helper.CsvStringBuilder(table_width)
-    for block_converter in self.block_converters:
+    csv_string_builder = import_helper.CsvStringBuilder(table_width,
+                                                        output_buffer)
+    block_parts = None
+    if export_parts.is_enabled(self):
+      block_parts = export_parts.render_parts(
+          self, table_width, login.get_current_user().id)
+
+    for index, block_converter in enumerate(self.block_converters):
       with benchmark("Generate export file header"):
         csv_header = block_converter.generate_csv_header()
         csv_header[0].insert(0, "Object type")
@@ -256,19 +285,29 @@ class ExportConverter(BaseConverter):
         csv_string_builder.append_line(csv_header[0])
         csv_string_builder.append_line(csv_header[1])
 
-      for line in block_converter.generate_row_data():
-        ie_status = self.get_job_status()
-        if ie_status and ie_status == \
-           all_models.ImportExport.STOPPED_STATUS:
-          raise exceptions.ExportStoppedException()
-        line.insert(0, "")
-        csv_string_builder.append_line(line)
+      if block_parts is None:
+        self.append_block_rows(csv_string_builder, block_converter)
+      else:
+        with benchmark("Write export parts rendered in worker processes"):
+          # Parts are written as soon as they are rendered
+          for csv_string in block_parts[index]:
+            csv_string_builder.append_csv(csv_string)
 
       csv_string_builder.append_line([])
       csv_string_builder.append_line([])
 
+    if output_buffer is not None:
+      return None
     return csv_string_builder.get_csv_string()
 
+  def append_block_rows(self, csv_string_builder, block_converter):
+    """Append csv lines of all rows of the block."""
+    for line in block_converter.generate_row_data():
+      if self.status_watcher.is_stopped():
+        raise exceptions.ExportStoppedException()
+      line.insert(0, "")
+      csv_string_builder.append_line(line)
+
   def _get_exportable_queries(self):
     """Get a list of filtered object queries regarding exportable items.
 
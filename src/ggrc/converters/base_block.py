@@ -16,9 +16,9 @@ from flask import _app_ctx_stack
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
 from ggrc import utils
 from ggrc.models import exceptions
-from ggrc.models import all_models
 from ggrc.models import reflection
 from ggrc.models import mixins
 from ggrc.rbac import permissions
@@ -28,6 +28,8 @@ from ggrc.utils import list_chunks
 from ggrc.converters import errors
 from ggrc.converters import get_shared_unique_rules
 from ggrc.converters import base_row
+from ggrc.converters import export_prefetch
+from ggrc.converters import import_batch
 from ggrc.converters import import_helper
 from ggrc.models.mixins import issue_tracker as issue_tracker_mixins
 from ggrc.services import signals
@@ -386,6 +388,10 @@ class ImportBlockConverter(BlockConverter):
     self.unique_values = self.get_unique_values_dict(self.object_class)
     self.revision_ids = []
     self._import_info = self._make_empty_info()
+    self.batch = None
+    batch_size = getattr(settings, "IMPORT_BATCH_SIZE", 1)
+    if batch_size > 1 and not converter.dry_run:
+      self.batch = import_batch.ImportBatch(self, batch_size)
 
   def check_block_restrictions(self):
     """Check some block related restrictions"""
@@ -419,14 +425,17 @@ class ImportBlockConverter(BlockConverter):
                       line=self.offset + 2,
                       s="")
 
+  def make_row_converter(self, row, line):
+    """Make a row converter object for csv row."""
+    return base_row.ImportRowConverter(self, self.object_class, row=row,
+                                       headers=self.headers, line=line)
+
   def row_converters_from_csv(self):
     """ Generate a row converter object for every csv row """
     if self.ignore:
       return
     for i, row in enumerate(self.rows):
-      line = self.csv_lines[i]
-      yield base_row.ImportRowConverter(self, self.object_class, row=row,
-                                        headers=self.headers, line=line)
+      yield self.make_row_converter(row, self.csv_lines[i])
 
   @property
   def handle_fields(self):
@@ -444,38 +453,61 @@ class ImportBlockConverter(BlockConverter):
     ]
 
   def import_csv_data(self):  # noqa
-    """Perform import sequence for the block."""
+    """Perform import sequence for the block.
+
+    If IMPORT_BATCH_SIZE setting is greater than 1, valid rows are committed
+    in batches of this size, see ggrc.converters.import_batch.
+    """
     try:
       for row in self.row_converters_from_csv():
-        try:
-          ie_status = self.converter.get_job_status()
-          if ie_status and ie_status == \
-             all_models.ImportExport.STOPPED_STATUS:
-            raise exceptions.ImportStoppedException()
-          row.process_row()
-        except exceptions.ImportStoppedException:
-          raise
-        except ValueError as err:
-          db.session.rollback()
-          msg = err.message or errors.UNEXPECTED_ERROR
-          row.add_error(errors.ERROR_TEMPLATE, message=msg)
-          logger.exception(msg)
-        except Exception:  # pylint: disable=broad-except
-          db.session.rollback()
-          row.add_error(errors.UNKNOWN_ERROR)
-          logger.exception(errors.UNEXPECTED_ERROR)
-        self._update_info(row)
+        self.import_row(row)
+        if self.batch is None:
+          self.update_info(row)
+        elif not self.batch.is_pending(row):
+          self.update_info(row)
+        elif self.batch.is_full():
+          self.batch.commit()
         _app_ctx_stack.top.sqlalchemy_queries = []
     except exceptions.ImportStoppedException:
       raise
     except Exception:  # pylint: disable=broad-except
       logger.exception(errors.UNEXPECTED_ERROR)
     finally:
+      if self.batch is not None:
+        self.batch.commit()
       db.session.commit_hooks_enable_flag.enable()
       is_final_commit_required = not (self.converter.dry_run or self.ignore)
       if is_final_commit_required:
         db.session.commit()
 
+  def import_row(self, row):
+    """Process a single row adding its failures to the row errors."""
+    try:
+      if self.converter.status_watcher.is_stopped():
+        raise exceptions.ImportStoppedException()
+      if self.batch is not None:
+        self.batch.process_row(row)
+      else:
+        row.process_row()
+    except exceptions.ImportStoppedException:
+      raise
+    except ValueError as err:
+      self._rollback_row()
+      msg = err.message or errors.UNEXPECTED_ERROR
+      row.add_error(errors.ERROR_TEMPLATE, message=msg)
+      logger.exception(msg)
+    except Exception:  # pylint: disable=broad-except
+      self._rollback_row()
+      row.add_error(errors.UNKNOWN_ERROR)
+      logger.exception(errors.UNEXPECTED_ERROR)
+
+  def _rollback_row(self):
+    """Roll back changes of the failed row."""
+    if self.batch is not None:
+      self.batch.rollback_row()
+    else:
+      db.session.rollback()
+
   def get_unique_values_dict(self, object_class):
     """Get the varible to storing row numbers for unique values.
 
@@ -537,7 +569,7 @@ class ImportBlockConverter(BlockConverter):
         "row_errors": [],
     }
 
-  def _update_info(self, row):
+  def update_info(self, row):
     """Update counts for info response from row metadata."""
     self._import_info["rows"] += 1
     if row.ignore:
@@ -556,8 +588,6 @@ class ImportBlockConverter(BlockConverter):
 class ExportBlockConverter(BlockConverter):
   """Export block processing functionality."""
 
-  ROW_CHUNK_SIZE = 50
-
   def __init__(self, converter, object_class, object_ids, fields, class_name):
     # pylint: disable=too-many-arguments
     super(ExportBlockConverter, self).__init__(
@@ -615,18 +645,22 @@ class ExportBlockConverter(BlockConverter):
       return
     self.row_converters = []
 
-    for ids_pool in list_chunks(self.object_ids, self.ROW_CHUNK_SIZE):
+    chunk_size = settings.EXPORT_ROW_CHUNK_SIZE
+    for ids_pool in list_chunks(self.object_ids, chunk_size):
       # sqlalchemy caches all queries and it takes a lot of memory.
       # This line clears query cache.
       _app_ctx_stack.top.sqlalchemy_queries = []
 
-      objects = self.object_class.eager_query().filter(
+      # Mapped objects are taken from the mapping cache of the block
+      objects = self.object_class.eager_query(load_related=False).filter(
           self.object_class.id.in_(ids_pool)
-      ).execution_options(stream_results=True)
+      ).all()
+      prefetch = export_prefetch.ChunkPrefetch(objects)
 
       for obj in objects:
         yield base_row.ExportRowConverter(self, self.object_class, obj=obj,
-                                          headers=self.headers)
+                                          headers=self.headers,
+                                          prefetch=prefetch)
 
       # Clear all objects from session (it helps to avoid memory leak)
       for obj in db.session:
@@ -53,6 +53,7 @@ class RowConverter(object):
     self.object_class = object_class
     self.headers = headers
     self.obj = options.get("obj")
+    self.prefetch = options.get("prefetch")
     self.attrs = collections.OrderedDict()
     self.objects = collections.OrderedDict()
     self.old_values = {}
@@ -210,7 +211,8 @@ class ImportRowConverter(RowConverter):
                      column_names=", ".join(missing))
 
   def find_by_key(self, key, value):
-    return self.object_class.query.filter_by(**{key: value}).first()
+    return self.block_converter.converter.find_object(self.object_class,
+                                                      key, value)
 
   def get_value(self, key):
     """Get the value for the row object key."""
@@ -450,13 +452,22 @@ class ImportRowConverter(RowConverter):
     """Commit the row.
 
     This method also calls pre-and post-commit signals and handles failures.
+    If the block imports rows in batches, the row changes are only added to
+    the batch.
     """
     if self.dry_run or self.ignore:
       return
+    batch = self.block_converter.batch
+    if batch is not None:
+      try:
+        self._prepare_commit()
+        batch.add(self)
+      except exc.SQLAlchemyError as err:
+        logger.exception("Import failed with: %s", err.message)
+        self.add_error(errors.UNKNOWN_ERROR)
+      return
     try:
-      if not self.is_new:
-        cache.Cache.add_to_cache(self.obj)
-        self.send_pre_commit_signals()
+      self._prepare_commit()
       modified_objects = get_modified_objects(db.session)
       import_event = log_event(db.session, None)
       cache_utils.update_memcache_before_commit(
@@ -464,13 +475,7 @@ class ImportRowConverter(RowConverter):
           modified_objects,
           self.block_converter.CACHE_EXPIRY_IMPORT,
       )
-      try:
-        self.send_before_commit_signals(import_event)
-      except StatusValidationError as exp:
-        status_alias = self.headers.get("status", {}).get("display_name")
-        self.add_error(errors.VALIDATION_ERROR,
-                       column_name=status_alias,
-                       message=exp.message)
+      self.send_import_before_commit_signals(import_event)
       db.session.commit_hooks_enable_flag.disable()
       db.session.commit()
       self.block_converter.store_revision_ids(import_event)
@@ -482,9 +487,29 @@ class ImportRowConverter(RowConverter):
       self.block_converter.add_errors(errors.UNKNOWN_ERROR,
                                       line=self.offset + 2)
     else:
-      self.create_comment_notifications()
-      self.send_comment_notifications()
-      self.send_post_commit_signals(event=import_event)
+      self.send_after_commit_notifications(import_event)
+
+  def _prepare_commit(self):
+    """Track changes of updated object and send its pre-commit signals."""
+    if not self.is_new:
+      cache.Cache.add_to_cache(self.obj)
+      self.send_pre_commit_signals()
+
+  def send_import_before_commit_signals(self, event):
+    """Send before commit signals adding validation errors to the row."""
+    try:
+      self.send_before_commit_signals(event)
+    except StatusValidationError as exp:
+      status_alias = self.headers.get("status", {}).get("display_name")
+      self.add_error(errors.VALIDATION_ERROR,
+                     column_name=status_alias,
+                     message=exp.message)
+
+  def send_after_commit_notifications(self, event):
+    """Create comment notifications and send post-commit signals."""
+    self.create_comment_notifications()
+    self.send_comment_notifications()
+    self.send_post_commit_signals(event=event)
 
   def _setup_object(self):
     """ Set the object values or relate object values
@@ -0,0 +1,106 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Rendering of export blocks in worker processes.
+
+Background exports with several blocks or large blocks are split into parts
+rendered in a pool of EXPORT_MAX_WORKERS processes. Every object block is
+split into parts of EXPORT_PART_SIZE objects rendered with the columns of
+the whole block, snapshot blocks are rendered as a single part, as their
+columns depend on all exported snapshots.
+
+Workers render csv rows of a part with their own DB connections, and the
+parts are written in the original order after the block headers written
+by the converter as soon as they are rendered, so that the whole export is
+never kept in memory.
+"""
+
+import itertools
+
+import flask
+
+from ggrc import settings
+from ggrc.app import app
+from ggrc.converters import snapshot_block
+from ggrc.converters import import_helper
+from ggrc.models import all_models
+from ggrc.utils import concurrency
+from ggrc.utils import list_chunks
+from ggrc.utils import metrics
+
+
+METRIC_GROUP = "export_parts"
+
+
+def _export_part(part):
+  """Render csv rows of the export part in a worker process."""
+  from ggrc.converters import base
+  with app.app_context():
+    # pylint: disable=protected-access
+    flask.g._current_user = all_models.Person.query.get(part["user_id"])
+    ie_job = all_models.ImportExport.query.get(part["ie_job_id"])
+    converter = base.ExportConverter(ids_by_type=[part["query"]],
+                                     ie_job=ie_job)
+    converter.initialize_block_converters()
+    csv_builder = import_helper.CsvStringBuilder(part["table_width"])
+    converter.append_block_rows(csv_builder, converter.block_converters[0])
+    return csv_builder.get_csv_string()
+
+
+def _get_block_queries(block_converter):
+  """Get queries of objects of the block parts."""
+  if isinstance(block_converter, snapshot_block.SnapshotBlockConverter):
+    return [{
+        "object_name": "Snapshot",
+        "ids": block_converter.ids,
+        "fields": block_converter.fields,
+    }]
+  if block_converter.ignore:
+    return []
+  return [{
+      "object_name": block_converter.class_name,
+      "ids": ids,
+      "fields": block_converter.fields,
+  } for ids in list_chunks(block_converter.object_ids,
+                           settings.EXPORT_PART_SIZE)]
+
+
+def is_enabled(converter):
+  """Check if blocks of the export should be rendered in worker processes."""
+  if settings.EXPORT_MAX_WORKERS <= 1 or converter.ie_job is None:
+    return False
+  parts_count = sum(len(_get_block_queries(block_converter))
+                    for block_converter in converter.block_converters)
+  return parts_count > 1
+
+
+def render_parts(converter, table_width, user_id):
+  """Render csv rows of all export blocks in worker processes.
+
+  Parts are rendered lazily, iterators of the blocks must be consumed in
+  the order of blocks.
+
+  Returns:
+    list with an iterator over csv strings of block parts for every block
+    of the converter.
+  """
+  parts = []
+  counts = []
+  for block_converter in converter.block_converters:
+    queries = _get_block_queries(block_converter)
+    counts.append(len(queries))
+    parts.extend({
+        "user_id": user_id,
+        "ie_job_id": converter.ie_job.id,
+        "table_width": table_width,
+        "query": query,
+    } for query in queries)
+  metrics.incr(METRIC_GROUP, "exports")
+  metrics.incr(METRIC_GROUP, "parts", len(parts))
+  results = concurrency.imap_in_processes(
+      _export_part,
+      parts,
+      settings.EXPORT_MAX_WORKERS,
+      initializer=concurrency.init_db_worker,
+  )
+  return [itertools.islice(results, count) for count in counts]
@@ -0,0 +1,71 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Prefetch of data rendered by export column handlers.
+
+Exported objects are loaded in chunks of EXPORT_ROW_CHUNK_SIZE objects with
+their eager queries, which load ACL people, custom attribute values and
+comments of the whole chunk with a few subqueries, and mapped objects are
+taken from the mapping cache of the block. Objects referenced by mapping
+custom attributes are not loaded by the eager queries, so every rendered
+value of such attribute loads its object separately.
+
+Chunk prefetch indexes custom attribute values of the chunk objects and
+loads identifiers of all referenced objects with a single query per
+referenced type, so column handlers render values without any queries.
+"""
+
+import collections
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.utils import benchmark
+
+
+def _get_identifier_column(model):
+  """Get column with user visible identifier of model objects."""
+  for name in ("email", "slug"):
+    column = getattr(model, name, None)
+    if column is not None:
+      return column
+  return None
+
+
+class ChunkPrefetch(object):
+  """Custom attribute values of a chunk of exported objects."""
+
+  def __init__(self, objects):
+    self._values = {}
+    mapped_ids = collections.defaultdict(set)
+    for obj in objects:
+      for value in getattr(obj, "custom_attribute_values", []):
+        self._values[(obj.id, value.custom_attribute_id)] = value
+        if value.attribute_object_id is not None:
+          mapped_ids[value.attribute_value].add(value.attribute_object_id)
+    with benchmark("Prefetch objects mapped by custom attributes"):
+      self._identifiers = self._load_identifiers(mapped_ids)
+
+  @staticmethod
+  def _load_identifiers(mapped_ids):
+    """Load identifiers of objects referenced by mapping attributes."""
+    identifiers = {}
+    for type_, ids in mapped_ids.iteritems():
+      model = getattr(all_models, type_ or "", None)
+      if model is None or not hasattr(model, "id"):
+        continue
+      column = _get_identifier_column(model)
+      if column is None:
+        continue
+      query = db.session.query(model.id, column).filter(model.id.in_(ids))
+      identifiers.update(((type_, id_), identifier)
+                         for id_, identifier in query)
+    return identifiers
+
+  def get_ca_value(self, obj_id, definition_id):
+    """Get custom attribute value of the object or None if it is not set."""
+    return self._values.get((obj_id, definition_id))
+
+  def get_mapped_identifier(self, value):
+    """Get identifier of the object referenced by mapping attribute value."""
+    return self._identifiers.get((value.attribute_value,
+                                  value.attribute_object_id))
@@ -25,6 +25,20 @@ def _get_ca_date_value(value):
   return attr_val
 
 
+def _get_ca_text_value(value, attribute_type):
+  """Get text representation of not mapping custom attribute value."""
+  if attribute_type == _types.CHECKBOX:
+    attr_val = value.attribute_value if value.attribute_value else u"0"
+    try:
+      attr_val = int(attr_val)
+    except ValueError:
+      attr_val = False
+    return str(bool(attr_val)).upper()
+  elif attribute_type == _types.DATE:
+    return _get_ca_date_value(value)
+  return value.attribute_value
+
+
 class CustomAttributeColumnHandler(handlers.TextColumnHandler):
 
   """Custom attribute column handler
@@ -78,6 +92,8 @@ class CustomAttributeColumnHandler(handlers.TextColumnHandler):
   def get_value(self):
     """Return the value of the custom attrbute field.
 
+    Values of exported chunks are taken from the chunk prefetch.
+
     Returns:
       Text representation if the custom attribute value if it exists, otherwise
       None.
@@ -86,6 +102,15 @@ class CustomAttributeColumnHandler(handlers.TextColumnHandler):
     if not definition:
       return ""
 
+    prefetch = self.row_converter.prefetch
+    if prefetch is not None:
+      value = prefetch.get_ca_value(self.row_converter.obj.id, definition.id)
+      if value is None:
+        return None
+      if definition.attribute_type.startswith("Map:"):
+        return prefetch.get_mapped_identifier(value)
+      return _get_ca_text_value(value, definition.attribute_type)
+
     for value in self.row_converter.obj.custom_attribute_values:
       if value.custom_attribute_id == definition.id:
         if value.custom_attribute.attribute_type.startswith("Map:"):
@@ -94,17 +119,9 @@ class CustomAttributeColumnHandler(handlers.TextColumnHandler):
              value._attribute_object_attr is not None:
             obj = value.attribute_object
             return getattr(obj, "email", getattr(obj, "slug", None))
-        elif value.custom_attribute.attribute_type == _types.CHECKBOX:
-          attr_val = value.attribute_value if value.attribute_value else u"0"
-          try:
-            attr_val = int(attr_val)
-          except ValueError:
-            attr_val = False
-          return str(bool(attr_val)).upper()
-        elif value.custom_attribute.attribute_type == _types.DATE:
-          return _get_ca_date_value(value)
         else:
-          return value.attribute_value
+          return _get_ca_text_value(value,
+                                    value.custom_attribute.attribute_type)
 
     return None
 
@@ -243,17 +243,22 @@ class UserColumnHandler(ColumnHandler):
 
   def get_person(self, email):
     from ggrc.utils import user_generator
-    new_objects = self.row_converter.block_converter.converter.new_objects
+    converter = self.row_converter.block_converter.converter
+    new_objects = converter.new_objects
     if email not in new_objects[all_models.Person]:
-      try:
-        new_objects[all_models.Person][email] = user_generator.find_user(email)
-      except ValueError as ex:
-        self.add_error(
-            errors.VALIDATION_ERROR,
-            column_name=self.display_name,
-            message=ex.message
-        )
-        return None
+      person = converter.plan.get(all_models.Person.__name__, "email", email)
+      if person is None:
+        try:
+          person = user_generator.find_user(email)
+        except ValueError as ex:
+          self.add_error(
+              errors.VALIDATION_ERROR,
+              column_name=self.display_name,
+              message=ex.message
+          )
+          return None
+        converter.plan.add(all_models.Person.__name__, "email", email, person)
+      new_objects[all_models.Person][email] = person
     return new_objects[all_models.Person].get(email)
 
   def _parse_raw_data_to_emails(self):
@@ -507,8 +512,9 @@ class MappingColumnHandler(ColumnHandler):
     slugs = set([slug.lower() for slug in lines if slug.strip()])
     objects = []
 
+    converter = self.row_converter.block_converter.converter
     for slug in slugs:
-      obj = class_.query.filter_by(slug=slug).first()
+      obj = converter.find_object(class_, "slug", slug)
 
       if obj:
         is_allowed_by_type = self._is_allowed_mapping_by_type(
@@ -705,7 +711,8 @@ class ParentColumnHandler(ColumnHandler):
     slug = self.raw_value
     obj = self.new_objects.get(self.parent, {}).get(slug)
     if obj is None:
-      obj = self.parent.query.filter(self.parent.slug == slug).first()
+      obj = self.row_converter.block_converter.converter.find_object(
+          self.parent, "slug", slug)
     if obj is None:
       self.add_error(
           errors.UNKNOWN_OBJECT,
@@ -766,7 +773,8 @@ class RequirementDirectiveColumnHandler(MappingColumnHandler):
   def get_directive_from_slug(self, directive_class, slug):
     if slug in self.new_objects[directive_class]:
       return self.new_objects[directive_class][slug]
-    return directive_class.query.filter_by(slug=slug).first()
+    return self.row_converter.block_converter.converter.find_object(
+        directive_class, "slug", slug)
 
   def parse_item(self):
     """ get a directive from slug """
@@ -0,0 +1,179 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Batched commits of imported rows.
+
+By default every imported row is committed in a separate transaction with
+its own event, revisions, cache updates and commit signals. Import batch
+processes every row in a savepoint, so an invalid row is rolled back without
+touching the other ones, and commits valid rows of the batch in a single
+transaction with a single event.
+
+If the batch commit fails, the batch is rolled back and its rows are
+imported again one by one, so only the failing row gets an error.
+"""
+
+import logging
+
+import flask
+
+from ggrc import db
+from ggrc.cache import utils as cache_utils
+from ggrc.models import cache
+from ggrc.services.common import get_modified_objects
+from ggrc.services.common import update_snapshot_index
+from ggrc.utils import benchmark
+from ggrc.utils import metrics
+from ggrc.utils.log_event import log_event
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_GROUP = "import_batches"
+
+
+def _merge_cache(target, source):
+  """Add objects tracked by source cache to target cache."""
+  target.new.update(source.new)
+  target.deleted.update(source.deleted)
+  for obj, log_json in source.dirty.iteritems():
+    if obj not in target.new and obj not in target.deleted:
+      target.dirty.setdefault(obj, log_json)
+
+
+class ImportBatch(object):
+  """Valid rows of import block waiting for a single commit."""
+
+  def __init__(self, block_converter, size):
+    self.block_converter = block_converter
+    self.size = size
+    self.rows = []
+    self._messages = {}
+    self._cache = cache.Cache()
+    self._savepoint = None
+
+  def is_full(self):
+    """Check if the batch should be committed."""
+    return len(self.rows) >= self.size
+
+  def is_pending(self, row):
+    """Check if row is waiting for the batch commit."""
+    return row in self._messages
+
+  def process_row(self, row):
+    """Process row in a savepoint released if the row is valid."""
+    block = self.block_converter
+    errors_count = len(block.row_errors)
+    warnings_count = len(block.row_warnings)
+    self._savepoint = db.session.begin_nested()
+    try:
+      row.process_row()
+    finally:
+      # Rows not added to the batch are ignored or failed
+      self.rollback_row()
+    if row in self.rows:
+      self._messages[row] = (block.row_errors[errors_count:],
+                             block.row_warnings[warnings_count:])
+
+  def rollback_row(self):
+    """Roll back changes of the current row if they are not released."""
+    if self._savepoint is not None and self._savepoint.session is not None:
+      self._savepoint.rollback()
+    self._savepoint = None
+
+  def add(self, row):
+    """Release savepoint of the valid row keeping its changes in the batch.
+
+    Release of a savepoint clears the session cache of modified objects as
+    any commit does, so objects tracked for the row are kept in the batch
+    cache until the batch is committed.
+    """
+    db.session.flush()
+    row_cache = cache.Cache.get_cache()
+    if row_cache:
+      _merge_cache(self._cache, row_cache)
+    self._savepoint.commit()
+    self._savepoint = None
+    self.rows.append(row)
+
+  def commit(self):
+    """Commit valid rows of the batch in a single transaction."""
+    if not self.rows:
+      return
+    block = self.block_converter
+    rows, messages = self.rows, self._messages
+    self.rows, self._messages = [], {}
+    errors_count = len(block.row_errors)
+    try:
+      with benchmark("Commit import batch of {} rows".format(len(rows))):
+        import_event = self._commit(rows)
+    except Exception:  # pylint: disable=broad-except
+      db.session.rollback()
+      del block.row_errors[errors_count:]
+      logger.exception("Import batch commit failed, importing rows of the "
+                       "batch one by one.")
+      metrics.incr(METRIC_GROUP, "replayed")
+      self._replay(rows, messages)
+      return
+    finally:
+      self._cache = cache.Cache()
+    metrics.incr(METRIC_GROUP, "committed")
+    metrics.incr(METRIC_GROUP, "rows", len(rows))
+    for row in rows:
+      row.send_after_commit_notifications(import_event)
+      block.update_info(row)
+
+  def _commit(self, rows):
+    """Log event for the batch rows changes and commit them."""
+    block = self.block_converter
+    current_cache = cache.Cache.get_cache()
+    if current_cache:
+      _merge_cache(self._cache, current_cache)
+    flask.g.cache = self._cache
+    modified_objects = get_modified_objects(db.session)
+    import_event = log_event(db.session, None)
+    cache_utils.update_memcache_before_commit(
+        block,
+        modified_objects,
+        block.CACHE_EXPIRY_IMPORT,
+    )
+    for row in rows:
+      row.send_import_before_commit_signals(import_event)
+    db.session.commit_hooks_enable_flag.disable()
+    db.session.commit()
+    block.store_revision_ids(import_event)
+    cache_utils.update_memcache_after_commit(block)
+    update_snapshot_index(modified_objects)
+    return import_event
+
+  def _forget_row(self, row, messages):
+    """Drop state the rolled back row left in the block and converter."""
+    block = self.block_converter
+    row_errors, row_warnings = messages
+    for message in row_errors:
+      block.row_errors.remove(message)
+    for message in row_warnings:
+      block.row_warnings.remove(message)
+    for values in block.unique_values.itervalues():
+      for value, line in values.items():
+        if line == row.line:
+          del values[value]
+    if row.is_new_object_set:
+      new_objects = block.converter.new_objects[row.object_class]
+      for key, obj in new_objects.items():
+        if obj is row.obj:
+          del new_objects[key]
+
+  def _replay(self, rows, messages):
+    """Import rows of the failed batch again committing every row."""
+    block = self.block_converter
+    for row in rows:
+      self._forget_row(row, messages[row])
+    block.batch = None
+    try:
+      for row in rows:
+        new_row = block.make_row_converter(row.row, row.line)
+        block.import_row(new_row)
+        block.update_info(new_row)
+    finally:
+      block.batch = self
@@ -276,11 +276,19 @@ def calculate_computed_attributes(revision_ids, user_id):
 class CsvStringBuilder(object):
   """CSV string builder."""
 
-  def __init__(self, table_width):
-    """Basic initialization."""
+  def __init__(self, table_width, output_buffer=None):
+    """Basic initialization.
+
+    Args:
+      table_width: number of columns of every line.
+      output_buffer: file-like object lines are written to, in-memory buffer
+          is used if it isn't set.
+    """
     self.table_width = table_width
 
-    self.output_buffer = StringIO()
+    if output_buffer is None:
+      output_buffer = StringIO()
+    self.output_buffer = output_buffer
     self.csv_writer = csv.writer(self.output_buffer)
 
   @staticmethod
@@ -300,6 +308,10 @@ class CsvStringBuilder(object):
     line.extend([""] * diff)
     self.csv_writer.writerow(line)
 
+  def append_csv(self, csv_string):
+    """Append lines of CSV string built with the same table width."""
+    self.output_buffer.write(csv_string)
+
   def get_csv_string(self):
     """Returns CSV string from buffer."""
     return self.output_buffer.getvalue()
@@ -0,0 +1,96 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Object lookups of import analysis phase reused by the import phase.
+
+Background import processes the csv data twice: the analysis phase runs it
+in dry run mode and the import phase processes it again committing the
+changes. Both phases look up every row object, mapped object and person by
+its slug or email, and person lookups may require a request to the
+integration service.
+
+Analysis phase records ids of objects found by their keys into the import
+plan stored in the job. Import phase loads all planned objects with a query
+per object type and takes them from the plan instead of looking up every
+value separately. Objects changed after the analysis started and values not
+found during the analysis are looked up again.
+"""
+
+import json
+from datetime import datetime
+
+from ggrc.models import all_models
+from ggrc.utils import list_chunks
+from ggrc.utils import metrics
+
+
+METRIC_GROUP = "import_plan"
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class ImportPlan(object):
+  """Ids of objects found by import lookups."""
+
+  def __init__(self, created_at=None, lookups=None):
+    # Precision of updated_at columns is one second
+    self.created_at = (created_at or datetime.utcnow()).replace(microsecond=0)
+    # Object ids by model name, key name and lowercase key value
+    self._lookups = lookups or {}
+    # Loaded objects by model name, key name and lowercase key value
+    self._objects = {}
+
+  def add(self, model_name, key, value, obj):
+    """Record object found by the key value."""
+    if obj is None or obj.id is None or not value:
+      return
+    values = self._lookups.setdefault(model_name, {}).setdefault(key, {})
+    values[unicode(value).lower()] = obj.id
+
+  def get(self, model_name, key, value):
+    """Get planned object or None if the value should be looked up."""
+    if not self._objects or not value:
+      return None
+    obj = self._objects.get((model_name, key, unicode(value).lower()))
+    metrics.incr(METRIC_GROUP, "hits" if obj is not None else "misses")
+    return obj
+
+  def _is_changed(self, obj):
+    """Check if object could be changed after the plan was created."""
+    updated_at = getattr(obj, "updated_at", None)
+    return updated_at is None or updated_at >= self.created_at
+
+  def load(self):
+    """Load planned objects not changed since the plan was created."""
+    for model_name, keys in self._lookups.iteritems():
+      model = getattr(all_models, model_name, None)
+      if model is None:
+        continue
+      ids = list({id_ for values in keys.itervalues()
+                  for id_ in values.itervalues()})
+      objects = {}
+      for ids_chunk in list_chunks(ids):
+        objects.update((obj.id, obj) for obj in
+                       model.query.filter(model.id.in_(ids_chunk))
+                       if not self._is_changed(obj))
+      for key, values in keys.iteritems():
+        for value, id_ in values.iteritems():
+          obj = objects.get(id_)
+          if obj is None or unicode(getattr(obj, key)).lower() != value:
+            metrics.incr(METRIC_GROUP, "outdated")
+            continue
+          self._objects[(model_name, key, value)] = obj
+
+  def dumps(self):
+    """Serialize the plan to a compact JSON string."""
+    return json.dumps({
+        "created_at": self.created_at.strftime(DATETIME_FORMAT),
+        "lookups": self._lookups,
+    }, separators=(",", ":"))
+
+  @classmethod
+  def loads(cls, data):
+    """Create plan from JSON string returned by dumps."""
+    plan_json = json.loads(data)
+    created_at = datetime.strptime(plan_json["created_at"], DATETIME_FORMAT)
+    return cls(created_at, plan_json["lookups"])
@@ -0,0 +1,96 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Watcher of stop requests of running import/export jobs.
+
+Reading job status for every processed row costs a cache or DB lookup per
+row. Watcher reads the status only once per IE_STATUS_CHECK_ROWS rows or
+IE_STATUS_CHECK_SECONDS seconds, whichever comes first. Jobs stopped by
+requests handled in the same process are noticed on the next check
+without any lookup.
+"""
+
+import threading
+import time
+
+from ggrc import settings
+from ggrc.models import all_models
+from ggrc.utils import metrics
+
+
+METRIC_GROUP = "import_export_status"
+
+_LOCK = threading.Lock()
+# Time of stop notification by job id
+_STOPPED_JOBS = {}
+
+
+def notify_stopped(ie_job_id):
+  """Signal watchers of the current process that the job was stopped."""
+  with _LOCK:
+    _STOPPED_JOBS[ie_job_id] = time.time()
+
+
+def _is_notified(ie_job_id, since):
+  """Check if the job was stopped by a request of the current process.
+
+  Notifications sent before `since` time belong to another job with the same
+  id and are ignored.
+  """
+  with _LOCK:
+    return _STOPPED_JOBS.get(ie_job_id, since - 1) >= since
+
+
+class JobStatusWatcher(object):
+  """Check stop requests of import/export job on rows or time interval."""
+
+  def __init__(self, ie_job_id, get_status, rows_interval=None,
+               time_interval=None):
+    """Create watcher of the job.
+
+    Args:
+      ie_job_id: id of the ImportExport job or None if there is no job.
+      get_status: function reading the current job status.
+      rows_interval: max number of rows processed between status reads.
+      time_interval: max number of seconds between status reads.
+    """
+    self.ie_job_id = ie_job_id
+    self.get_status = get_status
+    if rows_interval is None:
+      rows_interval = settings.IE_STATUS_CHECK_ROWS
+    if time_interval is None:
+      time_interval = settings.IE_STATUS_CHECK_SECONDS
+    self.rows_interval = rows_interval
+    self.time_interval = time_interval
+    self._rows = 0
+    self._created_at = time.time()
+    self._checked_at = None
+    self._stopped = False
+
+  def _is_check_due(self):
+    """Check if status should be read for the current row."""
+    if self._checked_at is None or self._rows >= self.rows_interval:
+      return True
+    return time.time() - self._checked_at >= self.time_interval
+
+  def is_stopped(self):
+    """Count processed row and check if the job was stopped.
+
+    Job status is read only if the rows or time interval passed since the
+    previous read, the first call always reads it.
+    """
+    if self.ie_job_id is None:
+      return False
+    self._rows += 1
+    if self._stopped or _is_notified(self.ie_job_id, self._created_at):
+      self._stopped = True
+      return True
+    if not self._is_check_due():
+      metrics.incr(METRIC_GROUP, "skipped")
+      return False
+    metrics.incr(METRIC_GROUP, "checked")
+    self._rows = 0
+    self._checked_at = time.time()
+    self._stopped = (self.get_status() ==
+                     all_models.ImportExport.STOPPED_STATUS)
+    return self._stopped
@@ -14,6 +14,14 @@ Relationships are tuples with:
 Glossary:
 aggregate object = object from which the computed value is read
 computed object = object which will get the new computed value
+
+Stored computed values together with their source aggregate objects are the
+state of aggregate functions. Revisions of aggregate objects update stored
+values by comparing them with values of the changed aggregate objects only,
+and values are recomputed from all aggregate objects only if the source of
+the stored value is deleted or its value is decreased. Full recompute is run
+with "all_latest" revision ids, full reindex writes index entries of stored
+values without recomputing them.
 """
 
 import datetime
@@ -24,10 +32,12 @@ import sqlalchemy as sa
 
 from ggrc import db
 from ggrc import login
+from ggrc import settings
 from ggrc import utils
 from ggrc.utils import revisions as revision_utils, helpers
 from ggrc.utils import benchmark
 from ggrc.models import all_models as models
+from ggrc.query import result_cache
 
 # Statement for inserting attribute values without explicit call of delete.
 ATTRIBUTE_REPLACE_STATEMENT = """
@@ -111,44 +121,49 @@ def get_aggregate_field(attribute):
   return afn.split()[1]
 
 
-def get_aggregate_function(attribute):
-  """Get actual computed function from aggregate function field."""
+def get_aggregate_key(attribute):
+  """Get sort key of (value, aggregate id) pairs for the aggregate function.
+
+  Computed value is taken from the pair with the maximal key.
+  """
   afn = attribute.attribute_definition.attribute_type.aggregate_function
   function_name = afn.split()[2]
   if function_name == "max":
-    def max_(aggregate_values, rel_map):
-      """Get maximum value and id from which the value was taken."""
-      values = [
-          (aggregate_values[aggregate_id], aggregate_id)
-          for aggregate_id in rel_map
-          if aggregate_values.get(aggregate_id) is not None
-      ]
-      if not values:
-        return None, None
-
-      value, source_id = max(values)
-      return source_id, value
-
-    return max_
+    return lambda item: item
   elif function_name == "last":
-    def last_(aggregate_values, rel_map):
-      """Get maximum value and id from which the value was taken."""
-      values = [
-          (aggregate_values[aggregate_id], aggregate_id)
-          for aggregate_id in rel_map
-          if aggregate_values.get(aggregate_id) is not None
-      ]
-      if not values:
-        return None, None
-
-      # Last value  = value with maximal id
-      value, source_id = max(values, key=lambda i: i[1])
-      return source_id, value
-
-    return last_
+    # Last value  = value with maximal id
+    return lambda item: item[1]
   raise AttributeError("Attribute aggregate_function contains invalid data.")
 
 
+def get_aggregate_function(attribute):
+  """Get actual computed function from aggregate function field."""
+  key = get_aggregate_key(attribute)
+
+  def aggregate(aggregate_values, rel_map):
+    """Get aggregated value and id from which the value was taken."""
+    values = [
+        (aggregate_values[aggregate_id], aggregate_id)
+        for aggregate_id in rel_map
+        if aggregate_values.get(aggregate_id) is not None
+    ]
+    if not values:
+      return None, None
+
+    value, source_id = max(values, key=key)
+    return source_id, value
+
+  return aggregate
+
+
+def get_value_field(attribute):
+  """Get attributes table column storing values of the attribute."""
+  field_type = attribute.attribute_definition.attribute_type.field_type
+  if field_type in ("value_datetime", "value_integer", "value_string"):
+    return field_type
+  return "value_datetime"
+
+
 def _get_group_key(revision, aggregate_type, computed_object):
   """Get key for aggregate objects group.
 
@@ -202,19 +217,23 @@ def _objects_from_snapshots(snapshots):
   ).distinct())
 
 
-def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
-  """Get tuples of all original objects linked to aggregate_objects.
+def _get_aggregate_relationships(aggregate_objects, computed_object_type):
+  """Get mappings of aggregate_objects to original objects.
 
   args:
     aggregate_objects: tuples of object type and object id
     computed_object_type: object type of the destination for computed
         attribute. Object to which the computed attribute belongs.
+
+  Returns:
+    list of tuples with aggregate id, computed type and computed id.
   """
   if not aggregate_objects:
     return list()
 
   # Related original objects
   src = db.session.query(
+      models.Relationship.destination_id.label('aggregate_id'),
       models.Relationship.source_type.label('type'),
       models.Relationship.source_id.label('id'),
   ).filter(
@@ -225,6 +244,7 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
       models.Relationship.source_type == computed_object_type,
   )
   dst = db.session.query(
+      models.Relationship.source_id.label('aggregate_id'),
       models.Relationship.destination_type.label('type'),
       models.Relationship.destination_id.label('id'),
   ).filter(
@@ -237,8 +257,11 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
 
   # Related snapshots
   snap_dst = db.session.query(
+      models.Relationship.source_id.label('aggregate_id'),
       models.Snapshot.child_type.label('type'),
       models.Snapshot.child_id.label('id'),
+  ).select_from(
+      models.Snapshot
   ).join(
       models.Relationship,
       sa.and_(
@@ -253,8 +276,11 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
       ).in_(aggregate_objects),
   )
   snap_src = db.session.query(
+      models.Relationship.destination_id.label('aggregate_id'),
       models.Snapshot.child_type.label('type'),
       models.Snapshot.child_id.label('id'),
+  ).select_from(
+      models.Snapshot
   ).join(
       models.Relationship,
       sa.and_(
@@ -273,6 +299,21 @@ def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
   return list(src.union(dst, snap_src, snap_dst).distinct())
 
 
+def _get_objects_from_aggregates(aggregate_objects, computed_object_type):
+  """Get tuples of all original objects linked to aggregate_objects.
+
+  args:
+    aggregate_objects: tuples of object type and object id
+    computed_object_type: object type of the destination for computed
+        attribute. Object to which the computed attribute belongs.
+  """
+  return list({
+      (computed_type, computed_id)
+      for _, computed_type, computed_id in _get_aggregate_relationships(
+          aggregate_objects, computed_object_type)
+  })
+
+
 def _get_objects_from_deleted(aggregate_deleted, aggregate_field):
   """Get objects with deleted source.
 
@@ -312,6 +353,107 @@ def get_affected_objects(attribute_groups):
   return affected_objects
 
 
+def _get_stored_values(attr, objects):
+  """Get stored values of the attribute and their sources for objects."""
+  if not objects:
+    return {}
+  value_field = getattr(models.Attributes, get_value_field(attr))
+  query = db.session.query(
+      models.Attributes.object_type,
+      models.Attributes.object_id,
+      value_field,
+      models.Attributes.source_id,
+  ).filter(
+      models.Attributes.attribute_template_id == attr.attribute_template_id,
+      sa.tuple_(
+          models.Attributes.object_type,
+          models.Attributes.object_id,
+      ).in_(objects),
+  )
+  return {(object_type, object_id): (value, source_id)
+          for object_type, object_id, value, source_id in query}
+
+
+def _get_increments(attr, groups):
+  """Get values of the attribute changed by the grouped revisions.
+
+  Stored values of computed objects are compared with values of changed
+  aggregate objects mapped to them. Values are recomputed from all aggregate
+  objects for changed computed objects, and if value of their source is
+  decreased or it differs from the stored one. New snapshots get stored
+  values of their objects.
+
+  Returns:
+    tuple of dict of (value, source id) of updated objects and set of
+    objects whose values must be recomputed.
+  """
+  recompute = set(groups["computed_objects"])
+  recompute.update(_get_objects_from_deleted(
+      groups["aggregate_deleted"],
+      get_aggregate_field(attr)
+  ))
+  snapshot_objects = set(
+      _objects_from_snapshots(groups["destination_snapshots"])
+  )
+  relationships = _get_aggregate_relationships(
+      groups["aggregate_objects"],
+      attr.object_template.name
+  )
+  stored_values = _get_stored_values(attr, snapshot_objects.union(
+      (computed_type, computed_id)
+      for _, computed_type, computed_id in relationships
+  ))
+  aggregate_type = get_aggregate_type(attr)
+  aggregate_values = _get_aggregate_values(
+      attr,
+      set(groups["aggregate_objects"]).union(
+          (aggregate_type, source_id)
+          for _, source_id in stored_values.itervalues()
+      ),
+  )
+
+  changed_ids = {id_ for _, id_ in groups["aggregate_objects"]}
+  values = {}
+  for obj, (value, source_id) in stored_values.iteritems():
+    if source_id in changed_ids or aggregate_values.get(source_id) == value:
+      values[obj] = (value, source_id)
+    else:
+      recompute.add(obj)
+  updated = snapshot_objects.intersection(values)
+
+  key = get_aggregate_key(attr)
+  for aggregate_id, computed_type, computed_id in relationships:
+    obj = (computed_type, computed_id)
+    if obj in recompute:
+      continue
+    value = aggregate_values.get(aggregate_id)
+    old_value, source_id = values.get(obj, (None, None))
+    if source_id == aggregate_id:
+      if value is None or key((value, aggregate_id)) < key((old_value,
+                                                            source_id)):
+        # Source value is decreased, other values may be greater now
+        recompute.add(obj)
+      elif value != old_value:
+        values[obj] = (value, aggregate_id)
+        updated.add(obj)
+    elif value is not None and (source_id is None or
+                                key((value, aggregate_id)) >
+                                key((old_value, source_id))):
+      values[obj] = (value, aggregate_id)
+      updated.add(obj)
+
+  return {obj: values[obj] for obj in updated - recompute}, recompute
+
+
+def get_increments(attribute_groups):
+  """Get changed values and objects to recompute grouped by attributes."""
+  increments = {}
+  recomputed_objects = {}
+  for attr, groups in attribute_groups.iteritems():
+    increments[attr], recomputed_objects[attr] = _get_increments(attr, groups)
+  return increments, recomputed_objects
+
+
 def _get_aggregate_values(attr, aggregate_objects):
   """Get values from aggregate objects.
 
@@ -353,6 +495,19 @@ def _get_relationships_map(relationships):
   return rel_map
 
 
+def _get_computed_value_dict(attr, source_id, value):
+  """Get computed value of the attribute taken from the source."""
+  computed_value_dict = {
+      "source_type": get_aggregate_type(attr),
+      "source_id": source_id,
+      "value_datetime": None,
+      "value_integer": None,
+      "value_string": "",
+  }
+  computed_value_dict[get_value_field(attr)] = value
+  return computed_value_dict
+
+
 def compute_values(affected_objects, all_relationships, snapshot_map):
   """Compute new values for affected objects."""
   # pylint: disable=too-many-locals
@@ -363,25 +518,13 @@ def compute_values(affected_objects, all_relationships, snapshot_map):
     aggregate_values = _get_aggregate_values(attr, aggregate_objects)
     rel_map = _get_relationships_map(all_relationships[attr])
 
-    aggregate_type = get_aggregate_type(attr)
     aggregate_function = get_aggregate_function(attr)
     for obj in objects:
       source_id, value = aggregate_function(aggregate_values, rel_map[obj])
       if source_id is None:
         continue
 
-      computed_value_dict = {
-          "source_type": aggregate_type,
-          "source_id": source_id,
-          "value_datetime": None,
-          "value_integer": None,
-          "value_string": "",
-      }
-      field_type = attr.attribute_definition.attribute_type.field_type
-      if field_type in ("value_datetime", "value_integer", "value_string"):
-        computed_value_dict[field_type] = value
-      else:
-        computed_value_dict["value_datetime"] = value
+      computed_value_dict = _get_computed_value_dict(attr, source_id, value)
       computed_values[attr][obj] = computed_value_dict
       for snapshot_id in snapshot_map.get(obj, set()):
         computed_values[attr][(u"Snapshot", snapshot_id)] = computed_value_dict
@@ -464,6 +607,24 @@ def get_relationships(affected_objects):
   return relationships
 
 
+def _get_snapshot_tags(snapshot_ids):
+  """Get full-text index tags of snapshots."""
+  if not snapshot_ids:
+    return {}
+  query = db.session.query(
+      models.Snapshot.id,
+      sa.func.concat_ws(
+          "-",
+          models.Snapshot.parent_type,
+          models.Snapshot.parent_id,
+          models.Snapshot.child_type,
+      )
+  ).filter(
+      models.Snapshot.id.in_(snapshot_ids)
+  )
+  return dict(query)
+
+
 def get_snapshot_data(affected_objects):
   """Get data needed for indexing snapshot values."""
   all_objects = set()
@@ -489,20 +650,7 @@ def get_snapshot_data(affected_objects):
     snapshot_map[(computed_type, computed_id)].append(snapshot_id)
     all_ids.append(snapshot_id)
 
-  snapshot_tag_map = {}
-  if all_ids:
-    query = db.session.query(
-        models.Snapshot.id,
-        sa.func.concat_ws(
-            "-",
-            models.Snapshot.parent_type,
-            models.Snapshot.parent_id,
-            models.Snapshot.child_type,
-        )
-    ).filter(
-        models.Snapshot.id.in_(all_ids)
-    )
-    snapshot_tag_map = dict(query)
+  snapshot_tag_map = _get_snapshot_tags(all_ids)
 
   return snapshot_map, snapshot_tag_map
 
@@ -562,9 +710,54 @@ def store_data(attributes_data, index_data):
     db.session.execute(ATTRIBUTE_REPLACE_STATEMENT, attributes_data)
   if index_data:
     db.session.execute(INDEX_REPLACE_STATEMENT, index_data)
+    result_cache.mark_changed({row["type"] for row in index_data})
   db.session.commit()
 
 
+def reindex_stored_values():
+  """Write full-text index entries of all stored computed values.
+
+  Full reindex does not index computed values of snapshots, they are taken
+  from the attributes table instead of recomputing them.
+  """
+  attributes = {attr.attribute_template_id: attr
+                for attr in get_computed_attributes()}
+  if not attributes:
+    return
+  query = db.session.query(
+      models.Attributes.attribute_id,
+      models.Attributes.attribute_template_id,
+      models.Attributes.object_type,
+      models.Attributes.object_id,
+      models.Attributes.value_datetime,
+      models.Attributes.value_string,
+  ).filter(
+      models.Attributes.attribute_template_id.in_(attributes.keys())
+  ).order_by(
+      models.Attributes.attribute_id
+  )
+  last_id = 0
+  while True:
+    # Rows are read by chunks to keep memory usage bounded
+    rows_chunk = query.filter(
+        models.Attributes.attribute_id > last_id
+    ).limit(CA_CHUNK_SIZE).all()
+    if not rows_chunk:
+      break
+    last_id = rows_chunk[-1].attribute_id
+    stored_values = collections.defaultdict(dict)
+    for _, template_id, object_type, object_id, value_datetime, \
+            value_string in rows_chunk:
+      stored_values[attributes[template_id]][(object_type, object_id)] = {
+          "value_datetime": value_datetime,
+          "value_string": value_string,
+      }
+    snapshot_tag_map = _get_snapshot_tags([
+        row.object_id for row in rows_chunk if row.object_type == "Snapshot"
+    ])
+    store_data([], get_index_data(stored_values, snapshot_tag_map))
+
+
 def get_all_latest_revisions_ids():
   """Get latest revisions for aggregate objects."""
   with benchmark("Get all latest revision ids"):
@@ -630,11 +823,16 @@ def get_revisions(revision_ids):
 
 
 @helpers.without_sqlalchemy_cache
-def compute_attributes(revision_ids):
+def compute_attributes(revision_ids, incremental=None):
   """Compute new values based an changed objects.
 
   Args:
-    objects: array of object stubs of modified objects.
+    revision_ids: ids of revisions of changed objects, or "all_latest" to
+        recompute values of all objects.
+    incremental: update stored values with values of changed aggregate
+        objects instead of recomputing them, COMPUTED_ATTRIBUTES_INCREMENTAL
+        setting is used if not specified. Values are always recomputed for
+        "all_latest" revisions.
   """
 
   with benchmark("Compute attributes"):
@@ -642,6 +840,9 @@ def compute_attributes(revision_ids):
     if revision_ids == "all_latest":
       with benchmark("Get all latest revisions ids"):
         revision_ids = get_all_latest_revisions_ids()
+      incremental = False
+    elif incremental is None:
+      incremental = settings.COMPUTED_ATTRIBUTES_INCREMENTAL
 
     if not revision_ids:
       return
@@ -651,7 +852,49 @@ def compute_attributes(revision_ids):
     for ids_chunk in utils.list_chunks(revision_ids, chunk_size=CA_CHUNK_SIZE):
       handled_ids += len(ids_chunk)
       logger.info("Revision: %s/%s", handled_ids, ids_count)
-      recompute_attrs_for_revisions(ids_chunk)
+      if incremental:
+        update_attrs_for_revisions(ids_chunk)
+      else:
+        recompute_attrs_for_revisions(ids_chunk)
+
+
+def update_attrs_for_revisions(ids_chunk):
+  """Update CAs with changes of the chunk of revisions."""
+  with benchmark("Get revisions."):
+    revisions = get_revisions(ids_chunk)
+
+  with benchmark("Get all computed attributes"):
+    attributes = get_computed_attributes()
+
+  with benchmark("Group revisions by computed attributes"):
+    attribute_groups = group_revisions(attributes, revisions)
+  with benchmark("Get values changed by aggregate objects"):
+    increments, recomputed_objects = get_increments(attribute_groups)
+  with benchmark("Get relationships for recomputed objects"):
+    relationships = get_relationships(recomputed_objects)
+  with benchmark("Get snapshot data"):
+    snapshot_map, snapshot_tag_map = get_snapshot_data({
+        attr: recomputed_objects[attr].union(increments[attr])
+        for attr in attribute_groups
+    })
+
+  with benchmark("Compute values"):
+    computed_values = compute_values(recomputed_objects, relationships,
+                                     snapshot_map)
+    for attr, values in increments.iteritems():
+      for obj, (value, source_id) in values.iteritems():
+        computed_value_dict = _get_computed_value_dict(attr, source_id, value)
+        computed_values[attr][obj] = computed_value_dict
+        for snapshot_id in snapshot_map.get(obj, set()):
+          computed_values[attr][(u"Snapshot", snapshot_id)] = \
+              computed_value_dict
+
+  with benchmark("Get computed attributes data"):
+    attributes_data = get_attributes_data(computed_values)
+  with benchmark("Get computed attribute full-text index data"):
+    index_data = get_index_data(computed_values, snapshot_tag_map)
+  with benchmark("Store attribute data and full-text index data"):
+    store_data(attributes_data, index_data)
 
 
 def recompute_attrs_for_revisions(ids_chunk):
@@ -14,7 +14,9 @@ from ggrc import fulltext
 from ggrc import utils
 from ggrc.models import all_models, get_model
 from ggrc.fulltext import mixin
+from ggrc.fulltext import queue
 from ggrc.models.background_task import reindex_on_commit
+from ggrc.query import result_cache
 from ggrc.utils import benchmark, helpers
 
 ACTIONS = ['after_insert', 'after_delete', 'after_update']
@@ -29,17 +31,48 @@ class ReindexSet(threading.local):
 
   def __init__(self, *args, **kwargs):
     super(ReindexSet, self).__init__(*args, **kwargs)
-    self._pool = set()
+    self._pool = {}
     self.model_ids_to_reindex = defaultdict(set)
-
-  def add(self, item):
-    self._pool.add(item)
+    # Names of changed attributes for objects that require only partial
+    # reindex. Objects that are absent here are reindexed completely.
+    self.model_attrs_to_reindex = defaultdict(dict)
+    # Number of objects put to the indexing queue during the request
+    self.queued_count = 0
+
+  def add(self, item, attrs=None):
+    """Add item to reindex pool.
+
+    Args:
+      item: object that should be reindexed.
+      attrs: names of changed attributes of the item or None if all the
+          item properties should be reindexed.
+    """
+    if item in self._pool:
+      current = self._pool[item]
+      attrs = (None if current is None or attrs is None
+               else current | set(attrs))
+    elif attrs is not None:
+      attrs = set(attrs)
+    self._pool[item] = attrs
+
+  def _mark(self, type_name, id_value, attrs):
+    """Mark object to be reindexed merging changed attributes."""
+    ids = self.model_ids_to_reindex[type_name]
+    model_attrs = self.model_attrs_to_reindex[type_name]
+    if id_value in ids and id_value not in model_attrs:
+      # Complete reindex was requested already
+      return
+    if attrs is None:
+      model_attrs.pop(id_value, None)
+    else:
+      model_attrs.setdefault(id_value, set()).update(attrs)
+    ids.add(id_value)
 
   @helpers.without_sqlalchemy_cache
   def warmup(self):
     """Function on pre-commit that collects objects keychain."""
     while self._pool:
-      for_index = self._pool.pop()
+      for_index, attrs = self._pool.popitem()
       if for_index not in db.session:
         continue
       type_name, id_value = for_index.get_reindex_pair()
@@ -48,7 +81,19 @@ class ReindexSet(threading.local):
       if id_value is None:
         db.session.flush()
         type_name, id_value = for_index.get_reindex_pair()
-      self.model_ids_to_reindex[type_name].add(id_value)
+      if type_name != for_index.__class__.__name__:
+        # Changed attributes belong to another object, e.g. CAV, so all the
+        # properties of the reindexed object are rebuilt.
+        attrs = None
+      self._mark(type_name, id_value, attrs)
+
+  def enqueue(self):
+    """Put collected objects to the indexing queue."""
+    with benchmark("enqueue objects for indexing"):
+      self.queued_count += queue.enqueue(self.model_ids_to_reindex,
+                                         self.model_attrs_to_reindex)
+      self.model_ids_to_reindex.clear()
+      self.model_attrs_to_reindex.clear()
 
   @helpers.without_sqlalchemy_cache
   def indexing_hook(self):
@@ -58,64 +103,112 @@ class ReindexSet(threading.local):
       self.warmup()
       if self.model_ids_to_reindex:
         if reindex_on_commit():
-          update_ft_records(self.model_ids_to_reindex, self.CHUNK_SIZE)
+          update_ft_records(self.model_ids_to_reindex, self.CHUNK_SIZE,
+                            self.model_attrs_to_reindex)
+        elif queue.is_enabled():
+          # Queue entries are committed together with the changed objects
+          self.enqueue()
       # else: Indexing task will be created in after_request hook
 
 
+def _group_ids_by_attrs(ids, ids_attrs):
+  """Group ids by changed attributes, None key is used for complete reindex.
+  """
+  groups = defaultdict(list)
+  for id_ in ids:
+    attrs = ids_attrs.get(id_)
+    groups[frozenset(attrs) if attrs is not None else None].append(id_)
+  return groups
+
+
 @helpers.without_sqlalchemy_cache
-def update_ft_records(model_ids_to_reindex, chunk_size):
-  """Update fulltext records in DB"""
+def update_ft_records(model_ids_to_reindex, chunk_size,
+                      model_attrs_to_reindex=None):
+  """Update fulltext records in DB
+
+  Args:
+    model_ids_to_reindex: dict of model names and ids to reindex.
+    chunk_size: number of objects reindexed at once.
+    model_attrs_to_reindex: dict of model names and dicts of ids with
+        changed attributes names for objects that require partial reindex.
+  """
+  if model_attrs_to_reindex is None:
+    model_attrs_to_reindex = {}
   with benchmark("indexing. expire objects in session"):
     for obj in db.session:
       if (isinstance(obj, mixin.Indexed) and
               ('id' not in obj.__dict__ or  # check if the object is expired
                obj.id in model_ids_to_reindex.get(obj.type, set()))):
         db.session.expire(obj)
+  result_cache.mark_changed(model_ids_to_reindex.keys())
   with benchmark("indexing. update ft records in db"):
     for model_name in model_ids_to_reindex.keys():
       ids = model_ids_to_reindex.pop(model_name)
-      chunk_list = utils.list_chunks(list(ids), chunk_size=chunk_size)
-      for ids_chunk in chunk_list:
-        get_model(model_name).bulk_record_update_for(ids_chunk)
-
-
-def _runner(mapper, content, target):  # pylint:disable=unused-argument
+      ids_attrs = {
+          int(id_): attrs
+          for id_, attrs in model_attrs_to_reindex.pop(model_name, {}).items()
+      }
+      model = get_model(model_name)
+      for attrs, attrs_ids in _group_ids_by_attrs(ids, ids_attrs).items():
+        chunk_list = utils.list_chunks(attrs_ids, chunk_size=chunk_size)
+        for ids_chunk in chunk_list:
+          model.bulk_record_update_for(ids_chunk, changed_attrs=attrs)
+
+
+def _runner(mapper, content, target, changed_attrs=None):
   """Collect all reindex models in session"""
+  # pylint:disable=unused-argument
   # with benchmark("collect reindex models in session"):
   ggrc_indexer = fulltext.get_indexer()
   db.session.reindex_set = getattr(db.session, "reindex_set", ReindexSet())
-  getters = ggrc_indexer.indexer_rules.get(target.__class__.__name__) or []
+  result_cache.mark_changed([target.__class__.__name__])
+  rules = ggrc_indexer.indexer_rules.get(target.__class__.__name__) or []
   fields = ggrc_indexer.indexer_fields.get(target.__class__.__name__)
-  for getter in getters:
+  for rule in rules:
     if fields and not fields_changed(target, fields):
       continue
-    to_index_list = getter(target)
+    to_index_list = rule.rule(target)
     if not isinstance(to_index_list, Iterable):
       to_index_list = [to_index_list]
     for to_index in to_index_list:
-      db.session.reindex_set.add(to_index)
+      db.session.reindex_set.add(to_index, rule.attrs)
   if isinstance(target, mixin.Indexed):
-    db.session.reindex_set.add(target)
+    db.session.reindex_set.add(target, changed_attrs)
 
 
-def register_fulltext_listeners():
-  """Indexing initialization procedure"""
-  ggrc_indexer = fulltext.get_indexer()
+def _update_runner(mapper, content, target):
+  """Collect reindex models in session with changed attributes of target"""
+  _runner(mapper, content, target, get_changed_attrs(target))
 
+
+def _collect_reindex_rules(ggrc_indexer):
+  """Collect AUTO_REINDEX_RULES of indexed models and their mixins"""
   for model in all_models.all_models:
     if not issubclass(model, mixin.Indexed):
       continue
     for sub_model in model.mro():
       for rule in getattr(sub_model, "AUTO_REINDEX_RULES", []):
-        ggrc_indexer.indexer_rules[rule.model].append(rule.rule)
+        if rule in ggrc_indexer.indexer_rules[rule.model]:
+          # Rules of mixins are collected for every model using them
+          continue
+        ggrc_indexer.indexer_rules[rule.model].append(rule)
         if rule.fields:
           ggrc_indexer.indexer_fields[rule.model].update(rule.fields)
 
+
+def register_fulltext_listeners():
+  """Indexing initialization procedure"""
+  ggrc_indexer = fulltext.get_indexer()
+  _collect_reindex_rules(ggrc_indexer)
+
   for model in all_models.all_models:
     if issubclass(model, mixin.Indexed) or \
             model.__name__ in ggrc_indexer.indexer_rules:
       for action in ACTIONS:
-        event.listen(model, action, _runner)
+        if action == "after_update":
+          event.listen(model, action, _update_runner)
+        else:
+          event.listen(model, action, _runner)
 
 
 def fields_changed(obj, fields):
@@ -124,3 +217,11 @@ def fields_changed(obj, fields):
     if getattr(sa.inspect(obj).attrs, field).history.has_changes():
       return True
   return False
+
+
+def get_changed_attrs(obj):
+  """Get names of object attributes changed in the current flush"""
+  return {
+      attr.key for attr in sa.inspect(obj).attrs
+      if attr.history.has_changes()
+  }
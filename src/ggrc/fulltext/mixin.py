@@ -9,16 +9,58 @@ from sqlalchemy import orm
 from ggrc import db
 
 from ggrc import fulltext
+from ggrc import settings
+from ggrc.fulltext import shadow
 from ggrc import utils
 from ggrc.models.reflection import AttributeInfo
 
 
-class ReindexRule(namedtuple("ReindexRule", ["model", "rule", "fields"])):
-  """Class for keeping reindex rules"""
+RECORD_KEY_FIELDS = ("key", "type", "property", "subproperty")
+RECORD_VALUE_FIELDS = ("tags", "content")
+
+
+def get_record_key(record):
+  """Get primary key of fulltext record represented as dict."""
+  return tuple(record[field] for field in RECORD_KEY_FIELDS)
+
+
+def diff_records(existing_records, new_records):
+  """Compare existing fulltext records with the new ones.
+
+  Args:
+    existing_records: iterable of dicts with records stored in DB.
+    new_records: iterable of dicts with records that should be stored.
+
+  Returns:
+    tuple of lists (to_insert, to_update, to_delete) with records that should
+    be inserted, records with changed content and keys of obsolete records.
+  """
+  existing = {get_record_key(record): record for record in existing_records}
+  to_insert = []
+  to_update = []
+  for record in new_records:
+    old_record = existing.pop(get_record_key(record), None)
+    if old_record is None:
+      to_insert.append(record)
+    elif any(old_record[field] != record[field]
+             for field in RECORD_VALUE_FIELDS):
+      to_update.append(record)
+  to_delete = [dict(zip(RECORD_KEY_FIELDS, key)) for key in existing]
+  return to_insert, to_update, to_delete
+
+
+class ReindexRule(namedtuple("ReindexRule",
+                             ["model", "rule", "fields", "attrs"])):
+  """Class for keeping reindex rules
+
+  Fields are the attributes of the rule model that trigger the reindex, attrs
+  are the attributes of reindexed objects affected by the change. If attrs
+  are not specified all the properties of reindexed objects are rebuilt.
+  """
   __slots__ = ()
 
-  def __new__(cls, model, rule, fields=None):
-    return super(ReindexRule, cls).__new__(cls, model, rule, fields)
+  def __new__(cls, model, rule, fields=None, attrs=None):
+    return super(ReindexRule, cls).__new__(cls, model, rule, fields, attrs)
 
 
 # pylint: disable=too-few-public-methods
@@ -39,21 +81,49 @@ class Indexed(object):
     return (self.__class__.__name__, self.id)
 
   @classmethod
-  def insert_records(cls, ids):
-    """Calculate and insert records into fulltext_record_properties table."""
+  def get_records(cls, ids, fulltext_attrs=None):
+    """Calculate fulltext records for instances with sent ids.
+
+    Args:
+      ids: ids of instances.
+      fulltext_attrs: list of fulltext attributes to build records for or
+          None to build all the records.
+    """
     instances = cls.indexed_query().filter(cls.id.in_(ids))
     indexer = fulltext.get_indexer()
-    rows = itertools.chain(*[indexer.records_generator(i) for i in instances])
-    for vals_chunk in utils.iter_chunks(rows, chunk_size=10000):
-      query = """
-          INSERT INTO fulltext_record_properties (
-            `key`, type, tags, property, subproperty, content
-          ) VALUES (:key, :type, :tags, :property, :subproperty, :content)
-      """
+    return itertools.chain(*[
+        indexer.records_generator(i, fulltext_attrs) for i in instances
+    ])
+
+  @staticmethod
+  def _insert_rows(rows):
+    """Insert record rows into fulltext_record_properties table.
+
+    Returns:
+      number of inserted rows.
+    """
+    query = """
+        INSERT INTO fulltext_record_properties (
+          `key`, type, tags, property, subproperty, content
+        ) VALUES (:key, :type, :tags, :property, :subproperty, :content)
+    """
+    inserted = 0
+    for vals_chunk in utils.iter_chunks(iter(rows), chunk_size=10000):
       values = list(vals_chunk)
       if not values:
-        return
+        break
       db.session.execute(query, values)
+      inserted += len(values)
+    return inserted
+
+  @classmethod
+  def insert_records(cls, ids):
+    """Calculate and insert records into fulltext_record_properties table.
+
+    Returns:
+      number of inserted rows.
+    """
+    return cls._insert_rows(cls.get_records(ids))
 
   @classmethod
   def get_delete_query_for(cls, ids):
@@ -69,22 +139,112 @@ class Indexed(object):
 
   @classmethod
   def delete_records(cls, ids):
-    """Delete records from fulltext_record_properties table."""
+    """Delete records from fulltext_record_properties table.
+
+    Returns:
+      number of deleted rows.
+    """
     query = """
         DELETE FROM fulltext_record_properties
         WHERE fulltext_record_properties.type = :obj_type AND
               fulltext_record_properties.key IN :obj_ids
     """
-    db.session.execute(query, {"obj_type": cls.__name__, "obj_ids": ids})
+    result = db.session.execute(
+        query, {"obj_type": cls.__name__, "obj_ids": ids})
+    return result.rowcount
 
   @classmethod
-  def bulk_record_update_for(cls, ids):
-    """Bulky update index records for current class"""
+  def get_existing_records(cls, ids, properties=None):
+    """Get records stored in fulltext_record_properties table for ids.
+
+    Args:
+      ids: ids of instances.
+      properties: names of properties to get records for or None to get
+          all the records.
+    """
+    query = """
+        SELECT `key`, type, tags, property, subproperty, content
+        FROM fulltext_record_properties
+        WHERE fulltext_record_properties.type = :obj_type AND
+              fulltext_record_properties.key IN :obj_ids
+    """
+    params = {"obj_type": cls.__name__, "obj_ids": ids}
+    if properties is not None:
+      if not properties:
+        return []
+      query += " AND fulltext_record_properties.property IN :properties"
+      params["properties"] = list(properties)
+    result = db.session.execute(query, params)
+    return [dict(zip(result.keys(), row)) for row in result]
+
+  @classmethod
+  def incremental_record_update_for(cls, ids, changed_attrs=None):
+    """Update index records for ids writing only changed rows.
+
+    Args:
+      ids: ids of instances to reindex.
+      changed_attrs: names of changed instance attributes. Only fulltext
+          properties depending on them are rebuilt if specified.
+
+    Returns:
+      number of inserted, updated and deleted rows.
+    """
+    fulltext_attrs = properties = None
+    if changed_attrs is not None:
+      builder = fulltext.get_indexer().get_builder(cls)
+      fulltext_attrs = builder.get_affected_attrs(changed_attrs)
+      if fulltext_attrs is not None:
+        properties = builder.get_property_names(fulltext_attrs)
+    to_insert, to_update, to_delete = diff_records(
+        cls.get_existing_records(ids, properties),
+        cls.get_records(ids, fulltext_attrs),
+    )
+    # Obsolete records are removed first, so that records which primary key
+    # differs only in letter case can be inserted afterwards.
+    if to_delete:
+      db.session.execute("""
+          DELETE FROM fulltext_record_properties
+          WHERE `key` = :key AND type = :type AND
+                property = :property AND subproperty = :subproperty
+      """, to_delete)
+    if to_update:
+      db.session.execute("""
+          UPDATE fulltext_record_properties
+          SET tags = :tags, content = :content
+          WHERE `key` = :key AND type = :type AND
+                property = :property AND subproperty = :subproperty
+      """, to_update)
+    cls._insert_rows(to_insert)
+    return len(to_insert) + len(to_update) + len(to_delete)
+
+  @classmethod
+  def bulk_record_update_for(cls, ids, incremental=None,
+                             changed_attrs=None):
+    """Bulky update index records for current class
+
+    Args:
+      ids: ids of instances to reindex.
+      incremental: write only changed records instead of deleting and
+          inserting all of them. FULLTEXT_INCREMENTAL_REINDEX setting is used
+          if not specified.
+      changed_attrs: names of changed instance attributes. If specified,
+          only properties depending on them are rebuilt incrementally.
+
+    Returns:
+      number of written rows.
+    """
     if not ids:
-      return
+      return 0
+    shadow.mark_changed(cls.__name__, ids)
+    if changed_attrs is not None:
+      return cls.incremental_record_update_for(ids, changed_attrs)
+    if incremental is None:
+      incremental = getattr(settings, "FULLTEXT_INCREMENTAL_REINDEX", False)
+    if incremental:
+      return cls.incremental_record_update_for(ids)
 
-    cls.delete_records(ids)
-    cls.insert_records(ids)
+    deleted = cls.delete_records(ids)
+    return deleted + cls.insert_records(ids)
 
   @classmethod
   def indexed_query(cls):
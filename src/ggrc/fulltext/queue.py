@@ -0,0 +1,331 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""DB backed queue of objects waiting for fulltext reindex.
+
+Write requests put (type, id) pairs of changed objects into the
+fulltext_index_queue table in the same transaction as the changes themselves.
+Repeated changes of the same object are coalesced into a single queue entry
+until some indexing worker claims it.
+
+Workers are background tasks draining the queue in batches. A batch is
+claimed by setting its unique name and lease expiration time on queue
+entries, entries of a batch left by a failed worker are taken over by another
+worker after the lease expiration. Number of concurrently running workers is
+limited by FULLTEXT_INDEXING_QUEUE_WORKERS setting, the limit is checked
+under the lock of the fulltext_index_queue_state row, so concurrent requests
+don't start extra workers.
+"""
+
+import datetime
+import logging
+import time
+import uuid
+from collections import defaultdict
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import settings
+from ggrc.utils import benchmark
+from ggrc.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+WORKER_TASK_NAME = "indexing_queue"
+
+METRIC_GROUP = "fulltext_indexing_queue"
+
+# Coalesced list of changed attributes longer than this limit is replaced
+# with complete reindex of the object.
+MAX_ATTRS_LENGTH = 1000
+
+UNCLAIMED = ""
+
+# The only row of fulltext_index_queue_state locked by worker scheduling
+STATE_ID = 1
+
+
+class FulltextIndexQueueItem(db.Model):
+  """Object waiting for fulltext reindex."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_index_queue"
+
+  id = db.Column(db.Integer, primary_key=True)
+  object_type = db.Column(db.String(250), nullable=False)
+  object_id = db.Column(db.Integer, nullable=False)
+  # Comma separated names of changed attributes, NULL for complete reindex
+  attrs = db.Column(db.Text, nullable=True)
+  batch = db.Column(db.String(36), nullable=False, default=UNCLAIMED)
+  created_at = db.Column(db.DateTime, nullable=False)
+  leased_until = db.Column(db.DateTime, nullable=True)
+
+  __table_args__ = (
+      db.UniqueConstraint("object_type", "object_id", "batch",
+                          name="uq_fulltext_index_queue_object"),
+      db.Index("ix_fulltext_index_queue_batch", "batch"),
+  )
+
+
+class FulltextIndexQueueState(db.Model):
+  """Row locked while the number of running indexing workers is checked."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_index_queue_state"
+
+  id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+
+def is_enabled():
+  """Check if changed objects should be reindexed through the queue."""
+  return getattr(settings, "FULLTEXT_INDEXING_QUEUE", False)
+
+
+def _serialize_attrs(attrs):
+  """Convert set of attribute names to queue entry attrs value."""
+  if attrs is None:
+    return None
+  return ",".join(sorted(attrs))
+
+
+def _parse_attrs(attrs):
+  """Convert queue entry attrs value to set of attribute names."""
+  if attrs is None:
+    return None
+  return {attr for attr in attrs.split(",") if attr}
+
+
+def enqueue(model_ids_to_reindex, model_attrs_to_reindex=None):
+  """Put objects to the queue coalescing them with already queued ones.
+
+  Args:
+    model_ids_to_reindex: dict of model names and ids to reindex.
+    model_attrs_to_reindex: dict of model names and dicts of ids with
+        changed attributes names for objects that require partial reindex.
+
+  Returns:
+    number of enqueued objects.
+  """
+  model_attrs_to_reindex = model_attrs_to_reindex or {}
+  now = datetime.datetime.utcnow()
+  rows = []
+  for model_name, ids in model_ids_to_reindex.items():
+    ids_attrs = model_attrs_to_reindex.get(model_name, {})
+    for id_ in ids:
+      rows.append({
+          "object_type": model_name,
+          "object_id": id_,
+          "attrs": _serialize_attrs(ids_attrs.get(id_)),
+          "created_at": now,
+      })
+  if not rows:
+    return 0
+  # Unclaimed entry of an object is updated, so the oldest change time
+  # is kept and the changed attributes are merged.
+  db.session.execute(
+      sa.text("""
+          INSERT INTO fulltext_index_queue
+              (object_type, object_id, attrs, batch, created_at)
+          VALUES (:object_type, :object_id, :attrs, '', :created_at)
+          ON DUPLICATE KEY UPDATE attrs = IF(
+              attrs IS NULL OR VALUES(attrs) IS NULL OR
+                  LENGTH(attrs) + LENGTH(VALUES(attrs)) > {max_length},
+              NULL,
+              CONCAT(attrs, ',', VALUES(attrs))
+          )
+      """.format(max_length=MAX_ATTRS_LENGTH)),
+      rows,
+  )
+  metrics.incr(METRIC_GROUP, "enqueued", len(rows))
+  return len(rows)
+
+
+def _take_over_expired_batch(now, leased_until):
+  """Claim entries of a batch left by a failed worker."""
+  item = FulltextIndexQueueItem
+  batch = db.session.query(item.batch).filter(
+      item.batch != UNCLAIMED,
+      item.leased_until < now,
+  ).limit(1).scalar()
+  if not batch:
+    return None
+  taken = item.query.filter(
+      item.batch == batch,
+      item.leased_until < now,
+  ).update({item.leased_until: leased_until}, synchronize_session=False)
+  if not taken:
+    # Another worker was faster
+    return None
+  logger.warning("Indexing queue batch %s lease expired, taking it over",
+                 batch)
+  metrics.incr(METRIC_GROUP, "expired_batches")
+  return batch
+
+
+def claim_batch(batch_size, lease_time):
+  """Claim a batch of queue entries for processing.
+
+  Returns:
+    name of the claimed batch or None if there is nothing to process.
+  """
+  now = datetime.datetime.utcnow()
+  leased_until = now + datetime.timedelta(seconds=lease_time)
+  batch = _take_over_expired_batch(now, leased_until)
+  if batch is None:
+    batch = str(uuid.uuid4())
+    claimed = db.session.execute(
+        sa.text("""
+            UPDATE fulltext_index_queue
+            SET batch = :batch, leased_until = :leased_until
+            WHERE batch = ''
+            ORDER BY id
+            LIMIT :batch_size
+        """),
+        {"batch": batch, "leased_until": leased_until,
+         "batch_size": batch_size},
+    ).rowcount
+    if not claimed:
+      batch = None
+  db.session.plain_commit()
+  return batch
+
+
+def process_batch(batch, chunk_size):
+  """Reindex objects of the claimed batch and drop them from the queue.
+
+  Returns:
+    number of reindexed objects.
+  """
+  from ggrc.fulltext import listeners
+  item = FulltextIndexQueueItem
+  entries = db.session.query(
+      item.object_type, item.object_id, item.attrs, item.created_at,
+  ).filter(item.batch == batch).all()
+  model_ids = defaultdict(set)
+  model_attrs = defaultdict(dict)
+  for object_type, object_id, attrs, _ in entries:
+    model_ids[object_type].add(object_id)
+    if attrs is not None:
+      model_attrs[object_type][object_id] = _parse_attrs(attrs)
+  with benchmark("indexing queue. update ft records"):
+    listeners.update_ft_records(model_ids, chunk_size, model_attrs)
+  item.query.filter(item.batch == batch).delete(synchronize_session=False)
+  db.session.plain_commit()
+
+  now = datetime.datetime.utcnow()
+  for _, _, _, created_at in entries:
+    metrics.observe(METRIC_GROUP, "lag_seconds",
+                    (now - created_at).total_seconds())
+  metrics.incr(METRIC_GROUP, "processed", len(entries))
+  metrics.incr(METRIC_GROUP, "batches")
+  return len(entries)
+
+
+def process(chunk_size=None, batch_size=None, lease_time=None,
+            time_limit=None):
+  """Drain the queue until it is empty or worker time limit is reached.
+
+  Returns:
+    tuple of number of reindexed objects and flag showing that queue
+    was drained completely.
+  """
+  from ggrc.fulltext import listeners
+  chunk_size = chunk_size or listeners.ReindexSet.CHUNK_SIZE
+  batch_size = batch_size or settings.FULLTEXT_INDEXING_QUEUE_BATCH_SIZE
+  lease_time = lease_time or settings.FULLTEXT_INDEXING_QUEUE_LEASE_TIME
+  time_limit = time_limit or settings.FULLTEXT_INDEXING_QUEUE_WORKER_TIME
+  deadline = time.time() + time_limit
+  processed = 0
+  while time.time() < deadline:
+    batch = claim_batch(batch_size, lease_time)
+    if batch is None:
+      return processed, True
+    processed += process_batch(batch, chunk_size)
+  return processed, False
+
+
+def _lock_workers():
+  """Lock the queue state row until the end of the transaction.
+
+  The row is created on first use, upsert locks it in both cases.
+  """
+  db.session.execute(
+      sa.text("""
+          INSERT INTO fulltext_index_queue_state (id) VALUES (:id)
+          ON DUPLICATE KEY UPDATE id = id
+      """),
+      {"id": STATE_ID},
+  )
+
+
+def _active_workers_count():
+  """Count indexing workers that are pending or running now."""
+  from ggrc.models import all_models
+  task = all_models.BackgroundTask
+  # Tasks not updated during the lease time are considered as dead
+  alive_since = datetime.datetime.utcnow() - datetime.timedelta(
+      seconds=settings.FULLTEXT_INDEXING_QUEUE_LEASE_TIME)
+  name_pattern = "%" + "_{}".format(WORKER_TASK_NAME).replace("_", "/_")
+  # Locking read sees tasks committed after the start of the transaction
+  return db.session.query(sa.func.count(task.id)).filter(
+      task.name.like(name_pattern, escape="/"),
+      task.status.in_((task.PENDING_STATUS, task.RUNNING_STATUS)),
+      task.updated_at >= alive_since,
+  ).with_for_update(read=True).scalar()
+
+
+def schedule_worker(force=False):
+  """Create indexing worker background task if workers limit allows it.
+
+  Worker limit is checked under the lock held until the caller ends the
+  transaction.
+
+  Args:
+    force: create worker regardless of the limit, used by a worker to
+        schedule its own replacement.
+
+  Returns:
+    created BackgroundTask or None.
+  """
+  from flask import url_for
+  from ggrc.models import background_task
+  from ggrc.views import bg_process_indexing_queue
+
+  if not force:
+    _lock_workers()
+    if _active_workers_count() >= settings.FULLTEXT_INDEXING_QUEUE_WORKERS:
+      return None
+  with benchmark("Create indexing queue worker bg task"):
+    return background_task.create_task(
+        name=WORKER_TASK_NAME,
+        url=url_for(bg_process_indexing_queue.__name__),
+        queued_callback=bg_process_indexing_queue,
+    )
+
+
+def schedule_worker_job():
+  """Cron job starting a worker in case queue was left without workers."""
+  if not is_enabled() or not get_queue_size():
+    return
+  schedule_worker()
+  # Releases the workers lock even if no worker was created
+  db.session.commit()
+
+
+def get_queue_size():
+  """Get number of objects waiting for reindex."""
+  return FulltextIndexQueueItem.query.count()
+
+
+def get_stats():
+  """Get queue counters together with current queue length and lag."""
+  item = FulltextIndexQueueItem
+  size, oldest = db.session.query(
+      sa.func.count(item.id), sa.func.min(item.created_at),
+  ).one()
+  stats = metrics.get(METRIC_GROUP)
+  stats["size"] = size
+  stats["oldest_entry_age_seconds"] = (
+      (datetime.datetime.utcnow() - oldest).total_seconds() if oldest else 0
+  )
+  return stats
@@ -5,11 +5,16 @@
 
 import logging
 
+import sqlalchemy as sa
+from sqlalchemy import orm
+
 from ggrc import db
+from ggrc.access_control import role
 from ggrc.models import all_models
 from ggrc.models.reflection import AttributeInfo
 from ggrc.models.person import Person
 from ggrc.models.mixins import CustomAttributable
+from ggrc.fulltext.attributes import CustomRoleAttr
 from ggrc.fulltext.attributes import FullTextAttr
 from ggrc.fulltext.mixin import Indexed
 
@@ -22,11 +27,71 @@ class RecordBuilder(object):
   # pylint: disable=too-few-public-methods
 
   def __init__(self, tgt_class, indexer):
+    self._tgt_class = tgt_class
     self._fulltext_attrs = AttributeInfo.gather_attrs(
         tgt_class, '_fulltext_attrs')
     self.indexer = indexer
 
-  def _get_properties(self, obj):
+  def _get_local_attr_names(self, prop):
+    """Get names of attributes mapped to local columns of relationship."""
+    mapper = sa.inspect(self._tgt_class)
+    names = set()
+    for column in prop.local_columns:
+      try:
+        names.add(mapper.get_property_by_column(column).key)
+      except orm.exc.UnmappedColumnError:
+        continue
+    return names
+
+  def _is_affected(self, attr, changed_attrs):
+    """Check if value of fulltext attr depends on changed attributes."""
+    if isinstance(attr, CustomRoleAttr):
+      return attr.alias in changed_attrs
+    getter = attr.prop_getter if isinstance(attr, FullTextAttr) else attr
+    if callable(getter) or getter in changed_attrs:
+      return True
+    prop = sa.inspect(self._tgt_class).attrs.get(getter)
+    if prop is None:
+      # Python property, its dependencies are unknown
+      return True
+    if isinstance(prop, orm.RelationshipProperty):
+      return bool(self._get_local_attr_names(prop) & changed_attrs)
+    return False
+
+  def get_affected_attrs(self, changed_attrs):
+    """Get fulltext attrs depending on changed attributes of object.
+
+    Custom attribute values are not included as they are reindexed by
+    changes of CustomAttributeValue objects.
+
+    Returns:
+      list of fulltext attributes or None if partial reindex is not supported
+      for the class.
+    """
+    if self._tgt_class.__name__ == "Snapshot":
+      return None
+    changed_attrs = set(changed_attrs)
+    return [attr for attr in self._fulltext_attrs
+            if self._is_affected(attr, changed_attrs)]
+
+  def get_property_names(self, fulltext_attrs):
+    """Get names of index properties built for fulltext attrs."""
+    names = set()
+    for attr in fulltext_attrs:
+      if isinstance(attr, CustomRoleAttr):
+        names.update(role.get_ac_roles_for(self._tgt_class.__name__).keys())
+      elif isinstance(attr, FullTextAttr):
+        if issubclass(self._tgt_class, Indexed):
+          names.add(self._tgt_class.get_fulltext_attr_name(attr))
+        else:
+          names.add(attr.alias)
+      elif issubclass(self._tgt_class, Indexed):
+        names.add(self._tgt_class.PROPERTY_TEMPLATE.format(attr))
+      else:
+        names.add(attr)
+    return names
+
+  def _get_properties(self, obj, fulltext_attrs=None):
     """Get indexable properties and values.
 
     Properties should be returned in the following format:
@@ -56,8 +121,10 @@ class RecordBuilder(object):
     else:
       property_tmpl = u"{}"
 
+    if fulltext_attrs is None:
+      fulltext_attrs = self._fulltext_attrs
     properties = {}
-    for attr in self._fulltext_attrs:
+    for attr in fulltext_attrs:
       if isinstance(attr, basestring):
         properties[property_tmpl.format(attr)] = {"": getattr(obj, attr)}
       elif isinstance(attr, FullTextAttr):
@@ -166,9 +233,11 @@ class RecordBuilder(object):
         properties[attribute_name] = {"": cad.get_indexed_value(value)}
     return properties
 
-  def get_properties(self, obj):
+  def get_properties(self, obj, fulltext_attrs=None):
     """Generate record representation for an object.
 
+    If fulltext_attrs are specified only their properties are generated.
+
     Properties should be returned in the following format:
     {
       property1: {
@@ -180,6 +249,8 @@ class RecordBuilder(object):
     }
     If there is no subproperty - empty string is used as a key
     """
+    if fulltext_attrs is not None:
+      return self._get_properties(obj, fulltext_attrs)
     properties = self._get_properties(obj)
     properties.update(self._get_cav_properties(obj))
     return properties
@@ -0,0 +1,362 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Parallel resumable full reindex.
+
+Full reindex is partitioned into units of REINDEX_UNIT_SIZE consecutive ids
+of an indexed model stored in the fulltext_reindex_units table, and units are
+reindexed in a pool of REINDEX_MAX_WORKERS processes with their own DB
+connections. Every unit is marked as finished in the table together with the
+number of reindexed objects and the time it took.
+
+Reindex started while units of the previous reindex are left unfinished,
+e.g. when its task was killed, continues the previous reindex instead of
+starting a new one. Concurrent reindexes are not supported, units of a
+running reindex would be processed twice.
+
+Shadow reindex writes records into the shadow table swapped with the live
+one at the end, see ggrc.fulltext.shadow. Objects updated after the start of
+the reindex and objects which live records were changed or deleted while the
+shadow table exists are reindexed in the shadow table before the swap.
+Objects updated or changed during the swap are reindexed in the live table
+after it.
+"""
+
+import datetime
+import logging
+import uuid
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import shadow as shadow_table
+from ggrc.query import result_cache
+from ggrc.utils import benchmark
+from ggrc.utils import concurrency
+from ggrc.utils import helpers
+from ggrc.utils import list_chunks
+from ggrc.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_GROUP = "fulltext_reindex"
+
+# Snapshots are not Indexed, their units are reindexed by snapshot indexer
+SNAPSHOT_TYPE = "Snapshot"
+
+# Number of objects reindexed in a single transaction
+REINDEX_CHUNK_SIZE = 100
+
+
+class ReindexUnit(db.Model):
+  """Range of object ids of a model reindexed together."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_reindex_units"
+
+  id = db.Column(db.Integer, primary_key=True)
+  reindex = db.Column(db.String(36), nullable=False)
+  object_type = db.Column(db.String(250), nullable=False)
+  first_id = db.Column(db.Integer, nullable=False)
+  last_id = db.Column(db.Integer, nullable=False)
+  # Number of reindexed objects, set when the unit is finished
+  records = db.Column(db.Integer, nullable=True)
+  started_at = db.Column(db.DateTime, nullable=True)
+  finished_at = db.Column(db.DateTime, nullable=True)
+
+  __table_args__ = (
+      db.Index("ix_fulltext_reindex_units_reindex", "reindex", "finished_at"),
+  )
+
+
+def get_indexed_models():
+  """Get indexed models requiring full reindex by their names."""
+  from ggrc.fulltext import mixin
+  from ggrc.models import all_models
+  return {
+      model.__name__: model for model in all_models.all_models
+      if issubclass(model, mixin.Indexed) and model.REQUIRED_GLOBAL_REINDEX
+  }
+
+
+def _get_model(object_type):
+  """Get model reindexed by units of the type."""
+  from ggrc.models import all_models
+  return getattr(all_models, object_type)
+
+
+def _get_ids(model, first_id=None, last_id=None):
+  """Get sorted object ids of the model in the range."""
+  query = db.session.query(model.id)
+  if first_id is not None:
+    query = query.filter(model.id.between(first_id, last_id))
+  return [id_ for id_, in query.order_by(model.id)]
+
+
+def _create_reindex(object_types, unit_size):
+  """Partition objects of the types into reindex units.
+
+  Units of previous reindexes are dropped.
+
+  Returns:
+    name of the created reindex.
+  """
+  reindex = str(uuid.uuid4())
+  ReindexUnit.query.delete()
+  units = []
+  for object_type in object_types:
+    ids = _get_ids(_get_model(object_type))
+    units.extend({
+        "reindex": reindex,
+        "object_type": object_type,
+        "first_id": ids_chunk[0],
+        "last_id": ids_chunk[-1],
+    } for ids_chunk in list_chunks(ids, unit_size))
+  if units:
+    db.session.execute(ReindexUnit.__table__.insert(), units)
+  db.session.plain_commit()
+  logger.info("Reindex %s is partitioned into %s units", reindex,
+              len(units))
+  return reindex
+
+
+def _get_unfinished_reindex(with_snapshots, shadow):
+  """Get name of the unfinished reindex of the same kind or None."""
+  unit = ReindexUnit
+  reindex = db.session.query(unit.reindex).filter(
+      unit.finished_at.is_(None),
+  ).limit(1).scalar()
+  if reindex is None:
+    return None
+  has_snapshots = db.session.query(unit.query.filter(
+      unit.reindex == reindex,
+      unit.object_type == SNAPSHOT_TYPE,
+  ).exists()).scalar()
+  if has_snapshots != with_snapshots or shadow_table.exists() != shadow:
+    return None
+  return reindex
+
+
+def _get_records(object_type, ids):
+  """Build fulltext records of objects of the type."""
+  if object_type == SNAPSHOT_TYPE:
+    from ggrc.snapshotter import indexer as snapshot_indexer
+    return snapshot_indexer.get_snapshots_records(ids)
+  return _get_model(object_type).get_records(ids)
+
+
+def _reindex_objects(object_type, ids, shadow=False):
+  """Reindex objects of the type committing them in chunks."""
+  from ggrc.snapshotter import indexer as snapshot_indexer
+  for ids_chunk in list_chunks(ids, REINDEX_CHUNK_SIZE):
+    if shadow:
+      # Records of a unit interrupted before are written again
+      shadow_table.delete_records(object_type, ids_chunk)
+      shadow_table.insert_records(_get_records(object_type, ids_chunk))
+    elif object_type == SNAPSHOT_TYPE:
+      # Records of deleted snapshots are not removed by their reindex
+      snapshot_indexer.delete_records(ids_chunk)
+      snapshot_indexer.reindex_snapshots(ids_chunk)
+    else:
+      # All records are rewritten, diffing them with existing ones is slower
+      _get_model(object_type).bulk_record_update_for(ids_chunk,
+                                                     incremental=False)
+    db.session.plain_commit()
+
+
+@helpers.without_sqlalchemy_cache
+def reindex_unit(unit_id, shadow=False):
+  """Reindex objects of the unit and mark it finished.
+
+  Returns:
+    tuple of object type of the unit and number of reindexed objects.
+  """
+  unit = ReindexUnit.query.get(unit_id)
+  object_type = unit.object_type
+  started_at = datetime.datetime.utcnow()
+  ids = _get_ids(_get_model(object_type), unit.first_id, unit.last_id)
+  with benchmark("Reindex {} unit {}".format(object_type, unit_id)):
+    _reindex_objects(object_type, ids, shadow)
+  ReindexUnit.query.filter(ReindexUnit.id == unit_id).update({
+      ReindexUnit.records: len(ids),
+      ReindexUnit.started_at: started_at,
+      ReindexUnit.finished_at: datetime.datetime.utcnow(),
+  }, synchronize_session=False)
+  db.session.plain_commit()
+  return object_type, len(ids)
+
+
+def _reindex_unit_in_worker(unit):
+  """Reindex the unit given as (unit id, shadow) in a worker process."""
+  from ggrc.app import app
+  with app.app_context():
+    return reindex_unit(*unit)
+
+
+def _reindex_units(unit_ids, max_workers, shadow):
+  """Reindex units in the current process or in worker processes."""
+  if max_workers <= 1 or len(unit_ids) <= 1:
+    return [reindex_unit(unit_id, shadow) for unit_id in unit_ids]
+  # Every unit commits its changes, so the session must not keep any
+  # pending changes or locks while worker processes are running.
+  db.session.plain_commit()
+  return concurrency.map_in_processes(
+      _reindex_unit_in_worker,
+      [(unit_id, shadow) for unit_id in unit_ids],
+      max_workers,
+      initializer=concurrency.init_db_worker,
+  )
+
+
+def run(object_types, with_snapshots=False, max_workers=None,
+        unit_size=None, shadow=False, swap=None):
+  """Reindex all objects of the types continuing the unfinished reindex.
+
+  Args:
+    object_types: names of reindexed models.
+    with_snapshots: reindex snapshots after all other objects.
+    max_workers: number of worker processes, REINDEX_MAX_WORKERS setting
+        is used if not specified.
+    unit_size: max number of objects of a unit, REINDEX_UNIT_SIZE setting
+        is used if not specified.
+    shadow: write records into the shadow table instead of the live one.
+    swap: swap the filled shadow table in, FULLTEXT_SHADOW_SWAP setting is
+        used if not specified.
+
+  Returns:
+    name of the finished reindex.
+  """
+  max_workers = max_workers or settings.REINDEX_MAX_WORKERS
+  unit_size = unit_size or settings.REINDEX_UNIT_SIZE
+  reindex = _get_unfinished_reindex(with_snapshots, shadow)
+  if reindex is not None:
+    logger.info("Continuing unfinished reindex %s", reindex)
+    metrics.incr(METRIC_GROUP, "resumed")
+  else:
+    if shadow:
+      shadow_table.create()
+    if with_snapshots:
+      object_types = list(object_types) + [SNAPSHOT_TYPE]
+    reindex = _create_reindex(object_types, unit_size)
+  units = db.session.query(ReindexUnit.id, ReindexUnit.object_type).filter(
+      ReindexUnit.reindex == reindex,
+      ReindexUnit.finished_at.is_(None),
+  ).order_by(ReindexUnit.id).all()
+  # Snapshots are reindexed after all other objects
+  results = _reindex_units([id_ for id_, object_type in units
+                            if object_type != SNAPSHOT_TYPE],
+                           max_workers, shadow)
+  results.extend(_reindex_units([id_ for id_, object_type in units
+                                 if object_type == SNAPSHOT_TYPE],
+                                max_workers, shadow))
+  for object_type, records in results:
+    metrics.incr(METRIC_GROUP, "{}.records".format(object_type), records)
+  metrics.incr(METRIC_GROUP, "units", len(results))
+  for object_type, stats in sorted(get_stats(reindex).items()):
+    logger.info("Reindexed %s %s records at %.1f records/s", stats["records"],
+                object_type, stats["records_per_second"])
+  if shadow:
+    shadow_table.create_indexes()
+    if swap is None:
+      swap = settings.FULLTEXT_SHADOW_SWAP
+    if swap:
+      swap_shadow()
+  else:
+    result_cache.invalidate_all()
+  return reindex
+
+
+def _catch_up(object_types, since, shadow):
+  """Reindex objects of the types updated since the given time."""
+  for object_type in object_types:
+    model = _get_model(object_type)
+    if not hasattr(model, "updated_at"):
+      continue
+    ids = [id_ for id_, in db.session.query(model.id).filter(
+        model.updated_at >= since,
+    )]
+    _reindex_objects(object_type, ids, shadow)
+    metrics.incr(METRIC_GROUP, "caught_up", len(ids))
+
+
+def _replay_changes(object_types, shadow):
+  """Reindex objects logged as changed in the live table.
+
+  Records of deleted objects are deleted by their reindex.
+  """
+  for object_type, keys in sorted(shadow_table.get_changes().items()):
+    # Records of other types are copied from the live table
+    if object_type in object_types:
+      _reindex_objects(object_type, sorted(keys), shadow)
+      metrics.incr(METRIC_GROUP, "replayed", len(keys))
+
+
+def swap_shadow():
+  """Swap the shadow table filled by the last reindex in.
+
+  Raises:
+    ValueError if the shadow table is not filled or if it fails validation.
+  """
+  unit = ReindexUnit
+  since, unfinished = db.session.query(
+      sa.func.min(unit.started_at),
+      sa.func.count(unit.id) - sa.func.count(unit.finished_at),
+  ).one()
+  if since is None or unfinished or not shadow_table.exists():
+    raise ValueError("Shadow fulltext table is not filled")
+  object_types = [object_type for object_type, in
+                  db.session.query(unit.object_type).distinct()]
+  swapped_at = datetime.datetime.utcnow()
+  _catch_up(object_types, since, shadow=True)
+  _replay_changes(object_types, shadow=True)
+  shadow_table.copy_other_types(object_types)
+  db.session.plain_commit()
+  shadow_table.validate()
+  shadow_table.swap()
+  # Changes logged until the swap are applied to the new live table, all of
+  # them are replayed again as changes committed late may have lower ids.
+  # Writers stop logging changes as the shadow table doesn't exist any more.
+  _catch_up(object_types, swapped_at, shadow=False)
+  _replay_changes(object_types, shadow=False)
+  shadow_table.clear_changes()
+  db.session.plain_commit()
+  result_cache.invalidate_all()
+  metrics.incr(METRIC_GROUP, "swaps")
+
+
+def get_stats(reindex=None):
+  """Get progress and throughput of the reindex per object type.
+
+  Throughput of a type is the number of its reindexed records divided by the
+  time passed from the start of its first unit to the end of its last unit.
+
+  Args:
+    reindex: name of the reindex, the last one is used if not specified.
+
+  Returns:
+    dict of stats of every object type of the reindex.
+  """
+  unit = ReindexUnit
+  query = db.session.query(
+      unit.object_type,
+      sa.func.count(unit.id),
+      sa.func.count(unit.finished_at),
+      sa.func.sum(unit.records),
+      sa.func.min(unit.started_at),
+      sa.func.max(unit.finished_at),
+  ).group_by(unit.object_type)
+  if reindex is not None:
+    query = query.filter(unit.reindex == reindex)
+  stats = {}
+  for object_type, units, finished, records, started, ended in query:
+    records = int(records or 0)
+    seconds = (ended - started).total_seconds() if finished else 0
+    stats[object_type] = {
+        "units": units,
+        "finished_units": finished,
+        "records": records,
+        "seconds": seconds,
+        "records_per_second": records / seconds if seconds else 0,
+    }
+  return stats
@@ -0,0 +1,339 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Shadow copy of the fulltext index table.
+
+Full reindex writing into the live fulltext_record_properties table makes
+search results partial until it is finished and loads all the table indexes
+with its writes. Shadow reindex fills an empty copy of the table instead,
+optionally without its secondary indexes which are created after the bulk
+load, and swaps it with the live table by an atomic rename.
+
+While the shadow table exists, writers of the live table log objects which
+records they change or delete in the fulltext_shadow_changes table, see
+mark_changed(). Existence of the shadow table is checked once per
+transaction. Logged objects are reindexed in the shadow table before the
+swap and in the live table after it, see ggrc.fulltext.reindex.
+
+Before the swap records of types which are not reindexed are copied from the
+live table, and counts of records of every type are compared with the live
+table, so that a broken reindex is not swapped in. Shadow table can be
+compared with the live one for a sample of keys before the swap, see
+compare().
+"""
+
+import logging
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy import orm
+
+from ggrc import db
+from ggrc import settings
+from ggrc.utils import iter_chunks
+
+
+logger = logging.getLogger(__name__)
+
+LIVE_TABLE = "fulltext_record_properties"
+SHADOW_TABLE = "fulltext_record_properties_shadow"
+OLD_TABLE = "fulltext_record_properties_old"
+
+COLUMNS = ("key", "type", "tags", "property", "subproperty", "content")
+
+INSERT_CHUNK_SIZE = 10000
+
+# Session info key for existence of the shadow table seen by the current
+# transaction
+EXISTS_KEY = "fulltext_shadow_exists"
+
+
+class FulltextShadowChange(db.Model):
+  """Object which records were changed in the live table during reindex."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_shadow_changes"
+
+  id = db.Column(db.Integer, primary_key=True)
+  type = db.Column(db.String(64), nullable=False)
+  key = db.Column(db.Integer, nullable=False)
+
+
+def exists():
+  """Check if the shadow table exists."""
+  return db.session.execute(
+      sa.text("SHOW TABLES LIKE :table"), {"table": SHADOW_TABLE},
+  ).first() is not None
+
+
+def _exists_in_transaction():
+  """Check if the shadow table exists once per transaction."""
+  info = db.session().info
+  if EXISTS_KEY not in info:
+    info[EXISTS_KEY] = exists()
+  return info[EXISTS_KEY]
+
+
+def _forget_exists(session, *_):
+  """Check existence of the shadow table again in the next transaction."""
+  session.info.pop(EXISTS_KEY, None)
+
+
+def register_listeners():
+  """Register session listeners resetting the shadow table existence."""
+  event.listen(orm.Session, "after_commit", _forget_exists)
+  event.listen(orm.Session, "after_rollback", _forget_exists)
+
+
+def _get_indexes(table):
+  """Get definitions of secondary indexes of the table by their names."""
+  indexes = OrderedDict()
+  for row in db.session.execute("SHOW INDEX FROM {}".format(table)):
+    if row.Key_name == "PRIMARY":
+      continue
+    if row.Index_type == "FULLTEXT":
+      kind = "FULLTEXT INDEX"
+    else:
+      kind = "INDEX" if row.Non_unique else "UNIQUE INDEX"
+    column = "`{}`".format(row.Column_name)
+    if row.Sub_part:
+      column += "({})".format(row.Sub_part)
+    indexes.setdefault(row.Key_name, (kind, []))[1].append(column)
+  return indexes
+
+
+def create(defer_indexes=None):
+  """Create an empty shadow table dropping the existing one.
+
+  Args:
+    defer_indexes: create the table without secondary indexes, they are
+        created by create_indexes() after the table is filled.
+        FULLTEXT_SHADOW_DEFER_INDEXES setting is used if not specified.
+  """
+  if defer_indexes is None:
+    defer_indexes = settings.FULLTEXT_SHADOW_DEFER_INDEXES
+  FulltextShadowChange.query.delete()
+  db.session.execute("DROP TABLE IF EXISTS {}".format(SHADOW_TABLE))
+  db.session.execute("CREATE TABLE {} LIKE {}".format(SHADOW_TABLE,
+                                                      LIVE_TABLE))
+  db.session().info[EXISTS_KEY] = True
+  indexes = _get_indexes(SHADOW_TABLE)
+  if defer_indexes and indexes:
+    db.session.execute("ALTER TABLE {} {}".format(
+        SHADOW_TABLE,
+        ", ".join("DROP INDEX `{}`".format(name) for name in indexes),
+    ))
+
+
+def create_indexes():
+  """Create secondary indexes of the live table missing in the shadow one."""
+  shadow_indexes = _get_indexes(SHADOW_TABLE)
+  missing = [(name, kind, columns)
+             for name, (kind, columns) in _get_indexes(LIVE_TABLE).items()
+             if name not in shadow_indexes]
+  if not missing:
+    return
+  logger.info("Creating %s indexes of the shadow fulltext table",
+              len(missing))
+  db.session.execute("ALTER TABLE {} {}".format(
+      SHADOW_TABLE,
+      ", ".join("ADD {} `{}` ({})".format(kind, name, ", ".join(columns))
+                for name, kind, columns in missing),
+  ))
+
+
+def insert_records(records):
+  """Insert records into the shadow table.
+
+  Returns:
+    number of inserted records.
+  """
+  query = sa.text("""
+      INSERT INTO {} (`key`, type, tags, property, subproperty, content)
+      VALUES (:key, :type, :tags, :property, :subproperty, :content)
+  """.format(SHADOW_TABLE))
+  inserted = 0
+  for records_chunk in iter_chunks(iter(records),
+                                   chunk_size=INSERT_CHUNK_SIZE):
+    records_chunk = list(records_chunk)
+    if not records_chunk:
+      break
+    db.session.execute(query, records_chunk)
+    inserted += len(records_chunk)
+  return inserted
+
+
+def delete_records(object_type, keys):
+  """Delete records of objects from the shadow table."""
+  if not keys:
+    return
+  db.session.execute(
+      sa.text("""
+          DELETE FROM {} WHERE type = :type AND `key` IN :keys
+      """.format(SHADOW_TABLE)),
+      {"type": object_type, "keys": list(keys)},
+  )
+
+
+def mark_changed(object_type, keys):
+  """Log objects which records are changed in the live table.
+
+  Objects are logged in the current transaction if the shadow table existed
+  when it was checked first in the transaction. Changes of transactions
+  which checked it before the shadow table was created are caught up only
+  by updated_at time of the objects.
+  """
+  if not keys or not _exists_in_transaction():
+    return
+  db.session.execute(FulltextShadowChange.__table__.insert(), [
+      {"type": object_type, "key": key} for key in keys
+  ])
+
+
+def get_changes():
+  """Get objects logged as changed.
+
+  Returns:
+    dict with sets of keys of changed objects by their types.
+  """
+  change = FulltextShadowChange
+  changes = {}
+  for object_type, key in db.session.query(change.type, change.key).distinct():
+    changes.setdefault(object_type, set()).add(key)
+  return changes
+
+
+def clear_changes():
+  """Drop the log of changed objects."""
+  FulltextShadowChange.query.delete()
+
+
+def copy_other_types(object_types):
+  """Replace records of types which are not reindexed with live ones."""
+  object_types = list(object_types)
+  db.session.execute(
+      sa.text("DELETE FROM {} WHERE type NOT IN :types".format(SHADOW_TABLE)),
+      {"types": object_types},
+  )
+  columns = ", ".join("`{}`".format(column) for column in COLUMNS)
+  db.session.execute(
+      sa.text("""
+          INSERT INTO {shadow} ({columns})
+          SELECT {columns} FROM {live} WHERE type NOT IN :types
+      """.format(shadow=SHADOW_TABLE, live=LIVE_TABLE, columns=columns)),
+      {"types": object_types},
+  )
+
+
+def get_counts(table):
+  """Get numbers of records of every type in the table."""
+  return dict(db.session.execute(
+      "SELECT type, COUNT(*) FROM {} GROUP BY type".format(table)
+  ).fetchall())
+
+
+def validate(max_decrease=None):
+  """Check that every type has enough records in the shadow table.
+
+  Args:
+    max_decrease: max relative decrease of number of records of a type in
+        comparison with the live table, FULLTEXT_SHADOW_MAX_DECREASE setting
+        is used if not specified.
+
+  Raises:
+    ValueError if some type has less records than allowed.
+  """
+  if max_decrease is None:
+    max_decrease = settings.FULLTEXT_SHADOW_MAX_DECREASE
+  live_counts = get_counts(LIVE_TABLE)
+  shadow_counts = get_counts(SHADOW_TABLE)
+  invalid = {
+      object_type: (count, shadow_counts.get(object_type, 0))
+      for object_type, count in live_counts.iteritems()
+      if shadow_counts.get(object_type, 0) < count * (1 - max_decrease)
+  }
+  if invalid:
+    raise ValueError(
+        "Shadow fulltext table has too few records (live, shadow): "
+        "{}".format(", ".join("{}: {}".format(object_type, counts)
+                              for object_type, counts
+                              in sorted(invalid.items())))
+    )
+
+
+def swap():
+  """Swap the shadow table with the live one and drop the old records."""
+  db.session.execute("DROP TABLE IF EXISTS {}".format(OLD_TABLE))
+  # Both tables are renamed atomically, so readers see either old or new
+  # records only.
+  db.session.execute("RENAME TABLE {live} TO {old}, {shadow} TO {live}".format(
+      live=LIVE_TABLE, old=OLD_TABLE, shadow=SHADOW_TABLE,
+  ))
+  db.session.execute("DROP TABLE {}".format(OLD_TABLE))
+  db.session().info[EXISTS_KEY] = False
+  logger.info("Shadow fulltext table is swapped in")
+
+
+def _get_sample_keys(object_type, sample_size):
+  """Get random keys of the type present in the live or shadow table."""
+  keys = set()
+  for table in (LIVE_TABLE, SHADOW_TABLE):
+    keys.update(key for key, in db.session.execute(
+        sa.text("""
+            SELECT DISTINCT `key` FROM {} WHERE type = :type
+            ORDER BY RAND() LIMIT :sample_size
+        """.format(table)),
+        {"type": object_type, "sample_size": sample_size},
+    ))
+  return list(keys)
+
+
+def _get_records(table, object_type, keys):
+  """Get records of objects from the table grouped by keys."""
+  records = {}
+  result = db.session.execute(
+      sa.text("""
+          SELECT `key`, property, subproperty, content, tags FROM {}
+          WHERE type = :type AND `key` IN :keys
+      """.format(table)),
+      {"type": object_type, "keys": keys},
+  )
+  for key, property_, subproperty, content, tags in result:
+    records.setdefault(key, set()).add(
+        (property_, subproperty, content, tags),
+    )
+  return records
+
+
+def compare(sample_size=100, max_examples=10):
+  """Compare records of random objects in the shadow and live tables.
+
+  Args:
+    sample_size: number of random keys of every type taken from each table.
+    max_examples: max number of reported differing objects of a type.
+
+  Returns:
+    dict with numbers of compared and differing objects and examples of
+    missing and extra shadow records of every type.
+  """
+  live_counts = get_counts(LIVE_TABLE)
+  shadow_counts = get_counts(SHADOW_TABLE)
+  result = {}
+  for object_type in sorted(set(live_counts) | set(shadow_counts)):
+    keys = _get_sample_keys(object_type, sample_size)
+    live = _get_records(LIVE_TABLE, object_type, keys) if keys else {}
+    shadow = _get_records(SHADOW_TABLE, object_type, keys) if keys else {}
+    different = [key for key in sorted(keys)
+                 if live.get(key, set()) != shadow.get(key, set())]
+    result[object_type] = {
+        "live_records": live_counts.get(object_type, 0),
+        "shadow_records": shadow_counts.get(object_type, 0),
+        "compared": len(keys),
+        "different": len(different),
+        "examples": [{
+            "key": key,
+            "missing": sorted(live.get(key, set()) - shadow.get(key, set())),
+            "extra": sorted(shadow.get(key, set()) - live.get(key, set())),
+        } for key in different[:max_examples]],
+    }
+  return result
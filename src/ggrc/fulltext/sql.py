@@ -6,6 +6,7 @@
 from collections import defaultdict
 
 from ggrc import db
+from ggrc.fulltext import shadow
 
 
 class SqlIndexer(object):
@@ -36,9 +37,13 @@ class SqlIndexer(object):
   def search(self, terms):
     raise NotImplementedError()
 
-  def records_generator(self, instance):
-    """Record generator method."""
-    props = self.get_builder(instance.__class__).get_properties(instance)
+  def records_generator(self, instance, fulltext_attrs=None):
+    """Record generator method.
+
+    Records are generated only for sent fulltext_attrs if they are specified.
+    """
+    props = self.get_builder(instance.__class__).get_properties(
+        instance, fulltext_attrs)
     for prop, value in props.iteritems():
       for subproperty, content in value.iteritems():
         if content is not None:
@@ -55,6 +60,7 @@ class SqlIndexer(object):
     """Create records in db."""
     for db_record in self.records_generator(instance):
       db.session.add(self.record_type(**db_record))
+    shadow.mark_changed(instance.__class__.__name__, [instance.id])
     if commit:
       db.session.commit()
 
@@ -68,6 +74,7 @@ class SqlIndexer(object):
     ).delete(
         synchronize_session="fetch"
     )
+    shadow.mark_changed(type, [key])
     if commit:
       db.session.commit()
 
@@ -83,6 +90,7 @@ class SqlIndexer(object):
     ).delete(
         synchronize_session="fetch"
     )
+    shadow.mark_changed(type, keys)
     if commit:
       db.session.commit()
 
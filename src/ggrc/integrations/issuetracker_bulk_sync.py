@@ -24,6 +24,7 @@ from ggrc import utils
 from ggrc.notifications import common
 from ggrc.notifications.data_handlers import get_object_url
 from ggrc.utils import benchmark
+from ggrc.utils import revisions as revision_utils
 from ggrc.utils.revisions_diff import builder as revisions_diff
 
 logger = logging.getLogger(__name__)
@@ -425,6 +426,7 @@ class IssueTrackerBulkCreator(object):
     ]
     inserter = all_models.Revision.__table__.insert()
     db.session.execute(inserter.values(revision_data))
+    revision_utils.refresh_latest_revisions(event_id)
 
   @staticmethod
   def make_response(errors):
@@ -20,6 +20,7 @@ from ggrc.models.relationship import Relationship
 from ggrc.models.revision import Revision
 from ggrc.models.snapshot import Snapshot
 from ggrc.migrations.utils.migrator import get_migration_user_id
+from ggrc.utils.revisions import REFRESH_LATEST_REVISIONS_SQL
 
 
 relationships_table = Relationship.__table__  # pylint: disable=invalid-name
@@ -296,3 +297,17 @@ def create_revision(connection, slug, doc_id, content, event_id,
       modified_by_id=migrator_id,
       resource_slug=slug
   )
+  refresh_latest_revisions(connection, event_id)
+
+
+def refresh_latest_revisions(connection, event_id):
+  """Mark revisions of the event as the latest revisions of their objects.
+
+  Migrations running before the latest_revisions table is created are
+  skipped, the table is filled from all existing revisions on its creation.
+  """
+  table_exists = connection.execute(
+      text("SHOW TABLES LIKE 'latest_revisions'")
+  ).fetchone()
+  if table_exists:
+    connection.execute(text(REFRESH_LATEST_REVISIONS_SQL), event_id=event_id)
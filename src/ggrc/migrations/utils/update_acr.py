@@ -6,13 +6,39 @@
 """Helper for updating access_control_roles table with the missing records
 
 """
-import json
 from datetime import datetime
 
 import sqlalchemy as sa
 from sqlalchemy.sql import table, text, column
 from alembic import op
 
+from ggrc.models import types
+
+
+def get_deleted_acr_id(connection, role, model):
+  """Get id of the role found among deleted revisions.
+
+  Revisions content may be stored compressed, so it is selected through
+  CompressedJsonType and filtered in Python instead of SQL.
+  """
+  revisions_table = table(
+      "revisions",
+      column("resource_type", sa.String),
+      column("action", sa.String),
+      column("created_at", sa.DateTime()),
+      column("content", types.CompressedJsonType),
+  )
+  rows = connection.execute(
+      sa.select([revisions_table.c.content]).where(sa.and_(
+          revisions_table.c.resource_type == "AccessControlRole",
+          revisions_table.c.action == "deleted",
+      )).order_by(revisions_table.c.created_at.desc())
+  )
+  for content, in rows:
+    if content.get("name") == role and content.get("object_type") == model:
+      return content.get("id")
+  return None
+
 
 def update_acr(role, model, **kwargs):
   """Update one row in acr"""
@@ -26,24 +52,8 @@ def update_acr(role, model, **kwargs):
   ), role=role, type=model)
   if res.rowcount > 0:
     return
-  role_content = "%\"name\": \"{}\"%".format(role)
-  model_content = "%\"object_type\": \"{}\"%".format(model)
   # check if the role could be found among deleted revisions
-  res = connection.execute(text(
-      """
-      SELECT content FROM revisions
-      WHERE resource_type='AccessControlRole'
-      AND action='deleted'
-      AND content LIKE :role_content
-      AND content LIKE :model_content
-      ORDER BY created_at DESC;
-      """
-  ), role_content=role_content, model_content=model_content)
-  acr = res.first()
-  acr_id = None
-  if acr:
-    acr = json.loads(acr[0])
-    acr_id = acr.get("id")
+  acr_id = get_deleted_acr_id(connection, role, model)
   # otherwise just insert a new one
   acr_table = table(
       "access_control_roles",
@@ -0,0 +1,46 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create fulltext_index_queue table
+
+Create Date: 2019-08-01 10:12:41.315730
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "5a1c7b3e9d20"
+down_revision = "17fbb17f7cec"
+
+
+def upgrade():
+  op.create_table(
+      "fulltext_index_queue",
+      sa.Column("id", sa.Integer, nullable=False),
+      sa.Column("object_type", sa.String(250), nullable=False),
+      sa.Column("object_id", sa.Integer, nullable=False),
+      sa.Column("attrs", sa.Text, nullable=True),
+      sa.Column("batch", sa.String(36), nullable=False, server_default=""),
+      sa.Column("created_at", sa.DateTime(), nullable=False),
+      sa.Column("leased_until", sa.DateTime(), nullable=True),
+
+      sa.PrimaryKeyConstraint("id"),
+  )
+  op.create_unique_constraint(
+      "uq_fulltext_index_queue_object",
+      "fulltext_index_queue",
+      ["object_type", "object_id", "batch"],
+  )
+  op.create_index(
+      "ix_fulltext_index_queue_batch",
+      "fulltext_index_queue",
+      ["batch"],
+  )
+
+
+def downgrade():
+  op.drop_table("fulltext_index_queue")
@@ -0,0 +1,41 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create import_export_content_chunks table
+
+Create Date: 2019-08-05 14:27:03.508412
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+
+revision = "8c3d5f1a2b47"
+down_revision = "5a1c7b3e9d20"
+
+
+def upgrade():
+  op.create_table(
+      "import_export_content_chunks",
+      sa.Column("id", sa.Integer, nullable=False),
+      sa.Column("import_export_id", sa.Integer, nullable=False),
+      sa.Column("position", sa.Integer, nullable=False),
+      sa.Column("content", mysql.LONGTEXT, nullable=False),
+
+      sa.PrimaryKeyConstraint("id"),
+      sa.ForeignKeyConstraint(
+          ["import_export_id"], ["import_exports.id"], ondelete="CASCADE"),
+  )
+  op.create_unique_constraint(
+      "uq_import_export_content_chunks_position",
+      "import_export_content_chunks",
+      ["import_export_id", "position"],
+  )
+
+
+def downgrade():
+  op.drop_table("import_export_content_chunks")
@@ -0,0 +1,29 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Add import_plan column to import_exports table
+
+Create Date: 2019-08-12 10:41:18.204375
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+
+revision = "3e7a9c2d4f15"
+down_revision = "8c3d5f1a2b47"
+
+
+def upgrade():
+  op.add_column(
+      "import_exports",
+      sa.Column("import_plan", mysql.LONGTEXT, nullable=True),
+  )
+
+
+def downgrade():
+  op.drop_column("import_exports", "import_plan")
@@ -0,0 +1,46 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create latest_revisions table
+
+Create Date: 2019-08-14 09:12:44.913058
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "6b2f8d4e1c93"
+down_revision = "3e7a9c2d4f15"
+
+
+def upgrade():
+  op.create_table(
+      "latest_revisions",
+      sa.Column("resource_type", sa.String(length=250), nullable=False),
+      sa.Column("resource_id", sa.Integer, nullable=False),
+      sa.Column("revision_id", sa.Integer, nullable=False),
+      sa.Column("action", sa.Enum(u"created", u"modified", u"deleted"),
+                nullable=False),
+
+      sa.PrimaryKeyConstraint("resource_type", "resource_id"),
+  )
+  op.execute("""
+      INSERT INTO latest_revisions (
+          resource_type, resource_id, revision_id, action
+      )
+      SELECT r.resource_type, r.resource_id, r.id, r.action
+      FROM revisions AS r
+      JOIN (
+          SELECT MAX(id) AS id
+          FROM revisions
+          GROUP BY resource_type, resource_id
+      ) AS latest ON latest.id = r.id
+  """)
+
+
+def downgrade():
+  op.drop_table("latest_revisions")
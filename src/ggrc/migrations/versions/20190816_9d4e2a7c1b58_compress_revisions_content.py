@@ -0,0 +1,25 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Store revisions content as binary compressed data
+
+Create Date: 2019-08-16 11:27:05.381942
+"""
+
+from alembic import op
+
+
+revision = "9d4e2a7c1b58"
+down_revision = "6b2f8d4e1c93"
+
+
+def upgrade():
+  # Existing content stays uncompressed, it is compressed by
+  # /admin/compress_revisions background task.
+  op.execute("ALTER TABLE revisions MODIFY content LONGBLOB NOT NULL")
+
+
+def downgrade():
+  raise NotImplementedError("Downgrade is not supported")
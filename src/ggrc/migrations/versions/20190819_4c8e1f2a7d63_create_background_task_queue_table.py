@@ -0,0 +1,53 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create background_task_queue table
+
+Create Date: 2019-08-19 09:34:52.118406
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "4c8e1f2a7d63"
+down_revision = "9d4e2a7c1b58"
+
+
+def upgrade():
+  op.create_table(
+      "background_task_queue",
+      sa.Column("id", sa.Integer, nullable=False),
+      sa.Column("bg_task_id", sa.Integer, nullable=False),
+      sa.Column("queue", sa.String(250), nullable=False),
+      sa.Column("url", sa.String(250), nullable=False),
+      sa.Column("method", sa.String(16), nullable=False),
+      sa.Column("retry_options", sa.Text, nullable=False),
+      sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+      sa.Column("eta", sa.DateTime(), nullable=False),
+      sa.Column("lease", sa.String(36), nullable=True),
+      sa.Column("leased_until", sa.DateTime(), nullable=True),
+
+      sa.PrimaryKeyConstraint("id"),
+      sa.ForeignKeyConstraint(
+          ["bg_task_id"], ["background_tasks.id"], ondelete="CASCADE",
+      ),
+      sa.UniqueConstraint("bg_task_id"),
+  )
+  op.create_index(
+      "ix_background_task_queue_eta",
+      "background_task_queue",
+      ["queue", "eta"],
+  )
+  op.create_index(
+      "ix_background_task_queue_lease",
+      "background_task_queue",
+      ["lease"],
+  )
+
+
+def downgrade():
+  op.drop_table("background_task_queue")
@@ -0,0 +1,42 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create fulltext_reindex_units table
+
+Create Date: 2019-08-20 14:08:26.537219
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "7e5b3a9c2d14"
+down_revision = "4c8e1f2a7d63"
+
+
+def upgrade():
+  op.create_table(
+      "fulltext_reindex_units",
+      sa.Column("id", sa.Integer, nullable=False),
+      sa.Column("reindex", sa.String(36), nullable=False),
+      sa.Column("object_type", sa.String(250), nullable=False),
+      sa.Column("first_id", sa.Integer, nullable=False),
+      sa.Column("last_id", sa.Integer, nullable=False),
+      sa.Column("records", sa.Integer, nullable=True),
+      sa.Column("started_at", sa.DateTime(), nullable=True),
+      sa.Column("finished_at", sa.DateTime(), nullable=True),
+
+      sa.PrimaryKeyConstraint("id"),
+  )
+  op.create_index(
+      "ix_fulltext_reindex_units_reindex",
+      "fulltext_reindex_units",
+      ["reindex", "finished_at"],
+  )
+
+
+def downgrade():
+  op.drop_table("fulltext_reindex_units")
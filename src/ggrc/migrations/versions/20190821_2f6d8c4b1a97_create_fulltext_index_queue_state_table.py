@@ -0,0 +1,31 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create fulltext_index_queue_state table
+
+Create Date: 2019-08-21 09:42:17.104382
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "2f6d8c4b1a97"
+down_revision = "7e5b3a9c2d14"
+
+
+def upgrade():
+  op.create_table(
+      "fulltext_index_queue_state",
+      sa.Column("id", sa.Integer, nullable=False, autoincrement=False),
+
+      sa.PrimaryKeyConstraint("id"),
+  )
+  op.execute("INSERT INTO fulltext_index_queue_state (id) VALUES (1)")
+
+
+def downgrade():
+  op.drop_table("fulltext_index_queue_state")
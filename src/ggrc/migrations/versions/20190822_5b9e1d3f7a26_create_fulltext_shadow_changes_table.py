@@ -0,0 +1,32 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+# pylint: disable=invalid-name,missing-docstring
+
+"""
+Create fulltext_shadow_changes table
+
+Create Date: 2019-08-22 11:27:45.318604
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "5b9e1d3f7a26"
+down_revision = "2f6d8c4b1a97"
+
+
+def upgrade():
+  op.create_table(
+      "fulltext_shadow_changes",
+      sa.Column("id", sa.Integer, nullable=False),
+      sa.Column("type", sa.String(64), nullable=False),
+      sa.Column("key", sa.Integer, nullable=False),
+
+      sa.PrimaryKeyConstraint("id"),
+  )
+
+
+def downgrade():
+  op.drop_table("fulltext_shadow_changes")
@@ -139,7 +139,8 @@ class Assessment(Assignable, statusable.Statusable, AuditRelationship,
   ]
 
   AUTO_REINDEX_RULES = [
-      mixin.ReindexRule("Audit", lambda x: x.assessments, ["archived"]),
+      mixin.ReindexRule("Audit", lambda x: x.assessments, ["archived"],
+                        ["archived"]),
   ]
 
   _custom_publish = {
@@ -23,6 +23,7 @@ from ggrc.models.mixins import Base
 from ggrc.models.deferred import deferred
 from ggrc.models.mixins import Stateful
 from ggrc.models.types import CompressedType
+from ggrc.models.types import JsonType
 from ggrc.models import reflection
 from ggrc.utils import benchmark, errors as app_errors
 
@@ -43,6 +44,8 @@ BANNED_HEADERS = {
 RETRY_OPTIONS = settings.RETRY_OPTIONS
 DEFAULT_QUEUE = settings.DEFAULT_QUEUE
 
+TASK_URL_PREFIX = "/_background_tasks/"
+
 
 class BackgroundTask(base.ContextRBAC, Base, Stateful, db.Model):
   """Background task model."""
@@ -141,6 +144,45 @@ class BackgroundTask(base.ContextRBAC, Base, Stateful, db.Model):
     return content
 
 
+class BackgroundTaskQueueItem(db.Model):
+  """Background task waiting for the local task runner.
+
+  See ggrc.task_runner for details.
+  """
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "background_task_queue"
+
+  id = db.Column(db.Integer, primary_key=True)
+  bg_task_id = db.Column(
+      db.Integer,
+      db.ForeignKey("background_tasks.id", ondelete="CASCADE"),
+      nullable=False,
+      unique=True,
+  )
+  queue = db.Column(db.String(250), nullable=False)
+  url = db.Column(db.String(250), nullable=False)
+  method = db.Column(db.String(16), nullable=False)
+  retry_options = db.Column(JsonType, nullable=False)
+  # Number of started runs of the task
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  # Time before which the task should not be run
+  eta = db.Column(db.DateTime, nullable=False)
+  # Unique name of the task claim and its expiration time
+  lease = db.Column(db.String(36), nullable=True)
+  leased_until = db.Column(db.DateTime, nullable=True)
+
+  # Queue item is added to the session together with its task
+  bg_task = db.relationship(
+      BackgroundTask,
+      backref=db.backref("queue_item", uselist=False),
+  )
+
+  __table_args__ = (
+      db.Index("ix_background_task_queue_eta", "queue", "eta"),
+      db.Index("ix_background_task_queue_lease", "lease"),
+  )
+
+
 def collect_task_headers():
   """Get headers required for appengine background task run."""
   headers = {}
@@ -232,12 +274,18 @@ def _bg_task_user():
   return current_user
 
 
+def _use_task_runner(url, bg_task):
+  """Check if the task should be put to the local task runner queue."""
+  return (getattr(settings, "BACKGROUND_TASK_RUNNER", False) and
+          bg_task is not None and url.startswith(TASK_URL_PREFIX))
+
+
 # pylint: disable=too-many-arguments
 def _enqueue_task(name, url, bg_task=None, queued_callback=None,
                   parameters=None, method="POST", payload=None,
                   queue=DEFAULT_QUEUE, retry_options=None):
-  """Create task in queue if running in AppEngine,
-  otherwise execute queued_callback() """
+  """Create task in queue if running in AppEngine or in the local task
+  runner queue if it is enabled, otherwise execute queued_callback() """
   parameters = parameters or dict()
   retry_options = retry_options or RETRY_OPTIONS
   if getattr(settings, "APP_ENGINE", False):
@@ -263,6 +311,9 @@ def _enqueue_task(name, url, bg_task=None, queued_callback=None,
       # On local SDK development appserver we need to wait result to
       # enqueue task. In Google Cloud async adding tasks works properly.
       queue_task.get_result()
+  elif _use_task_runner(url, bg_task):
+    from ggrc import task_runner
+    task_runner.enqueue(bg_task, url, method, queue, retry_options)
   elif queued_callback:
     if bg_task:
       queued_callback(bg_task)
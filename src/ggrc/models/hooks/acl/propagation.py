@@ -22,6 +22,7 @@ from ggrc.cache.utils import clear_permission_cache
 from ggrc.cache.utils import clear_users_permission_cache
 from ggrc.models import all_models
 from ggrc.models.hooks import access_control_role
+from ggrc.query import result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,12 @@ logger = logging.getLogger(__name__)
 # contain cycles.
 PROPAGATION_DEPTH_LIMIT = 50
 
+# Maximum number of ACL ids used in a single propagation statement.
+PROPAGATION_CHUNK_SIZE = 1000
+
+# Number of root ACL entries propagated in a single commit by propagate_all.
+PROPAGATE_ALL_CHUNK_SIZE = 500
+
 
 def _rel_parent(parent_acl_ids=None, relationship_ids=None, source=True,
                 user_id=None):
@@ -201,6 +208,42 @@ def _get_child_ids(parent_ids):
   )
 
 
+def _get_propagating_role_ids():
+  """Get ids of roles that are propagated to any other role.
+
+  The propagation tree is loaded once per propagation. ACL entries of roles
+  without child roles can not propagate and are skipped.
+  """
+  acr = all_models.AccessControlRole
+  query = db.session.query(acr.parent_id).filter(
+      acr.parent_id.isnot(None),
+  ).distinct()
+  return {role_id for role_id, in query}
+
+
+def _get_propagating_acl_ids(acl_filter, role_ids):
+  """Get ids of ACL entries matching the filter that can be propagated."""
+  if not role_ids:
+    return []
+  acl = all_models.AccessControlList
+  query = db.session.query(acl.id).filter(
+      acl_filter,
+      acl.ac_role_id.in_(role_ids),
+  )
+  return [acl_id for acl_id, in query]
+
+
+def _get_propagating_child_ids(parent_ids, role_ids):
+  """Get ids of child ACL entries of the given parents that can propagate."""
+  child_ids = []
+  for ids_chunk in utils.list_chunks(parent_ids, PROPAGATION_CHUNK_SIZE):
+    child_ids.extend(_get_propagating_acl_ids(
+        all_models.AccessControlList.parent_id.in_(ids_chunk),
+        role_ids,
+    ))
+  return child_ids
+
+
 def _handle_propagation_parents(parent_acl_ids, user_id):
   """Propagate ACL records from parent objects to relationships."""
   src_select = _rel_parent(parent_acl_ids, source=True, user_id=user_id)
@@ -235,7 +278,7 @@ def _handle_propagation_rel(relationship_ids, new_acl_ids, user_id):
   acl_utils.insert_select_acls(select_statement)
 
 
-def _handle_acl_step(parent_acl_ids, user_id):
+def _handle_acl_step(parent_acl_ids, user_id, role_ids=None):
   """Handle role propagation through relationships.
 
   For handling relationships of type:
@@ -243,13 +286,28 @@ def _handle_acl_step(parent_acl_ids, user_id):
   The parent part of this function refers to propagation from Audit to
   Relationship. The child part refers to propagation from Relationship to
   Object (either Assessment, Issue, Document, Comment)
-  """
-
-  _handle_propagation_parents(parent_acl_ids, user_id)
-  new_parent_ids = _get_child_ids(parent_acl_ids)
-  _handle_propagation_children(new_parent_ids, user_id)
 
-  return _get_child_ids(new_parent_ids)
+  Args:
+    parent_acl_ids: list of ACL ids to propagate.
+    user_id: id of the user performing the propagation.
+    role_ids: ids of roles that can propagate, loaded if not given.
+  Returns:
+    list of ids of propagated ACL entries that can be propagated further.
+  """
+  if role_ids is None:
+    role_ids = _get_propagating_role_ids()
+  grandchild_ids = []
+  for ids_chunk in utils.list_chunks(list(parent_acl_ids),
+                                     PROPAGATION_CHUNK_SIZE):
+    _handle_propagation_parents(ids_chunk, user_id)
+    new_parent_ids = _get_propagating_child_ids(ids_chunk, role_ids)
+    for parent_ids_chunk in utils.list_chunks(new_parent_ids,
+                                              PROPAGATION_CHUNK_SIZE):
+      _handle_propagation_children(parent_ids_chunk, user_id)
+    grandchild_ids.extend(
+        _get_propagating_child_ids(new_parent_ids, role_ids)
+    )
+  return grandchild_ids
 
 
 def _handle_relationship_step(relationship_ids, new_acl_ids, user_id):
@@ -263,22 +321,25 @@ def _handle_relationship_step(relationship_ids, new_acl_ids, user_id):
 
 
 def _propagate(parent_acl_ids, user_id):
-  """Propagate ACL entries through the entire propagation tree."""
+  """Propagate ACL entries through the entire propagation tree.
+
+  Every step propagates the current layer of ACL entries in chunks and
+  continues with ids of the propagated entries, so queries of a step do not
+  depend on the queries of the previous steps.
+  """
+  role_ids = _get_propagating_role_ids()
+  parent_acl_ids = _get_propagating_acl_ids(
+      all_models.AccessControlList.id.in_(parent_acl_ids),
+      role_ids,
+  )
 
   # The following for statement is a replacement for `while True` statement
   # with a safety cutoff limit.
   for _ in range(PROPAGATION_DEPTH_LIMIT):
-
-    child_ids = _handle_acl_step(parent_acl_ids, user_id)
-
-    count_query = child_ids.alias("counts").count()
-    child_id_count = db.session.execute(count_query).scalar()
-
-    if child_id_count:
-      parent_acl_ids = child_ids
-    else:
+    if not parent_acl_ids:
       # Exit the loop when there are no more ACL entries to propagate
       return
+    parent_acl_ids = _handle_acl_step(parent_acl_ids, user_id, role_ids)
 
   # We should only be able to get here if the propagation failed to finish in
   # PROPAGATION_DEPTH_LIMIT iterations.
@@ -387,6 +448,9 @@ def propagate(full_propagate=False):
     with utils.benchmark("Propagate new ACL entries"):
       _propagate(flask.g.new_acl_ids, current_user_id)
 
+  # propagated entries are committed without the ORM
+  result_cache.invalidate(["AccessControlList"])
+
   # clear permissions memcache
   if not full_propagate and flask.g.user_ids:
     with utils.benchmark("Clear ACL memcache for specific users: %s" %
@@ -426,20 +490,29 @@ def propagate_all():
     with utils.benchmark("Get non propagated acl ids"):
       query = db.session.query(
           all_models.AccessControlList.id,
+          all_models.AccessControlList.ac_role_id,
       ).filter(
           all_models.AccessControlList.parent_id.is_(None),
       )
-      all_acl_ids = [acl.id for acl in query]
+      all_acl_ids = []
+      propagating_acl_ids = set()
+      role_ids = _get_propagating_role_ids()
+      for acl_id, role_id in query:
+        all_acl_ids.append(acl_id)
+        if role_id in role_ids:
+          propagating_acl_ids.add(acl_id)
 
     with utils.benchmark("Propagate normal acl entries"):
       count = len(all_acl_ids)
       propagated_count = 0
-      for acl_ids in utils.list_chunks(all_acl_ids, chunk_size=50):
+      for acl_ids in utils.list_chunks(all_acl_ids,
+                                       chunk_size=PROPAGATE_ALL_CHUNK_SIZE):
         propagated_count += len(acl_ids)
         logger.info("Propagating ACL entries: %s/%s", propagated_count, count)
         _delete_propagated_acls(acl_ids)
 
-        flask.g.new_acl_ids = acl_ids
+        flask.g.new_acl_ids = [acl_id for acl_id in acl_ids
+                               if acl_id in propagating_acl_ids]
         flask.g.new_relationship_ids = set()
         flask.g.user_ids = set()
         flask.g.deleted_objects = set()
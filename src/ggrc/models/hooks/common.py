@@ -7,6 +7,7 @@ import sqlalchemy as sa
 
 from ggrc import db
 from ggrc.fulltext import mixin
+from ggrc.fulltext import shadow
 from ggrc.models import all_models
 from ggrc.models.mixins import attributable
 from ggrc.utils import referenced_objects
@@ -51,6 +52,7 @@ def _handle_obj_delete(mapper, connection, target):
   delete_queries = []
   if issubclass(type(target), mixin.Indexed):
     delete_queries.append(target.get_delete_query_for([target.id]))
+    shadow.mark_changed(type(target).__name__, [target.id])
   if issubclass(type(target), attributable.Attributable):
     delete_queries.append(target.get_delete_ca_query_for([target.id]))
 
@@ -10,6 +10,7 @@ from logging import getLogger
 from sqlalchemy.dialects import mysql
 
 from ggrc import db
+from ggrc import settings
 from ggrc.models.mixins.base import Identifiable
 from ggrc.login import get_current_user
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
@@ -63,6 +64,8 @@ class ImportExport(Identifiable, db.Model):
   title = db.Column(db.Text)
   content = db.Column(mysql.LONGTEXT)
   gdrive_metadata = db.Column('gdrive_metadata', db.Text)
+  # Object lookups of the import analysis phase reused by the import
+  import_plan = db.Column(mysql.LONGTEXT)
 
   def log_json(self, is_default=False):
     """JSON representation"""
@@ -70,7 +73,8 @@ class ImportExport(Identifiable, db.Model):
       columns = self.DEFAULT_COLUMNS
     else:
       columns = (column.name for column in self.__table__.columns
-                 if column.name not in ('content', 'gdrive_metadata'))
+                 if column.name not in ('content', 'gdrive_metadata',
+                                        'import_plan'))
 
     res = {}
     for column in columns:
@@ -85,6 +89,97 @@ class ImportExport(Identifiable, db.Model):
     return res
 
 
+class ImportExportContentChunk(db.Model):
+  """Part of a large import/export job content."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "import_export_content_chunks"
+
+  id = db.Column(db.Integer, primary_key=True)
+  import_export_id = db.Column(
+      db.Integer,
+      db.ForeignKey("import_exports.id", ondelete="CASCADE"),
+      nullable=False,
+  )
+  position = db.Column(db.Integer, nullable=False)
+  content = db.Column(mysql.LONGTEXT, nullable=False)
+
+  __table_args__ = (
+      db.UniqueConstraint("import_export_id", "position",
+                          name="uq_import_export_content_chunks_position"),
+  )
+
+
+class ContentChunkWriter(object):
+  """File-like object storing written utf-8 data in content chunks of a job.
+
+  Data is buffered until its size reaches the chunk size, so the whole
+  content is never held in memory. Every write call is expected to pass
+  complete lines, as csv writer does, so chunks are never split inside a
+  multi-byte character.
+  """
+
+  def __init__(self, ie_job, chunk_size=None):
+    self.ie_job = ie_job
+    if chunk_size is None:
+      chunk_size = settings.EXPORT_CONTENT_CHUNK_SIZE
+    self.chunk_size = chunk_size
+    self.chunks_count = 0
+    self.max_buffer_size = 0
+    self._buffer = []
+    self._buffer_size = 0
+
+  def write(self, data):
+    """Add data to the buffer storing full buffer as a new chunk."""
+    self._buffer.append(data)
+    self._buffer_size += len(data)
+    self.max_buffer_size = max(self.max_buffer_size, self._buffer_size)
+    if self._buffer_size >= self.chunk_size:
+      self.flush()
+
+  def flush(self):
+    """Store buffered data as a new chunk."""
+    if not self._buffer:
+      return
+    db.session.execute(ImportExportContentChunk.__table__.insert().values(
+        import_export_id=self.ie_job.id,
+        position=self.chunks_count,
+        content="".join(self._buffer).decode("utf-8"),
+    ))
+    self.chunks_count += 1
+    self._buffer = []
+    self._buffer_size = 0
+
+  def close(self):
+    """Store the remaining buffered data."""
+    self.flush()
+
+
+def delete_content_chunks(ie_id):
+  """Delete content chunks of the job in the current transaction."""
+  ImportExportContentChunk.query.filter(
+      ImportExportContentChunk.import_export_id == ie_id,
+  ).delete(synchronize_session=False)
+
+
+def iter_content(ie_job):
+  """Iterate over parts of the job content loading one part at a time.
+
+  Content of jobs without chunks is returned as a single part.
+  """
+  chunk = ImportExportContentChunk
+  chunk_ids = [chunk_id for chunk_id, in db.session.query(chunk.id).filter(
+      chunk.import_export_id == ie_job.id,
+  ).order_by(chunk.position)]
+  if not chunk_ids:
+    if ie_job.content is not None:
+      yield ie_job.content
+    return
+  for chunk_id in chunk_ids:
+    yield db.session.query(chunk.content).filter(
+        chunk.id == chunk_id,
+    ).scalar()
+
+
 def create_import_export_entry(**kwargs):
   """Create ImportExport entry"""
   meta = json.dumps(kwargs['gdrive_metadata']) if 'gdrive_metadata' in kwargs \
@@ -328,6 +328,7 @@ class CustomAttributable(object):
 
   def _remove_existing_items(self, attr_values):
     """Remove existing CAV and corresponding full text records."""
+    from ggrc.fulltext import shadow
     from ggrc.fulltext.mysql import MysqlRecordProperty
     from ggrc.models.custom_attribute_value import CustomAttributeValue
     if not attr_values:
@@ -346,6 +347,7 @@ class CustomAttributable(object):
                 MysqlRecordProperty.type == self.__class__.__name__,
                 MysqlRecordProperty.property.in_(ftrp_properties)))\
         .delete(synchronize_session='fetch')
+    shadow.mark_changed(self.__class__.__name__, [self.id])
 
     # 3) Delete the list of custom attribute values
     attr_value_ids = [value.id for value in attr_values]
@@ -39,7 +39,7 @@ class Revision(before_flush_handleable.BeforeFlushHandleable,
   event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
   action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
                      nullable=False)
-  _content = db.Column('content', types.LongJsonType, nullable=False)
+  _content = db.Column('content', types.CompressedJsonType, nullable=False)
 
   resource_slug = db.Column(db.String, nullable=True)
   source_type = db.Column(db.String, nullable=True)
@@ -628,24 +628,53 @@ class Revision(before_flush_handleable.BeforeFlushHandleable,
             self.action != "created"):
       return {}
     automapping_id = self._content["automapping_id"]
-    if not hasattr(flask.g, "automappings_cache"):
-      flask.g.automappings_cache = dict()
-    if automapping_id not in flask.g.automappings_cache:
+    automappings_cache = _get_automappings_cache()
+    if automapping_id not in automappings_cache:
       automapping_obj = automapping.Automapping.query.get(automapping_id)
       if automapping_obj is None:
         return {}
       automapping_json = automapping_obj.log_json()
-      flask.g.automappings_cache[automapping_id] = automapping_json
+      automappings_cache[automapping_id] = automapping_json
     else:
-      automapping_json = flask.g.automappings_cache[automapping_id]
+      automapping_json = automappings_cache[automapping_id]
     return {"automapping": automapping_json}
 
+  @classmethod
+  def populate_contents(cls, revisions):
+    """Populate content of revisions loading shared data in bulk.
+
+    Automappings referenced by the revisions are loaded with a single query
+    instead of a query per revision, and populated content is memoized on
+    every revision.
+    """
+    automappings_cache = _get_automappings_cache()
+    automapping_ids = {
+        rev._content.get("automapping_id") for rev in revisions
+        if rev.action == "created"
+    } - set(automappings_cache) - {None}
+    if automapping_ids:
+      query = automapping.Automapping.query.filter(
+          automapping.Automapping.id.in_(automapping_ids))
+      automappings_cache.update((obj.id, obj.log_json()) for obj in query)
+    for rev in revisions:
+      rev.content  # pylint: disable=pointless-statement
+
   @builder.simple_property
   def content(self):
     """Property. Contains the revision content dict.
 
-    Updated by required values, generated from saved content dict."""
-    # pylint: disable=too-many-locals
+    Updated by required values, generated from saved content dict. Populated
+    content is memoized until the saved content is replaced.
+    """
+    source, populated_content = getattr(self, "_populated_content",
+                                        (None, None))
+    if source is not self._content:
+      populated_content = self._populate_content()
+      self._populated_content = (self._content, populated_content)
+    return populated_content.copy()
+
+  def _populate_content(self):
+    """Generate content dict with required values from saved content."""
     populated_content = self._content.copy()
     populated_content.update(self.populate_acl())
     populated_content.update(self.populate_reference_url())
@@ -694,3 +723,26 @@ class Revision(before_flush_handleable.BeforeFlushHandleable,
   def handle_before_flush(self):
     """Handler that called  before SQLAlchemy flush event."""
     self._handle_if_empty()
+
+
+def _get_automappings_cache():
+  """Get log json of automappings cached for the current request."""
+  if not hasattr(flask.g, "automappings_cache"):
+    flask.g.automappings_cache = dict()
+  return flask.g.automappings_cache
+
+
+class LatestRevision(db.Model):
+  """Id and action of the latest revision of every object.
+
+  Rows are maintained by ggrc.utils.revisions.refresh_latest_revisions for
+  every event that logs revisions.
+  """
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "latest_revisions"
+
+  resource_type = db.Column(db.String, primary_key=True)
+  resource_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  revision_id = db.Column(db.Integer, nullable=False)
+  action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
+                     nullable=False)
@@ -4,7 +4,6 @@
 """Module for Snapshot object"""
 
 from sqlalchemy import event
-from sqlalchemy import func
 from sqlalchemy import inspect
 from sqlalchemy import orm
 from sqlalchemy.ext.declarative import declared_attr
@@ -20,7 +19,6 @@ from ggrc.models import inflector
 from ggrc.models import mixins
 from ggrc.models import reflection
 from ggrc.models import relationship
-from ggrc.models import revision
 from ggrc.models.deferred import deferred
 from ggrc.models.mixins import base
 from ggrc.models.mixins import rest_handable
@@ -333,21 +331,9 @@ def _set_latest_revisions(objects):
   Args:
     objects: list of snapshot objects with child_id and child_type set.
   """
+  from ggrc.utils import revisions
   pairs = [(o.child_type, o.child_id) for o in objects]
-  query = db.session.query(
-      func.max(revision.Revision.id, name="id", identifier="id"),
-      revision.Revision.resource_type,
-      revision.Revision.resource_id,
-  ).filter(
-      tuple_(
-          revision.Revision.resource_type,
-          revision.Revision.resource_id,
-      ).in_(pairs)
-  ).group_by(
-      revision.Revision.resource_type,
-      revision.Revision.resource_id,
-  )
-  id_map = {(r_type, r_id): id_ for id_, r_type, r_id in query}
+  id_map = revisions.get_latest_revision_ids(pairs)
   for o in objects:
     o.revision_id = id_map.get((o.child_type, o.child_id))
     if o.revision_id is None:
@@ -8,6 +8,8 @@ Add Json and Compressed type declaration for use in ORM models.
 
 import json
 import pickle
+import zlib
+
 import sqlalchemy.types as types
 from ggrc import utils
 from ggrc.models import exceptions
@@ -39,6 +41,47 @@ class LongJsonType(types.TypeDecorator):
     return value
 
 
+class CompressedJsonType(types.TypeDecorator):
+  # pylint: disable=W0223
+  """Custom Long Json data type stored with zlib compression.
+
+  Serialized Json objects longer than MIN_COMPRESSED_LENGTH are stored
+  compressed, shorter ones are stored as plain Json text. Values are told
+  apart by the first byte: zlib streams always start with 0x78 ("x"), which
+  is not a valid first character of a Json document. This allows reading
+  values stored in the column before it was compressed.
+  """
+  MAX_BINARY_LENGTH = 4294967295
+  MIN_COMPRESSED_LENGTH = 256
+  ZLIB_HEADER = b"\x78"
+  impl = types.LargeBinary(length=MAX_BINARY_LENGTH)
+
+  @classmethod
+  def is_compressed(cls, value):
+    """Check if the stored value is compressed."""
+    return value[:1] == cls.ZLIB_HEADER
+
+  def process_result_value(self, value, dialect):
+    if value is not None:
+      if self.is_compressed(value):
+        value = zlib.decompress(value)
+      value = json.loads(value)
+    return value
+
+  def process_bind_param(self, value, dialect):
+    if value is None:
+      return value
+    if not isinstance(value, basestring):
+      value = utils.as_json(value)
+    if isinstance(value, unicode):
+      value = value.encode("utf-8")
+    if len(value) >= self.MIN_COMPRESSED_LENGTH:
+      value = zlib.compress(value)
+    if len(value) > self.MAX_BINARY_LENGTH:
+      raise exceptions.ValidationError("Log record content too long")
+    return value
+
+
 class JsonType(types.TypeDecorator):
   # pylint: disable=W0223
   """ Custom Json data type
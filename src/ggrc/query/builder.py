@@ -19,6 +19,7 @@ from ggrc.utils import benchmark
 from ggrc.rbac import permissions
 from ggrc.query import custom_operators
 from ggrc.query import pagination
+from ggrc.query import result_cache
 from ggrc.query.exceptions import BadQueryException
 
 
@@ -43,6 +44,8 @@ class QueryHelper(object):
         }
       ]
       limit: [from, to] - limit the result list to a slice result[from, to]
+      total: optional; if False, total count of objects is not calculated
+             for limited queries
       filters: {
         relevant_filters:
           these filters will return all ids of the "search class name" object
@@ -288,19 +291,33 @@ class QueryHelper(object):
     with benchmark("Order objects by ids: _get_objects"):
       objects = [id_object_map[id_] for id_ in ids]
 
+    if object_class is models.Revision:
+      with benchmark("Populate revisions content: _get_objects"):
+        models.Revision.populate_contents(objects)
+
     return objects
 
   def _get_ids(self, object_query):
     """Get a set of ids of objects described in the filters."""
+    ids, total = result_cache.get_ids(object_query, self._get_ids_and_total)
+    if total is not None:
+      object_query["total"] = total
+    return ids
+
+  def _get_ids_and_total(self, object_query):
+    """Get ids of objects described in the filters and their total count.
+
+    Total count is None if it was not requested or the query is invalid.
+    """
 
     object_name = object_query["object_name"]
     expression = object_query.get("filters", {}).get("expression")
 
     if expression is None:
-      return set()
+      return set(), None
     object_class = inflector.get_model(object_name)
     if object_class is None:
-      return set()
+      return set(), None
     query = db.session.query(object_class.id)
 
     tgt_class = object_class
@@ -334,16 +351,18 @@ class QueryHelper(object):
 
     with benchmark("Apply limit"):
       limit = object_query.get("limit")
-      if limit:
-        limit_query = pagination.apply_limit(query, limit)
-        total = pagination.get_total_count(query)
-        ids = [obj.id for obj in limit_query]
+      with_total = object_query.get("total") is not False
+      total = None
+      if limit and with_total:
+        ids, total = pagination.apply_limit_with_total(query, limit)
+      elif limit:
+        ids = [obj.id for obj in pagination.apply_limit(query, limit)]
       else:
         ids = [obj.id for obj in query]
-        total = len(ids)
-      object_query["total"] = total
+        if with_total:
+          total = len(ids)
 
-    return ids
+    return ids, total
 
   @staticmethod
   def _slugs_to_ids(object_name, slugs):
@@ -3,10 +3,18 @@
 
 """This module contains special query helper class for query API."""
 
+import flask
+
+from ggrc import db
+from ggrc import settings
 from ggrc.builder import json
+from ggrc.query import projection
+from ggrc.query import result_cache
 from ggrc.query.builder import QueryHelper
 from ggrc.models import inflector
 from ggrc.utils import benchmark
+from ggrc.utils import concurrency
+from ggrc.utils import metrics
 
 
 # pylint: disable=too-few-public-methods
@@ -40,6 +48,11 @@ class DefaultHandler(QueryHelper):
     Updates self.query items with their results. The type of results required
     is read from "type" parameter of every object_query in self.query.
 
+    Object queries that don't use results of other queries are evaluated
+    concurrently if QUERY_API_MAX_WORKERS setting allows it. Values of
+    explicitly requested fields are built from selected columns without
+    loading objects when all the fields are stored in model columns.
+
     Returns:
       list of dicts: same query as the input with requested results that match
                      the filter.
@@ -49,28 +62,120 @@ class DefaultHandler(QueryHelper):
       if query_type not in {"values", "ids", "count"}:
         raise NotImplementedError("Only 'values', 'ids' and 'count' queries "
                                   "are supported now")
-      model = inflector.get_model(object_query["object_name"])
-      if query_type == "values":
-        with benchmark("Get result set: get_results > _get_objects"):
-          objects = self._get_objects(object_query)
-        object_query["count"] = len(objects)
-        with benchmark("get_results > _get_last_modified"):
-          object_query["last_modified"] = self._get_last_modified(model,
-                                                                  objects)
-        with benchmark("serialization: get_results > _transform_to_json"):
-          object_query["values"] = self._transform_to_json(
-              objects,
-              object_query.get("fields"),
-          )
-      else:
-        with benchmark("Get result set: get_results -> _get_ids"):
-          ids = self._get_ids(object_query)
-        object_query["count"] = len(ids)
-        object_query["last_modified"] = None  # synonymous to now()
-        if query_type == "ids":
-          object_query["ids"] = ids
+    remaining = self.query
+    independent, dependent = self._split_by_dependency()
+    max_workers = self._get_max_workers()
+    if len(independent) > 1 and max_workers > 1 and \
+            flask.has_request_context():
+      with benchmark("get_results > evaluate object queries in threads"):
+        concurrency.map_in_threads(
+            self._in_request_context(self._get_result),
+            independent,
+            max_workers,
+        )
+      remaining = dependent
+    for object_query in remaining:
+      self._get_result(object_query)
     return self.query
 
+  def _split_by_dependency(self):
+    """Split object queries by usage of other queries results.
+
+    Returns:
+      a tuple of lists of independent object queries and object queries
+      referencing other queries by "__previous__" object name.
+    """
+    independent, dependent = [], []
+    for object_query in self.query:
+      expression = object_query.get("filters", {}).get("expression")
+      if any(node.get("object_name") == "__previous__"
+             for node in result_cache.iter_expressions(expression)):
+        dependent.append(object_query)
+      else:
+        independent.append(object_query)
+    return independent, dependent
+
+  @staticmethod
+  def _get_max_workers():
+    """Get number of threads limited by the DB connection pool size.
+
+    Every thread uses its own connection and one connection is kept by the
+    session of the request.
+    """
+    max_workers = getattr(settings, "QUERY_API_MAX_WORKERS", 1)
+    pool_size = getattr(db.engine.pool, "size", None)
+    if pool_size is not None:
+      max_workers = min(max_workers, pool_size() - 1)
+    return max_workers
+
+  @staticmethod
+  def _in_request_context(func):
+    """Wrap func to be run in a copy of the current request context.
+
+    Every call gets its own request and application context, so a separate
+    DB session is used and removed in the end. Permissions and the user
+    already loaded for the request are reused, the user is merged into the
+    new session without reloading it.
+    """
+    from ggrc.models import all_models
+    # pylint: disable=protected-access
+    request_ctx = flask._request_ctx_stack.top
+    request_permissions = getattr(flask.g, "_request_permissions", None)
+    user = getattr(request_ctx, "user", None)
+    if not isinstance(user, all_models.Person):
+      user = None
+
+    def wrapper(arg):
+      """Run func in a new request context."""
+      with request_ctx.copy():
+        if request_permissions is not None:
+          flask.g._request_permissions = request_permissions
+        if user is not None:
+          flask._request_ctx_stack.top.user = db.session.merge(user,
+                                                               load=False)
+        return func(arg)
+    return wrapper
+
+  def _get_result(self, object_query):
+    """Evaluate object query and store the requested results in it."""
+    query_type = object_query.get("type", "values")
+    model = inflector.get_model(object_query["object_name"])
+    if query_type == "values" and projection.can_project(
+            model, object_query.get("fields")):
+      metrics.incr(projection.METRIC_GROUP, "projected")
+      self._get_projected_values(model, object_query)
+    elif query_type == "values":
+      metrics.incr(projection.METRIC_GROUP, "full")
+      with benchmark("Get result set: get_results > _get_objects"):
+        objects = self._get_objects(object_query)
+      object_query["count"] = len(objects)
+      with benchmark("get_results > _get_last_modified"):
+        object_query["last_modified"] = self._get_last_modified(model,
+                                                                objects)
+      with benchmark("serialization: get_results > _transform_to_json"):
+        object_query["values"] = self._transform_to_json(
+            objects,
+            object_query.get("fields"),
+        )
+    else:
+      with benchmark("Get result set: get_results -> _get_ids"):
+        ids = self._get_ids(object_query)
+      object_query["count"] = len(ids)
+      object_query["last_modified"] = None  # synonymous to now()
+      if query_type == "ids":
+        object_query["ids"] = ids
+
+  def _get_projected_values(self, model, object_query):
+    """Store values of requested fields built from selected columns only."""
+    with benchmark("Get result set: get_results > _get_ids"):
+      ids = self._get_ids(object_query)
+    with benchmark("serialization: get_results > projection.get_values"):
+      values, last_modified = projection.get_values(
+          model, ids, object_query["fields"])
+    object_query["count"] = len(values)
+    object_query["last_modified"] = last_modified
+    object_query["values"] = values
+
   @staticmethod
   def _transform_to_json(objects, fields=None):
     """Make a JSON representation of objects from the list."""
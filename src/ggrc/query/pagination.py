@@ -13,6 +13,10 @@ from ggrc.query.exceptions import BadQueryException
 from ggrc.utils import benchmark
 
 
+WINDOW_STRATEGY = "window"
+FOUND_ROWS_STRATEGY = "found_rows"
+
+
 def _get_limit(limit):
   """Get limit parameters for sqlalchemy."""
   try:
@@ -50,6 +54,54 @@ def apply_limit(query, limit):
   return limit_query
 
 
+def _get_total_count_strategy():
+  """Choose how to get total count together with the page for current DB.
+
+  MySQL before 8.0 has no window functions, SQL_CALC_FOUND_ROWS makes it
+  count all matched rows while evaluating the limited query instead.
+  """
+  dialect = db.session.get_bind().dialect
+  if dialect.name == "mysql" and (dialect.server_version_info or (0,)) < (8,):
+    return FOUND_ROWS_STRATEGY
+  return WINDOW_STRATEGY
+
+
+def _get_page_with_found_rows(query, page_size, first):
+  """Get page ids and total count using SQL_CALC_FOUND_ROWS."""
+  limit_query = query.prefix_with("SQL_CALC_FOUND_ROWS")
+  ids = [row[0] for row in limit_query.limit(page_size).offset(first)]
+  total = db.session.execute(sa.text("SELECT FOUND_ROWS()")).scalar()
+  return ids, total
+
+
+def _get_page_with_window_count(query, page_size, first):
+  """Get page ids and total count using COUNT(*) OVER () column."""
+  limit_query = query.add_columns(sa.func.count().over())
+  rows = limit_query.limit(page_size).offset(first).all()
+  if rows:
+    return [row[0] for row in rows], rows[0][-1]
+  # Page out of range has no rows to read the total from
+  return [], get_total_count(query) if first else 0
+
+
+def apply_limit_with_total(query, limit):
+  """Get ids of the requested page and total count in one query evaluation.
+
+  Args:
+    query: filter query selecting object ids;
+    limit: a tuple of indexes in format (from, to).
+
+  Returns:
+    a tuple of matched objects ids on the page and total count.
+  """
+  page_size, first = _get_limit(limit)
+  strategy = _get_total_count_strategy()
+  with benchmark("Apply limit: apply_limit_with_total > {}".format(strategy)):
+    if strategy == FOUND_ROWS_STRATEGY:
+      return _get_page_with_found_rows(query, page_size, first)
+    return _get_page_with_window_count(query, page_size, first)
+
+
 def get_total_count(query):
   """Get count of all objects in the query."""
   with benchmark("Apply limit: apply_limit > query_count"):
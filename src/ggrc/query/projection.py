@@ -0,0 +1,175 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Column projection of query API "values" results.
+
+Object queries of "values" type with explicit "fields" usually need a few
+keys of the published object representation. If every requested field is
+published as stored in a model column (or is a stub of a simple many-to-one
+relationship, the object type or a link), only the needed columns are
+selected and the representation is built from result rows without loading
+model instances.
+"""
+
+from sqlalchemy.orm import ColumnProperty
+from sqlalchemy.orm import RelationshipProperty
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+from ggrc import db
+from ggrc import settings
+from ggrc.builder import json
+from ggrc.models.mixins import base
+from ggrc.utils import url_for
+from ggrc.utils import view_url_for
+
+
+METRIC_GROUP = "query_projection"
+
+LINK_FIELDS = {
+    "selfLink": url_for,
+    "viewLink": view_url_for,
+}
+
+
+def is_enabled():
+  """Check if projection of "values" queries is enabled."""
+  return getattr(settings, "QUERY_API_PROJECTION", False)
+
+
+def _has_custom_publish(model, field):
+  """Check if field is published with custom logic."""
+  return any(field in getattr(cls, "_custom_publish", {})
+             for cls in model.__mro__)
+
+
+def _get_column_attr(model, name):
+  """Get instrumented attribute of a single column property or None."""
+  class_attr = getattr(model, name, None)
+  if not isinstance(class_attr, InstrumentedAttribute):
+    return None
+  prop = class_attr.property
+  if not isinstance(prop, ColumnProperty) or len(prop.columns) != 1:
+    return None
+  return class_attr
+
+
+def _get_stub_column_attr(model, field, publisher):
+  """Get foreign key attribute and type of relationship published as stub.
+
+  Mirrors the stub branch of Builder.publish_relationship. Returns None if
+  the relationship is published in any other way.
+  """
+  # pylint: disable=protected-access
+  class_attr = getattr(model, field, None)
+  if not isinstance(class_attr, InstrumentedAttribute):
+    return None
+  prop = class_attr.property
+  if (not isinstance(prop, RelationshipProperty) or prop.uselist or
+          prop.backref or field in publisher._include_links or
+          prop.mapper.class_.__mapper__.polymorphic_on is not None or
+          len(prop.local_columns) != 1):
+    return None
+  column_attr = _get_column_attr(model, list(prop.local_columns)[0].key)
+  if column_attr is None:
+    return None
+  return column_attr, prop.mapper.class_.__name__
+
+
+def _render_stub(target_type):
+  """Get function rendering a stub of target_type object by its id."""
+  def render(_, value):
+    if value is not None:
+      return json.LazyStubRepresentation(target_type, value)
+    return None
+  return render
+
+
+def _get_field_plan(model, field):
+  """Get column to select and function rendering the published field value.
+
+  Returns:
+    a tuple of column attribute (or None if no column is needed) and function
+    of object id and column value, or None if the field can't be projected.
+  """
+  # pylint: disable=protected-access
+  if field in LINK_FIELDS:
+    link_for = LINK_FIELDS[field]
+    return None, lambda id_, _: link_for(model.__name__, id=id_)
+  publisher = json.get_json_builder(model)
+  if field not in publisher._publish_attrs:
+    # Full representation doesn't have such key either
+    return None, lambda *_: None
+  if _has_custom_publish(model, field):
+    return None
+  if field == "type" and \
+          getattr(model, "type", None) is base.Identifiable.type:
+    return None, lambda *_: model.__name__
+  column_attr = _get_column_attr(model, field)
+  if column_attr is not None:
+    return column_attr, lambda _, value: value
+  stub = _get_stub_column_attr(model, field, publisher)
+  if stub is not None:
+    column_attr, target_type = stub
+    return column_attr, _render_stub(target_type)
+  return None
+
+
+def _get_plans(model, fields):
+  """Get plans of all fields or None if some of them can't be projected."""
+  if model is None or not fields:
+    return None
+  plans = []
+  for field in fields:
+    plan = _get_field_plan(model, field)
+    if plan is None:
+      return None
+    plans.append((field, ) + plan)
+  return plans
+
+
+def can_project(model, fields):
+  """Check if values of the fields can be built from model columns."""
+  return is_enabled() and _get_plans(model, fields) is not None
+
+
+def get_values(model, ids, fields):
+  """Get published values of fields of objects with given ids.
+
+  Args:
+    model: model class of the objects.
+    ids: list of object ids in the order of results.
+    fields: list of fields to publish, they must pass can_project check.
+
+  Returns:
+    a tuple of list of dicts with the fields and the time of last update of
+    the objects.
+  """
+  plans = _get_plans(model, fields)
+  columns = [model.id]
+  renderers = []
+  for field, column_attr, render in plans:
+    index = None
+    if column_attr is not None:
+      index = len(columns)
+      columns.append(column_attr)
+    renderers.append((field, index, render))
+  updated_at_index = None
+  if hasattr(model, "updated_at"):
+    updated_at_index = len(columns)
+    columns.append(model.updated_at)
+
+  rows = {}
+  if ids:
+    query = db.session.query(*columns).filter(model.id.in_(ids))
+    rows = {row[0]: row for row in query}
+  ordered_rows = [rows[id_] for id_ in ids if id_ in rows]
+
+  values = [
+      {field: render(row[0], row[index] if index is not None else None)
+       for field, index, render in renderers}
+      for row in ordered_rows
+  ]
+  last_modified = None
+  if ordered_rows and updated_at_index is not None:
+    last_modified = max(row[updated_at_index] for row in ordered_rows)
+  return json.publish_representation(values), last_modified
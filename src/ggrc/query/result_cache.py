@@ -0,0 +1,280 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Cache of query API id lists.
+
+Ids matched by an object query are cached under a key built from the
+normalized object query, a fingerprint of the current user permissions and
+generation numbers of the models the query depends on. Generation of a model
+is incremented after commit of any change the fulltext listeners see for
+this model. Bulk writers bypassing the listeners mark changed models
+themselves, and writers replacing the whole fulltext index increment the
+generation shared by all queries. Results cached under old generations
+expire on their own.
+
+Generations must be shared by all instances, so the cache is used only when
+memcache is enabled. Evicted generations are recreated with a value never
+used before. Request with ``Cache-Control: no-cache`` header bypasses cached
+results.
+"""
+
+import hashlib
+import json
+import logging
+
+import flask
+from sqlalchemy import event
+from sqlalchemy import orm
+
+from ggrc import db
+from ggrc import settings
+from ggrc.login import get_current_user
+from ggrc.utils import benchmark
+from ggrc.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_GROUP = "query_cache"
+
+KEY_PREFIX = "query_cache:"
+
+GENERATION_PREFIX = "query_cache_generation:"
+
+# Session info key for names of models changed in the current transaction
+CHANGES_KEY = "query_cache_changes"
+
+# Object query keys affecting the matched ids
+QUERY_KEYS = ("object_name", "filters", "order_by", "limit", "permissions",
+              "total")
+
+# Models used by relationship and role based operators of any query
+COMMON_DEPENDENCIES = ("Relationship", "AccessControlList",
+                       "AccessControlPerson")
+
+# Generation every query depends on, incremented by writers of the whole
+# fulltext index
+ALL_MODELS = "__all__"
+
+
+def is_enabled():
+  """Check if query results caching is enabled and memcache is available."""
+  from ggrc.cache import utils as cache_utils
+  return (getattr(settings, "QUERY_RESULT_CACHE", False) and
+          cache_utils.has_memcache())
+
+
+def _get_client():
+  """Get memcache client."""
+  from ggrc.cache import utils as cache_utils
+  return cache_utils.get_cache_manager().cache_object.memcache_client
+
+
+def _is_bypassed():
+  """Check if caller asked for fresh results."""
+  return "no-cache" in flask.request.headers.get("Cache-Control", "")
+
+
+def _normalize(value):
+  """Get value with sorted ids lists to compare queries regardless order."""
+  if isinstance(value, dict):
+    return {
+        key: (sorted(val) if key == "ids" and isinstance(val, list)
+              else _normalize(val))
+        for key, val in value.iteritems()
+    }
+  if isinstance(value, list):
+    return [_normalize(val) for val in value]
+  return value
+
+
+def iter_expressions(expression):
+  """Iterate over all nodes of filter expression tree."""
+  if not isinstance(expression, dict):
+    return
+  yield expression
+  for node in (expression.get("left"), expression.get("right")):
+    for sub_expression in iter_expressions(node):
+      yield sub_expression
+
+
+def _get_dependencies(object_query):
+  """Get names of models matched ids of the object query depend on.
+
+  Returns:
+    sorted list of model names or None if the query can't be cached.
+  """
+  dependencies = set(COMMON_DEPENDENCIES)
+  dependencies.add(ALL_MODELS)
+  dependencies.add(object_query["object_name"])
+  expression = object_query.get("filters", {}).get("expression")
+  for node in iter_expressions(expression):
+    object_name = node.get("object_name")
+    if object_name == "__previous__":
+      # Result depends on results of other queries of the request
+      return None
+    if object_name:
+      dependencies.add(object_name)
+  return sorted(dependencies)
+
+
+def _json_default(value):
+  """Serialize sets and other values json module can't handle."""
+  if isinstance(value, (set, frozenset)):
+    return sorted(value)
+  return str(value)
+
+
+def _get_hash(value):
+  """Get sha1 hash of json representation of the value."""
+  return hashlib.sha1(
+      json.dumps(value, sort_keys=True, default=_json_default)
+  ).hexdigest()
+
+
+def _get_permissions_fingerprint():
+  """Get hash of the current user permissions."""
+  if not hasattr(flask.g, "query_cache_permissions_fingerprint"):
+    from ggrc_basic_permissions import load_permissions_for
+    with benchmark("query cache. permissions fingerprint"):
+      user_permissions = getattr(flask.g, "_request_permissions", None)
+      if user_permissions is None:
+        user_permissions = load_permissions_for(
+            get_current_user(use_external_user=False))
+      flask.g.query_cache_permissions_fingerprint = _get_hash(
+          user_permissions)
+  return flask.g.query_cache_permissions_fingerprint
+
+
+def _get_generations(client, dependencies):
+  """Get generations of the models creating missing ones."""
+  from ggrc.cache import utils as cache_utils
+  generations = client.get_multi(dependencies, key_prefix=GENERATION_PREFIX)
+  missing = {name: cache_utils.initial_generation() for name in dependencies
+             if name not in generations}
+  if missing:
+    client.add_multi(missing, key_prefix=GENERATION_PREFIX)
+    generations = client.get_multi(dependencies,
+                                   key_prefix=GENERATION_PREFIX)
+  return [generations.get(name) for name in dependencies]
+
+
+def _get_key(client, object_query):
+  """Get cache key of object query or None if it can't be cached."""
+  dependencies = _get_dependencies(object_query)
+  if dependencies is None:
+    return None
+  key_data = {
+      "query": _normalize({key: object_query.get(key) for key in QUERY_KEYS}),
+      "permissions": _get_permissions_fingerprint(),
+      "generations": _get_generations(client, dependencies),
+  }
+  return KEY_PREFIX + _get_hash(key_data)
+
+
+def get_ids(object_query, get_ids_func):
+  """Get ids matched by object query using cache.
+
+  Args:
+    object_query: object query of query API request.
+    get_ids_func: function calculating ids and total count of the object
+        query if they are not cached.
+
+  Returns:
+    a tuple of ids and total count.
+  """
+  if not is_enabled() or not flask.has_request_context():
+    return get_ids_func(object_query)
+  client = _get_client()
+  key = _get_key(client, object_query)
+  if key is None:
+    metrics.incr(METRIC_GROUP, "uncacheable")
+    return get_ids_func(object_query)
+  if _is_bypassed():
+    metrics.incr(METRIC_GROUP, "bypassed")
+  else:
+    cached = client.get(key)
+    if cached is not None:
+      metrics.incr(METRIC_GROUP, "hits")
+      return cached
+    metrics.incr(METRIC_GROUP, "misses")
+  result = get_ids_func(object_query)
+  client.set(key, result, time=settings.QUERY_RESULT_CACHE_TIMEOUT)
+  return result
+
+
+def get_stats():
+  """Get query cache counters with hit ratio."""
+  stats = metrics.get(METRIC_GROUP)
+  hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+  stats["hit_ratio"] = metrics.ratio(hits, hits + misses)
+  return stats
+
+
+def mark_changed(model_names):
+  """Mark models to be invalidated after commit of current transaction.
+
+  Writers changing tables or fulltext records without the ORM must call it
+  for the models they change.
+  """
+  if not is_enabled():
+    return
+  db.session().info.setdefault(CHANGES_KEY, set()).update(model_names)
+
+
+def invalidate(model_names):
+  """Invalidate cached results of queries depending on the models.
+
+  Changes must be already committed, otherwise queries run before the
+  commit could cache old results under the new generations.
+  """
+  if not is_enabled():
+    return
+  from ggrc.cache import utils as cache_utils
+  _get_client().offset_multi(
+      {name: 1 for name in model_names},
+      key_prefix=GENERATION_PREFIX,
+      initial_value=cache_utils.initial_generation(),
+  )
+
+
+def invalidate_all():
+  """Invalidate cached results of all queries."""
+  invalidate([ALL_MODELS])
+
+
+def _is_savepoint(session):
+  """Check if commit or rollback event is sent for a savepoint."""
+  # pylint: disable=protected-access
+  transaction = session.transaction
+  while transaction is not None:
+    if transaction.nested:
+      return True
+    transaction = transaction._parent
+  return False
+
+
+def _invalidate_committed(session):
+  """Invalidate models changed by the committed transaction."""
+  if _is_savepoint(session):
+    # Changes are kept until commit of the enclosing transaction
+    return
+  model_names = session.info.pop(CHANGES_KEY, None)
+  if model_names:
+    invalidate(model_names)
+
+
+def _drop_changes(session, *_):
+  """Forget about changes of the rolled back transaction."""
+  if _is_savepoint(session):
+    # Changes of the enclosing transaction are still pending
+    return
+  session.info.pop(CHANGES_KEY, None)
+
+
+def register_listeners():
+  """Register session listeners invalidating cache after commit."""
+  if getattr(settings, "QUERY_RESULT_CACHE", False) and not is_enabled():
+    logger.warning("Query results cache is disabled, it requires memcache.")
+  event.listen(orm.Session, "after_commit", _invalidate_committed)
+  event.listen(orm.Session, "after_rollback", _drop_changes)
@@ -811,6 +811,11 @@ class Resource(ModelView):
     return matches, collection_extras
 
   def get_matched_resources(self, matches):
+    """Get representations for matches from cache and database.
+
+    Only matches missing in cache are loaded from the database, their
+    representations are written back to cache afterwards.
+    """
     cache_objs = {}
     if self.has_cache():
       self.request.cache_manager = cache_utils.get_cache_manager()
@@ -822,10 +827,13 @@ class Resource(ModelView):
 
     database_objs = {}
     if database_matches:
-      database_objs = self.get_resources_from_database(matches)
+      database_objs = self.get_resources_from_database(database_matches)
       if self.has_cache():
         with benchmark("Add resources to cache"):
           self.add_resources_to_cache(database_objs)
+    if self.has_cache():
+      cache_utils.record_collection_cache_lookup(
+          self.model.__name__, len(cache_objs), len(database_matches))
     return cache_objs, database_objs
 
   def collection_get(self):
@@ -877,7 +885,7 @@ class Resource(ModelView):
         with benchmark("Filter resources based on permissions"):
           objs = filter_resource(objs)
 
-        cache_op = 'Hit' if cache_objs else 'Miss'
+        cache_op = cache_utils.get_cache_op(cache_objs, database_objs)
     with benchmark("dispatch_request > collection_get > Create Response"):
       # Return custom fields specified via `__fields=id,title,description` etc.
       # TODO this can be optimized by filter_resource() not retrieving
@@ -899,7 +907,11 @@ class Resource(ModelView):
             collection, self.collection_last_modified(), cache_op=cache_op)
 
   def get_resources_from_cache(self, matches):
-    """Get resources from cache for specified matches"""
+    """Get resources from cache for specified matches
+
+    All matches are requested with a single get_multi call, matches missing
+    in cache are not present in the result.
+    """
     resources = {}
     # Disable caching for background tasks
     # Setting background task status circumvents our memcache
@@ -908,15 +920,14 @@ class Resource(ModelView):
       return resources
     # Skip right to memcache
     memcache_client = self.request.cache_manager.cache_object.memcache_client
-    for match in matches:
-      key = cache_utils.get_cache_key(None, id_=match[0], type_=match[1])
-      val = memcache_client.get(key)
-      if val:
-        val = json.loads(val)
-      else:
-        val = {}
+    keys = {
+        cache_utils.get_cache_key(None, id_=match[0], type_=match[1]): match
+        for match in matches
+    }
+    for key, val in memcache_client.get_multi(keys.keys()).iteritems():
+      val = json.loads(val) if val else {}
       if "selfLink" in val:
-        resources[match] = val
+        resources[keys[key]] = val
     return resources
 
   def add_resources_to_cache(self, match_obj_pairs):
@@ -924,11 +935,14 @@ class Resource(ModelView):
     # Skip right to memcache
     cache_manager = self.request.cache_manager
     memcache_client = cache_manager.cache_object.memcache_client
-    for match, obj in match_obj_pairs.items():
-      if obj.__class__.__name__ in cache_manager.supported_classes:
-        memcache_client.add(
-            cache_utils.get_cache_key(None, id_=match[0], type_=match[1]),
-            as_json(obj))
+    mapping = {
+        cache_utils.get_cache_key(None, id_=match[0], type_=match[1]):
+        as_json(obj)
+        for match, obj in match_obj_pairs.items()
+        if match[1] in cache_manager.supported_classes
+    }
+    if mapping:
+      memcache_client.add_multi(mapping)
 
   def invalidate_cache_to(self, obj):
     """Invalidate api cache for sent object."""
@@ -263,5 +263,95 @@ RETRY_OPTIONS = {
 }
 DEFAULT_QUEUE = "ggrc"
 
+# Local task runner settings
+# Put background tasks into the DB backed queue served by worker processes
+# started with bin/launch_task_runner instead of running them in the request
+# that created them, used outside of App Engine, see ggrc.task_runner
+BACKGROUND_TASK_RUNNER = bool(os.environ.get("GGRC_BACKGROUND_TASK_RUNNER"))
+# Queues served by the task runner with max number of concurrently running
+# tasks, same as max_concurrent_requests of the queues in queue.yaml
+BACKGROUND_TASK_QUEUES = {
+    "ggrc": 5,
+    "ggrcImport": 5,
+}
+# Seconds after which a task of a failed worker is taken over by others,
+# lease of a running task is extended while its worker is alive
+BACKGROUND_TASK_LEASE_TIME = 300
+# Seconds a worker waits before checking an empty queue again
+BACKGROUND_TASK_POLL_INTERVAL = 2
+
 APPENGINE_INSTANCE = os.environ.get('APPENGINE_INSTANCE')
 APPENGINE_LOCATION = os.environ.get('APPENGINE_LOCATION', 'us-central1')
+
+# Fulltext indexing settings
+# Update index records of changed objects by comparing them with existing
+# records instead of deleting and inserting all of them again. Full reindex
+# always rewrites all records.
+FULLTEXT_INCREMENTAL_REINDEX = True
+
+# Put changed objects to the DB backed indexing queue drained by background
+# workers instead of creating an indexing task for every write request.
+FULLTEXT_INDEXING_QUEUE = bool(os.environ.get("GGRC_FULLTEXT_INDEXING_QUEUE"))
+# Max number of concurrently running indexing queue workers
+FULLTEXT_INDEXING_QUEUE_WORKERS = 2
+# Number of queued objects claimed by a worker at once
+FULLTEXT_INDEXING_QUEUE_BATCH_SIZE = 500
+# Seconds after which a batch of a failed worker is taken over by others
+FULLTEXT_INDEXING_QUEUE_LEASE_TIME = 300
+# Seconds a worker drains the queue before passing it to a new worker
+FULLTEXT_INDEXING_QUEUE_WORKER_TIME = 60
+# Max number of processes running full reindex, units of the reindex are
+# processed in the task process if it is 1, see ggrc.fulltext.reindex
+REINDEX_MAX_WORKERS = int(os.environ.get("GGRC_REINDEX_MAX_WORKERS", 1))
+# Max number of objects of a full reindex unit
+REINDEX_UNIT_SIZE = 10000
+# Shadow reindex started with /admin/shadow_reindex fills a copy of the index
+# table swapped with the live one at the end, see ggrc.fulltext.shadow
+# Create secondary indexes of the shadow table after it is filled
+FULLTEXT_SHADOW_DEFER_INDEXES = True
+# Swap the filled shadow table in at the end of shadow reindex, otherwise it
+# is swapped in with /admin/swap_shadow_index
+FULLTEXT_SHADOW_SWAP = True
+# Max relative decrease of number of records of a type allowing the swap
+FULLTEXT_SHADOW_MAX_DECREASE = 0.1
+
+# Computed attributes settings
+# Update stored computed values with values of changed aggregate objects
+# instead of recomputing them from all aggregate objects, see
+# ggrc.data_platform.computed_attributes
+COMPUTED_ATTRIBUTES_INCREMENTAL = True
+
+# Query API settings
+# Cache ids matched by query API object queries in memcache, it is not used
+# if MEMCACHE_MECHANISM is disabled, see ggrc.query.result_cache
+QUERY_RESULT_CACHE = bool(os.environ.get("GGRC_QUERY_RESULT_CACHE"))
+# Seconds cached query results are kept
+QUERY_RESULT_CACHE_TIMEOUT = 300
+# Max number of threads evaluating independent object queries of a single
+# query API request, every thread uses its own DB connection, so the number
+# is also limited by the connection pool size. Queries are evaluated in the
+# request thread by default
+QUERY_API_MAX_WORKERS = int(os.environ.get("GGRC_QUERY_API_MAX_WORKERS", 1))
+# Build "values" results with explicit "fields" from selected columns when
+# all the fields are published as stored, see ggrc.query.projection
+QUERY_API_PROJECTION = True
+
+# Import/export settings
+# Max number of rows and seconds between reads of running job status checking
+# if the job was stopped by user
+IE_STATUS_CHECK_ROWS = 100
+IE_STATUS_CHECK_SECONDS = 5
+# Number of valid imported rows committed in a single transaction, rows are
+# committed one by one if it is 1, see ggrc.converters.import_batch
+IMPORT_BATCH_SIZE = int(os.environ.get("GGRC_IMPORT_BATCH_SIZE", 1))
+# Max size in bytes of export content kept in memory, background exports are
+# stored in chunks of this size
+EXPORT_CONTENT_CHUNK_SIZE = 1024 * 1024
+# Number of exported objects loaded and rendered together, data shown in
+# export columns is prefetched for all objects of the chunk
+EXPORT_ROW_CHUNK_SIZE = 500
+# Max number of processes rendering background exports, blocks are rendered
+# in the task process if it is 1, see ggrc.converters.export_parts
+EXPORT_MAX_WORKERS = int(os.environ.get("GGRC_EXPORT_MAX_WORKERS", 1))
+# Max number of objects of a block rendered by a single worker process
+EXPORT_PART_SIZE = 5000
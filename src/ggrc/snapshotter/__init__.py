@@ -19,7 +19,9 @@ from ggrc import models
 from ggrc.models.hooks import acl
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
+from ggrc.query import result_cache
 from ggrc.utils import benchmark
+from ggrc.utils import revisions as revision_utils
 
 from ggrc.snapshotter.datastructures import Attr
 from ggrc.snapshotter.datastructures import Pair
@@ -148,6 +150,7 @@ class SnapshotGenerator(object):
                           revisions=revisions, _filter=_filter)
     updated = result.response
     if not self.dry_run:
+      result_cache.mark_changed(("Snapshot", "Relationship"))
       indexer.reindex_pairs_bg(updated)
       self._copy_snapshot_relationships()
       self._create_audit_relationships()
@@ -205,7 +208,7 @@ class SnapshotGenerator(object):
       with benchmark("Snapshot._update.retrieve latest revisions"):
         revision_id_cache = get_revisions(
             for_update,
-            filters=[models.Revision.action.in_(["created", "modified"])],
+            skip_deleted=True,
             revisions=revisions)
 
       response_data["revisions"] = {
@@ -256,6 +259,7 @@ class SnapshotGenerator(object):
 
       with benchmark("Insert Snapshot entries into Revision"):
         self._execute(models.Revision.__table__.insert(), revision_payload)
+        self._refresh_latest_revisions(event_id)
       return OperationResponse("update", True, for_update, response_data)
 
   def analyze(self):
@@ -312,6 +316,7 @@ class SnapshotGenerator(object):
 
     to_reindex = updated | created
     if not self.dry_run:
+      result_cache.mark_changed(("Snapshot", "Relationship"))
       indexer.reindex_pairs_bg(to_reindex)
       self._remove_lost_snapshot_mappings()
       self._copy_snapshot_relationships()
@@ -323,6 +328,11 @@ class SnapshotGenerator(object):
         "dry-run": self.dry_run
     })
 
+  def _refresh_latest_revisions(self, event_id):
+    """Mark inserted snapshot revisions as latest if not in dry mode."""
+    if not self.dry_run:
+      revision_utils.refresh_latest_revisions(event_id)
+
   def _execute(self, operation, data):
     """Execute bulk operation on data if not in dry mode
 
@@ -343,6 +353,7 @@ class SnapshotGenerator(object):
         revisions=revisions, _filter=_filter)
     created = result.response
     if not self.dry_run:
+      result_cache.mark_changed(("Snapshot", "Relationship"))
       indexer.reindex_pairs_bg(created)
       self._copy_snapshot_relationships()
       self._create_audit_relationships()
@@ -418,6 +429,7 @@ class SnapshotGenerator(object):
 
       with benchmark("Snapshot._create.write revisions to database"):
         self._execute(models.Revision.__table__.insert(), revision_payload)
+        self._refresh_latest_revisions(event_id)
       return OperationResponse("create", True, for_create, response_data)
 
   def _copy_snapshot_relationships(self):
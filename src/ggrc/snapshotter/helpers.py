@@ -6,57 +6,30 @@
 import collections
 from logging import getLogger
 
-from sqlalchemy.sql.expression import tuple_, func
+from sqlalchemy.sql.expression import tuple_
 
 from ggrc import db
 from ggrc import models
 from ggrc.snapshotter.datastructures import Stub
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.utils import benchmark
+from ggrc.utils import revisions as revision_utils
 
 logger = getLogger(__name__)
 
 
 def get_revision_query_for(statement, filters):
   return db.session.query(
-      func.max(models.Revision.id),
+      models.Revision.id,
       models.Revision.resource_type,
       models.Revision.resource_id,
   ).filter(
       statement,
       *(filters or [])
-  ).group_by(
-      models.Revision.resource_type,
-      models.Revision.resource_id
   )
 
 
-def get_revisions_query(child_stubs, revisions, filters=None):
-  """Return revisions query for sent params."""
-  queries = []
-  if revisions:
-    queries.append(get_revision_query_for(
-        models.Revision.id.in_(revisions.values()),
-        filters,
-    ))
-  if child_stubs:
-    queries.append(get_revision_query_for(
-        tuple_(
-            models.Revision.resource_type,
-            models.Revision.resource_id,
-        ).in_(
-            child_stubs
-        ),
-        filters,
-    ))
-  if not queries:
-    queries.append(get_revision_query_for(True, filters))
-  if len(queries) == 1:
-    return queries[0]
-  return queries[0].union_all(*queries[1:])
-
-
-def get_revisions(pairs, revisions, filters=None):
+def get_revisions(pairs, revisions, skip_deleted=False):
   """Retrieve revision ids for pairs
 
   If revisions dictionary is provided it will validate that the selected
@@ -65,7 +38,7 @@ def get_revisions(pairs, revisions, filters=None):
   Args:
     pairs: set([(parent_1, child_1), (parent_2, child_2), ...])
     revisions: dict({(parent, child): revision_id, ...})
-    filters: predicate
+    skip_deleted: if set, "deleted" revisions are not used
   """
   with benchmark("snapshotter.helpers.get_revisions"):
     if not pairs:
@@ -79,11 +52,25 @@ def get_revisions(pairs, revisions, filters=None):
         child_stubs.add(child)
 
     with benchmark("get_revisions.retrieve revisions"):
-      query = get_revisions_query(child_stubs, revisions, filters)
+      rows = []
+      if revisions:
+        filters = []
+        if skip_deleted:
+          filters.append(models.Revision.action != u"deleted")
+        rows.extend(get_revision_query_for(
+            models.Revision.id.in_(revisions.values()),
+            filters,
+        ))
+      latest_ids = revision_utils.get_latest_revision_ids(
+          [tuple(child) for child in child_stubs],
+          skip_deleted=skip_deleted,
+      )
+      rows.extend((revid, restype, resid)
+                  for (restype, resid), revid in latest_ids.iteritems())
 
     revision_id_cache = {}
     with benchmark("get_revisions.create revision_id cache"):
-      for revid, restype, resid in query:
+      for revid, restype, resid in rows:
         child = Stub(restype, resid)
         for parent in parents_cache[child]:
           key = Pair(parent, child)
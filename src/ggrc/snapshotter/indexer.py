@@ -18,12 +18,14 @@ from ggrc.app import app
 from ggrc.models import all_models, background_task
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
 from ggrc.fulltext import get_indexer
+from ggrc.fulltext import shadow
 from ggrc.models.reflection import AttributeInfo
 from ggrc.utils import generate_query_chunks, helpers
 
 from ggrc.snapshotter.rules import Types
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.fulltext.attributes import FullTextAttr
+from ggrc.query import result_cache
 
 
 logger = logging.getLogger(__name__)
@@ -165,7 +167,7 @@ def reindex_snapshots(snapshot_ids):
 
 
 def delete_records(snapshot_ids):
-  """Delete all records for some snapshots.
+  """Delete all records for some snapshots in the current transaction.
   Args:
     snapshot_ids: An iterable with snapshot IDs whose full text records should
         be deleted.
@@ -174,18 +176,19 @@ def delete_records(snapshot_ids):
       Record.type == "Snapshot",
       Record.key.in_(snapshot_ids)
   ).delete(synchronize_session=False)
-  db.session.commit()
+  shadow.mark_changed("Snapshot", snapshot_ids)
+  result_cache.mark_changed(["Snapshot"])
 
 
 def insert_records(payload):
-  """Insert records to full text table.
+  """Insert records to full text table in the current transaction.
 
   Args:
     payload: List of dictionaries that represent records entries.
   """
-  engine = db.engine
-  engine.execute(Record.__table__.insert(), payload)
-  db.session.commit()
+  if payload:
+    db.session.execute(Record.__table__.insert(), payload)
+    result_cache.mark_changed(["Snapshot"])
 
 
 def get_person_data(rec, person):
@@ -285,21 +288,14 @@ def get_list_data(rec, value):
   yield newrec
 
 
-def get_properties(snapshot):
-  """Return properties for sent revision dict and pair object."""
-  properties = snapshot["revision"].copy()
-  properties.update({
-      "parent": PARENT_PROPERTY_TMPL.format(**snapshot),
-      "child": CHILD_PROPERTY_TMPL.format(**snapshot),
-      "child_type": snapshot["child_type"],
-      "child_id": snapshot["child_id"]
-  })
-  assignees = properties.pop("assignees", None) or []
-  for person, roles in assignees:
-    if person:
-      for role in roles:
-        properties[role] = [person]
-  return properties
+def get_child_properties(child_type, child_id):
+  """Return properties of snapshotted object common for its snapshots."""
+  return {
+      "child": CHILD_PROPERTY_TMPL.format(child_type=child_type,
+                                          child_id=child_id),
+      "child_type": child_type,
+      "child_id": child_id,
+  }
 
 
 def get_record_value(prop, val, rec, options):
@@ -367,73 +363,138 @@ def get_list_record_value(prop, rec, val):
   return itertools.chain(*results)
 
 
-def reindex_pairs(pairs):
-  """Reindex selected snapshots.
+def _get_revision_records(revision, cads, options):
+  """Build records of properties shared by all snapshots of the revision.
+
+  Records are built without key and tags of a snapshot, only the parent
+  property differs between snapshots of the same revision.
+  """
+  properties = get_searchable_attributes(
+      CLASS_PROPERTIES[revision.resource_type],
+      cads[revision.resource_type],
+      revision.content,
+  )
+  properties.update(get_child_properties(revision.resource_type,
+                                         revision.resource_id))
+  assignees = properties.pop("assignees", None) or []
+  for person, roles in assignees:
+    if person:
+      for role in roles:
+        properties[role] = [person]
+  records = []
+  for prop, val in properties.items():
+    records.extend(get_record_value(
+        prop,
+        val,
+        {"key": None, "type": "Snapshot", "subproperty": ""},
+        options,
+    ))
+  return records
+
+
+def get_records(pairs):
+  """Build fulltext records of selected snapshots.
+
+  Snapshots of many audits often point to the same revision, so records are
+  built once per revision and copied to all snapshots of the revision.
 
   Args:
     pairs: A list of parent-child pairs that uniquely represent snapshot
-    object whose properties should be reindexed.
+    object whose records should be built.
+
+  Returns:
+    tuple of list of snapshot ids and list of their records.
   """
-  if not pairs:
-    return
-  snapshots = dict()
-  options = get_options()
-  snapshot_query = models.Snapshot.query.filter(
+  snapshot = models.Snapshot
+  snapshots = db.session.query(
+      snapshot.id,
+      snapshot.parent_type,
+      snapshot.parent_id,
+      snapshot.child_type,
+      snapshot.child_id,
+      snapshot.revision_id,
+  ).filter(
       tuple_(
-          models.Snapshot.parent_type,
-          models.Snapshot.parent_id,
-          models.Snapshot.child_type,
-          models.Snapshot.child_id,
+          snapshot.parent_type,
+          snapshot.parent_id,
+          snapshot.child_type,
+          snapshot.child_id,
       ).in_(
           {pair.to_4tuple() for pair in pairs}
       )
+  ).all()
+  if not snapshots:
+    return [], []
+  revisions = models.Revision.query.filter(
+      models.Revision.id.in_({row.revision_id for row in snapshots})
   ).options(
-      orm.subqueryload("revision").load_only(
+      orm.load_only(
           "id",
           "resource_type",
           "resource_id",
+          "action",
+          "created_at",
+          "updated_at",
           "_content",
-      ),
-      orm.load_only(
-          "id",
-          "parent_type",
-          "parent_id",
-          "child_type",
-          "child_id",
-          "revision_id",
       )
   )
+  options = get_options()
   cad_dict = _get_custom_attribute_dict()
-  for snapshot in snapshot_query:
-    revision = snapshot.revision
-    snapshots[snapshot.id] = {
-        "id": snapshot.id,
-        "parent_type": snapshot.parent_type,
-        "parent_id": snapshot.parent_id,
-        "child_type": snapshot.child_type,
-        "child_id": snapshot.child_id,
-        "revision": get_searchable_attributes(
-            CLASS_PROPERTIES[revision.resource_type],
-            cad_dict[revision.resource_type],
-            revision.content)
-    }
+  revision_records = {
+      revision.id: _get_revision_records(revision, cad_dict, options)
+      for revision in revisions
+  }
   search_payload = []
-  for snapshot in snapshots.values():
-    for prop, val in get_properties(snapshot).items():
-      search_payload.extend(
-          get_record_value(
-              prop,
-              val,
-              {
-                  "key": snapshot["id"],
-                  "type": "Snapshot",
-                  "tags": TAG_TMPL.format(**snapshot),
-                  "subproperty": "",
-              },
-              options
-          )
-      )
-  delete_records(snapshots.keys())
+  for row in snapshots:
+    tags = TAG_TMPL.format(parent_type=row.parent_type,
+                           parent_id=row.parent_id,
+                           child_type=row.child_type)
+    parent = PARENT_PROPERTY_TMPL.format(parent_type=row.parent_type,
+                                         parent_id=row.parent_id)
+    search_payload.extend(
+        dict(record, key=row.id, tags=tags)
+        for record in revision_records.get(row.revision_id, [])
+    )
+    search_payload.append({
+        "key": row.id,
+        "type": "Snapshot",
+        "tags": tags,
+        "property": "parent",
+        "subproperty": "",
+        "content": parent,
+    })
+  return [row.id for row in snapshots], search_payload
+
+
+def get_snapshots_records(snapshot_ids):
+  """Build fulltext records of snapshots with ids."""
+  columns = db.session.query(
+      models.Snapshot.parent_type,
+      models.Snapshot.parent_id,
+      models.Snapshot.child_type,
+      models.Snapshot.child_id,
+  ).filter(models.Snapshot.id.in_(snapshot_ids))
+  records = []
+  for query_chunk in generate_query_chunks(columns):
+    _, chunk_records = get_records({Pair.from_4tuple(p) for p in query_chunk})
+    records.extend(chunk_records)
+  return records
+
+
+def reindex_pairs(pairs):
+  """Reindex selected snapshots.
+
+  Old records are replaced in the current transaction committed by the
+  caller, so readers never see snapshots without records.
+
+  Args:
+    pairs: A list of parent-child pairs that uniquely represent snapshot
+    object whose properties should be reindexed.
+  """
+  if not pairs:
+    return
+  snapshot_ids, search_payload = get_records(pairs)
+  delete_records(snapshot_ids)
   insert_records(search_payload)
 
 
@@ -459,4 +520,5 @@ def run_reindex_pairs_bg(task):
   """Run reindexation of snapshots specified in pairs."""
   pairs = task.parameters.get("pairs")
   reindex_pairs(pairs)
+  db.session.commit()
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
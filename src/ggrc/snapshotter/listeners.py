@@ -6,6 +6,7 @@
 from ggrc import db
 from ggrc import models
 from ggrc.login import get_current_user_id
+from ggrc.query import result_cache
 from ggrc.services import signals
 from ggrc.snapshotter import create_snapshots
 from ggrc.snapshotter import upsert_snapshots
@@ -67,6 +68,7 @@ def _copy_snapshot_relationships(*_, **kwargs):
       "parent_id": kwargs.get("obj").parent.id,
       "snapshot_id": kwargs.get("obj").id
   })
+  result_cache.mark_changed(["Relationship"])
 
 
 def register_snapshot_listeners():
@@ -0,0 +1,381 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Local runner of background tasks for deployments outside of App Engine.
+
+Outside of App Engine background tasks are run in the request that created
+them. With BACKGROUND_TASK_RUNNER setting enabled, create_task puts the task
+into the background_task_queue table in the same transaction as the task
+itself, and worker processes started with bin/launch_task_runner run queued
+tasks through their /_background_tasks/ views.
+
+Every queue of BACKGROUND_TASK_QUEUES setting is served by its own workers.
+A worker claims a single task at a time by setting its unique lease name and
+lease expiration time on the queue entry. The lease is extended while the
+task is running, so a task of a crashed worker is taken over by another
+worker after the lease expiration. Task views fail tasks that were started
+before, as tasks are not idempotent, so a taken over task that was already
+running is finished as failed instead of being run again.
+
+A run that raises an exception, responds with a non 2xx status code or fails
+the task it started is retried according to retry options of the task, with
+the delay doubled after every failed attempt the same way App Engine task
+queues do it. Task views respond with 200 status code even if the task fails,
+so the task status is checked after the run, and the failed task is reset to
+Pending before the retry to let the view start it again. Tasks failed by the
+view because they were started by another run are not retried.
+
+..  code-block:: bash
+
+    bin/launch_task_runner --queue ggrcImport --workers 2
+"""
+
+import argparse
+import datetime
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+import uuid
+
+import flask
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.models.background_task import BackgroundTask
+from ggrc.models.background_task import BackgroundTaskQueueItem
+from ggrc.utils import benchmark
+from ggrc.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_GROUP = "task_runner"
+
+CLAIM_SQL = """
+    UPDATE background_task_queue
+    SET lease = :lease, leased_until = :leased_until,
+        attempts = attempts + 1
+    WHERE queue = :queue AND {condition}
+    ORDER BY eta, id
+    LIMIT 1
+"""
+
+EXPIRED_LEASE_CONDITION = "leased_until < :now"
+
+READY_CONDITION = "leased_until IS NULL AND eta <= :now"
+
+
+def enqueue(bg_task, url, method, queue, retry_options):
+  """Put the task into the queue, it is stored on commit of the task."""
+  db.session.add(BackgroundTaskQueueItem(
+      bg_task=bg_task,
+      queue=queue,
+      url=url,
+      method=method,
+      retry_options=retry_options,
+      eta=datetime.datetime.utcnow(),
+  ))
+  metrics.incr(METRIC_GROUP, "enqueued")
+
+
+def get_retry_delay(retry_options, attempts):
+  """Get seconds before the next run of a task failed `attempts` times.
+
+  The delay is doubled after every failed attempt up to max_doublings times,
+  after that it is increased linearly.
+  """
+  min_backoff = retry_options.get("min_backoff_seconds", 0)
+  max_backoff = retry_options.get("max_backoff_seconds", min_backoff)
+  doublings = min(attempts - 1, retry_options.get("max_doublings", 0))
+  delay = min_backoff * 2 ** doublings * (attempts - doublings)
+  return min(delay, max_backoff)
+
+
+def _claim(condition, params):
+  """Set lease on the first queue entry matching the condition."""
+  return db.session.execute(
+      sa.text(CLAIM_SQL.format(condition=condition)),
+      params,
+  ).rowcount
+
+
+def claim(queue, lease_time):
+  """Claim the next task of the queue, tasks of failed workers go first.
+
+  Returns:
+    name of the lease of the claimed task or None if there is nothing to run.
+  """
+  now = datetime.datetime.utcnow()
+  params = {
+      "queue": queue,
+      "now": now,
+      "lease": str(uuid.uuid4()),
+      "leased_until": now + datetime.timedelta(seconds=lease_time),
+  }
+  lease = params["lease"]
+  if _claim(EXPIRED_LEASE_CONDITION, params):
+    logger.warning("Background task lease expired, taking it over as %s",
+                   lease)
+    metrics.incr(METRIC_GROUP, "expired_leases")
+  elif not _claim(READY_CONDITION, params):
+    lease = None
+  db.session.plain_commit()
+  return lease
+
+
+class _LeaseKeeper(threading.Thread):
+  """Thread extending lease of a running task until it is stopped.
+
+  Lease is updated with its own DB connection, as the task uses the session
+  of the worker thread.
+  """
+
+  def __init__(self, engine, lease, lease_time):
+    super(_LeaseKeeper, self).__init__(name="lease-{}".format(lease))
+    self.daemon = True
+    self._engine = engine
+    self._lease = lease
+    self._lease_time = lease_time
+    self._stopped = threading.Event()
+
+  def run(self):
+    table = BackgroundTaskQueueItem.__table__
+    while not self._stopped.wait(self._lease_time / 3.0):
+      leased_until = (datetime.datetime.utcnow() +
+                      datetime.timedelta(seconds=self._lease_time))
+      try:
+        self._engine.execute(table.update().where(
+            table.c.lease == self._lease,
+        ).values(leased_until=leased_until))
+      except sa.exc.SQLAlchemyError:
+        logger.exception("Failed to extend background task lease %s",
+                         self._lease)
+
+  def stop(self):
+    self._stopped.set()
+    self.join()
+
+
+def _run_view(item):
+  """Run the queued task through its background task view.
+
+  Returns:
+    status code of the view response.
+  """
+  task = item.bg_task
+  with app.test_request_context(item.url, method=item.method,
+                                headers={"X-Task-Name": task.name}):
+    if flask.request.routing_exception:
+      raise flask.request.routing_exception
+    # Task views are run with permissions of the task creator
+    # pylint: disable=protected-access
+    flask.g._current_user = task.modified_by
+    view = app.view_functions[flask.request.url_rule.endpoint]
+    response = app.make_response(view(**flask.request.view_args))
+  return response.status_code
+
+
+def _run(lease):
+  """Run the claimed task.
+
+  Returns:
+    boolean showing that the run succeeded.
+  """
+  item = BackgroundTaskQueueItem.query.filter_by(lease=lease).one()
+  metrics.observe(METRIC_GROUP, "wait_seconds",
+                  (datetime.datetime.utcnow() - item.eta).total_seconds())
+  task = item.bg_task
+  # Only a run starting the task can fail it with an error of the task itself
+  started = task.status == BackgroundTask.PENDING_STATUS
+  start_time = time.time()
+  try:
+    with benchmark("Run background task {}".format(item.bg_task.name)):
+      status_code = _run_view(item)
+  except Exception:  # pylint: disable=broad-except
+    logger.exception("Background task %s run failed", item.bg_task_id)
+    return False
+  finally:
+    metrics.observe(METRIC_GROUP, "run_seconds", time.time() - start_time)
+  if not 200 <= status_code < 300:
+    logger.warning("Background task %s run responded with %s",
+                   item.bg_task_id, status_code)
+    return False
+  db.session.refresh(task)
+  if started and task.status == BackgroundTask.FAILURE_STATUS:
+    logger.warning("Background task %s failed", item.bg_task_id)
+    return False
+  return True
+
+
+def _complete(lease, succeeded):
+  """Drop the task from the queue or schedule its retry."""
+  item = BackgroundTaskQueueItem.query.filter_by(lease=lease).first()
+  if item is None:
+    logger.warning("Background task lease %s expired during the run", lease)
+    return
+  if succeeded:
+    db.session.delete(item)
+    metrics.incr(METRIC_GROUP, "completed")
+  elif item.attempts > item.retry_options.get("task_retry_limit", 0):
+    logger.error("Background task %s failed %s times, giving up",
+                 item.bg_task_id, item.attempts)
+    task = item.bg_task
+    if task.status in (BackgroundTask.PENDING_STATUS,
+                       BackgroundTask.RUNNING_STATUS):
+      task.status = BackgroundTask.FAILURE_STATUS
+    db.session.delete(item)
+    metrics.incr(METRIC_GROUP, "failed")
+  else:
+    delay = get_retry_delay(item.retry_options, item.attempts)
+    item.eta = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+    item.lease = None
+    item.leased_until = None
+    # Task views run Pending tasks only
+    item.bg_task.status = BackgroundTask.PENDING_STATUS
+    metrics.incr(METRIC_GROUP, "retried")
+  db.session.plain_commit()
+
+
+def run_next(queue, lease_time=None):
+  """Claim and run the next task of the queue.
+
+  Every step is done in its own app context, so the task does not see
+  request globals and session objects of other tasks.
+
+  Returns:
+    boolean showing that a task was run.
+  """
+  lease_time = lease_time or settings.BACKGROUND_TASK_LEASE_TIME
+  with app.app_context():
+    lease = claim(queue, lease_time)
+    engine = db.engine
+  if lease is None:
+    return False
+  keeper = _LeaseKeeper(engine, lease, lease_time)
+  keeper.start()
+  try:
+    with app.app_context():
+      succeeded = _run(lease)
+  finally:
+    keeper.stop()
+  with app.app_context():
+    _complete(lease, succeeded)
+  return True
+
+
+def work(queue, stop_event, poll_interval=None):
+  """Run tasks of the queue until the stop event is set."""
+  poll_interval = poll_interval or settings.BACKGROUND_TASK_POLL_INTERVAL
+  while not stop_event.is_set():
+    try:
+      if run_next(queue):
+        continue
+    except Exception:  # pylint: disable=broad-except
+      logger.exception("Task runner worker of queue %s failed", queue)
+    stop_event.wait(poll_interval)
+
+
+def _work_in_process(queue, stop_event):
+  """Run worker in a child process stopped by the parent only."""
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  work(queue, stop_event)
+
+
+def _start_worker(queue, index, stop_event, use_threads):
+  """Start worker thread or process serving the queue."""
+  if use_threads:
+    worker = threading.Thread(target=work, args=(queue, stop_event))
+  else:
+    worker = multiprocessing.Process(target=_work_in_process,
+                                     args=(queue, stop_event))
+  worker.name = "{}-{}".format(queue, index)
+  worker.daemon = True
+  worker.start()
+  return worker
+
+
+def serve(queues, workers=None, use_threads=False):
+  """Run workers of the queues restarting them if they die.
+
+  Args:
+    queues: names of served queues.
+    workers: number of workers of every queue, BACKGROUND_TASK_QUEUES
+        setting value is used if it is not set.
+    use_threads: run workers in threads of the current process instead of
+        separate processes.
+  """
+  if use_threads:
+    stop_event = threading.Event()
+  else:
+    stop_event = multiprocessing.Event()
+    # Child processes must not share DB connections of the parent
+    with app.app_context():
+      db.engine.dispose()
+  running = {
+      (queue, index): _start_worker(queue, index, stop_event, use_threads)
+      for queue in queues
+      for index in range(workers or settings.BACKGROUND_TASK_QUEUES[queue])
+  }
+  logger.info("Task runner started %s workers", len(running))
+
+  signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+  try:
+    while not stop_event.is_set():
+      for (queue, index), worker in running.items():
+        if not worker.is_alive():
+          logger.error("Task runner worker %s died, restarting it",
+                       worker.name)
+          running[(queue, index)] = _start_worker(queue, index, stop_event,
+                                                  use_threads)
+      stop_event.wait(settings.BACKGROUND_TASK_POLL_INTERVAL)
+  except KeyboardInterrupt:
+    stop_event.set()
+  logger.info("Task runner is waiting for running tasks to finish")
+  for worker in running.values():
+    worker.join()
+
+
+def get_stats():
+  """Get runner counters together with number of tasks ready to run.
+
+  Counters of task runs are kept by worker processes, web instances count
+  enqueued tasks only.
+  """
+  item = BackgroundTaskQueueItem
+  now = datetime.datetime.utcnow()
+  stats = metrics.get(METRIC_GROUP)
+  ready = db.session.query(
+      item.queue, sa.func.count(item.id), sa.func.min(item.eta),
+  ).filter(
+      item.leased_until.is_(None),
+      item.eta <= now,
+  ).group_by(item.queue)
+  for queue, size, oldest in ready:
+    stats["{}.ready".format(queue)] = size
+    stats["{}.oldest_ready_age_seconds".format(queue)] = (
+        (now - oldest).total_seconds()
+    )
+  return stats
+
+
+def main(argv=None):
+  """Run task runner with command line options."""
+  queue_names = sorted(settings.BACKGROUND_TASK_QUEUES)
+  parser = argparse.ArgumentParser(description="Run queued background tasks")
+  parser.add_argument("--queue", action="append", dest="queues",
+                      choices=queue_names,
+                      help="served queue, all queues are served by default")
+  parser.add_argument("--workers", type=int,
+                      help="number of workers of every served queue")
+  parser.add_argument("--threads", action="store_true",
+                      help="run workers in threads instead of processes")
+  args = parser.parse_args(argv)
+  serve(args.queues or queue_names, args.workers, args.threads)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,135 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Helpers for running independent work in bounded threads or processes."""
+
+import multiprocessing
+import Queue
+import sys
+import threading
+
+import six
+
+# DB state inherited from the parent process is kept referenced and is never
+# used in workers, as closing it would close connections of the parent.
+_INHERITED_DB_STATE = []
+
+
+def _worker(func, tasks, results, errors):
+  """Process queued (index, item) pairs until there are no more left."""
+  while not errors:
+    try:
+      index, item = tasks.get_nowait()
+    except Queue.Empty:
+      return
+    try:
+      results[index] = func(item)
+    except Exception:  # pylint: disable=broad-except
+      errors.append(sys.exc_info())
+
+
+def map_in_threads(func, items, max_workers):
+  """Apply func to every item using at most max_workers threads.
+
+  Args:
+    func: function of a single argument.
+    items: iterable of func arguments.
+    max_workers: max number of threads run at once.
+
+  Returns:
+    list of func results in the order of items.
+
+  Raises:
+    the first exception raised by func, after all threads are finished.
+  """
+  items = list(items)
+  results = [None] * len(items)
+  errors = []
+  tasks = Queue.Queue()
+  for index, item in enumerate(items):
+    tasks.put((index, item))
+
+  threads = [threading.Thread(target=_worker,
+                              args=(func, tasks, results, errors))
+             for _ in range(min(max_workers, len(items)))]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  if errors:
+    six.reraise(*errors[0])
+  return results
+
+
+def map_in_processes(func, items, max_workers, initializer=None):
+  """Apply func to every item using a pool of at most max_workers processes.
+
+  Args:
+    func: module level function of a single argument.
+    items: iterable of picklable func arguments.
+    max_workers: max number of worker processes.
+    initializer: function called in every worker process on its start.
+
+  Returns:
+    list of func results in the order of items.
+
+  Raises:
+    the first exception raised by func.
+  """
+  items = list(items)
+  if not items:
+    return []
+  pool = multiprocessing.Pool(min(max_workers, len(items)), initializer)
+  try:
+    return pool.map(func, items, chunksize=1)
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def imap_in_processes(func, items, max_workers, initializer=None):
+  """Iterate over results of func applied in a pool of worker processes.
+
+  Unlike map_in_processes(), every result is yielded as soon as it and all
+  the previous ones are ready, so the caller can consume results without
+  keeping all of them in memory. Pool is terminated when the iteration is
+  finished or the iterator is closed.
+
+  Args:
+    func: module level function of a single argument.
+    items: iterable of picklable func arguments.
+    max_workers: max number of worker processes.
+    initializer: function called in every worker process on its start.
+
+  Yields:
+    func results in the order of items.
+
+  Raises:
+    the first exception raised by func.
+  """
+  items = list(items)
+  if not items:
+    return
+  pool = multiprocessing.Pool(min(max_workers, len(items)), initializer)
+  try:
+    for result in pool.imap(func, items, chunksize=1):
+      yield result
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def init_db_worker():
+  """Detach worker process from DB connections of the parent process.
+
+  Used as initializer of map_in_processes workers using the DB.
+  """
+  from ggrc import db
+  from ggrc.app import app
+  with app.app_context():
+    engine = db.engine
+    _INHERITED_DB_STATE.append(engine.pool)
+    engine.pool = engine.pool.recreate()
+    if db.session.registry.has():
+      _INHERITED_DB_STATE.append(db.session.registry())
+      db.session.registry.clear()
@@ -153,6 +153,8 @@ def log_event(session, obj=None, current_user_id=None, flush=True,
   for rev in revisions:
     rev["event_id"] = event.id
   db.session.execute(Revision.__table__.insert(), revisions)
+  from ggrc.utils import revisions as revision_utils
+  revision_utils.refresh_latest_revisions(event.id)
   return event
 
 
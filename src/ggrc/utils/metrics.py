@@ -0,0 +1,69 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""In-process metric counters.
+
+Counters are grouped by metric name and keyed by an arbitrary string, e.g.
+model name. Values are kept per instance and are reset on instance restart,
+they are meant for spotting trends rather than for exact accounting.
+
+..  code-block:: python
+
+    metrics.incr("collection_cache", "Control.hits", 10)
+    metrics.get("collection_cache")  # {"Control.hits": 10}
+    metrics.observe("indexing", "lag_seconds", 1.5)
+    metrics.get("indexing")
+    # {"lag_seconds.count": 1, "lag_seconds.sum": 1.5,
+    #  "lag_seconds.max": 1.5}
+"""
+
+import collections
+import threading
+
+
+_LOCK = threading.Lock()
+_COUNTERS = collections.defaultdict(collections.Counter)
+
+
+def incr(group, key, value=1):
+  """Increment counter `key` of the metric `group` by `value`."""
+  with _LOCK:
+    _COUNTERS[group][key] += value
+
+
+def observe(group, key, value):
+  """Record observed `value` updating count, sum and max counters of `key`.
+  """
+  with _LOCK:
+    counters = _COUNTERS[group]
+    counters[key + ".count"] += 1
+    counters[key + ".sum"] += value
+    counters[key + ".max"] = max(counters[key + ".max"], value)
+
+
+def get(group):
+  """Get dict of all counters of the metric `group`."""
+  with _LOCK:
+    return dict(_COUNTERS.get(group, {}))
+
+
+def get_all():
+  """Get dict of all metric groups with their counters."""
+  with _LOCK:
+    return {group: dict(counters) for group, counters in _COUNTERS.items()}
+
+
+def reset(group=None):
+  """Drop counters of the metric `group` or all counters if not specified."""
+  with _LOCK:
+    if group is None:
+      _COUNTERS.clear()
+    else:
+      _COUNTERS.pop(group, None)
+
+
+def ratio(part, total):
+  """Get part/total ratio rounded to 4 digits, 0 for empty total."""
+  if not total:
+    return 0.0
+  return round(float(part) / total, 4)
@@ -5,12 +5,118 @@
 
 from logging import getLogger
 
+import sqlalchemy as sa
+
 from ggrc import db
 from ggrc.models import all_models
+from ggrc.models.revision import LatestRevision
+from ggrc.models.types import CompressedJsonType
+from ggrc.utils import benchmark
+from ggrc.utils import list_chunks
 
 
 logger = getLogger(__name__)
 
+COMPRESS_CHUNK_SIZE = 1000
+
+
+# Revisions of an event are marked as latest ones unless newer revisions of
+# the same objects are already marked. The action is updated first, as it
+# compares the stored revision_id.
+REFRESH_LATEST_REVISIONS_SQL = """
+    INSERT INTO latest_revisions (
+        resource_type, resource_id, revision_id, action
+    )
+    SELECT r.resource_type, r.resource_id, r.id, r.action
+    FROM revisions AS r
+    JOIN (
+        SELECT MAX(id) AS id
+        FROM revisions
+        WHERE event_id = :event_id
+        GROUP BY resource_type, resource_id
+    ) AS latest ON latest.id = r.id
+    ON DUPLICATE KEY UPDATE
+        latest_revisions.action = IF(
+            VALUES(revision_id) > latest_revisions.revision_id,
+            VALUES(action),
+            latest_revisions.action
+        ),
+        latest_revisions.revision_id = GREATEST(
+            latest_revisions.revision_id,
+            VALUES(revision_id)
+        )
+"""
+
+
+def refresh_latest_revisions(event_id):
+  """Mark revisions of the event as the latest revisions of their objects.
+
+  Must be called by all code inserting revisions, after they are inserted,
+  so the latest revisions are available without aggregates over the whole
+  revisions table.
+  """
+  db.session.execute(REFRESH_LATEST_REVISIONS_SQL, {"event_id": event_id})
+
+
+def _aggregate_latest_revision_ids(stubs, skip_deleted):
+  """Get latest revision ids from the revisions table."""
+  revision = all_models.Revision
+  query = db.session.query(
+      sa.func.max(revision.id),
+      revision.resource_type,
+      revision.resource_id,
+  ).filter(
+      sa.tuple_(revision.resource_type, revision.resource_id).in_(stubs),
+  ).group_by(
+      revision.resource_type,
+      revision.resource_id,
+  )
+  if skip_deleted:
+    query = query.filter(revision.action != u"deleted")
+  return {(type_, id_): rev_id for rev_id, type_, id_ in query}
+
+
+def get_latest_revision_ids(stubs, skip_deleted=False):
+  """Get ids of the latest revisions of objects.
+
+  Args:
+    stubs: iterable of (resource_type, resource_id) pairs.
+    skip_deleted: if set, latest revision that is not a "deleted" one is
+        returned for deleted objects.
+
+  Returns:
+    dict with (resource_type, resource_id) pair as key and revision_id of the
+    latest revision as value. Objects without revisions are skipped.
+  """
+  result = {}
+  missing = []
+  with benchmark("Get latest revision ids"):
+    for chunk in list_chunks(list(set(stubs))):
+      query = db.session.query(
+          LatestRevision.resource_type,
+          LatestRevision.resource_id,
+          LatestRevision.revision_id,
+          LatestRevision.action,
+      ).filter(
+          sa.tuple_(
+              LatestRevision.resource_type,
+              LatestRevision.resource_id,
+          ).in_(chunk),
+      )
+      found = set()
+      for type_, id_, rev_id, action in query:
+        found.add((type_, id_))
+        if skip_deleted and action == u"deleted":
+          missing.append((type_, id_))
+        else:
+          result[(type_, id_)] = rev_id
+      missing.extend(stub for stub in chunk if tuple(stub) not in found)
+    # Objects with revisions written without the refresh and deleted
+    # objects are rare, so the aggregate over their revisions is cheap
+    for chunk in list_chunks(missing):
+      result.update(_aggregate_latest_revision_ids(chunk, skip_deleted))
+  return result
+
 
 def get_revisions_by_type(type_):
   """Get latest revisions for all existing objects
@@ -21,20 +127,13 @@ def get_revisions_by_type(type_):
   Returns:
     dict with object_id as key and revision_id of the latest revision as value.
   """
-
-  revisions = db.session.execute(
-      """
-      SELECT * FROM (
-          SELECT id, resource_id
-          FROM revisions
-          WHERE resource_type = :type
-          ORDER BY resource_id, id DESC
-      ) AS revs
-      GROUP BY resource_id
-      """,
-      [{"type": type_}]
+  revisions = db.session.query(
+      LatestRevision.resource_id,
+      LatestRevision.revision_id,
+  ).filter(
+      LatestRevision.resource_type == type_,
   )
-  return {row.resource_id: row.id for row in revisions}
+  return dict(revisions)
 
 
 def _get_new_objects():
@@ -131,6 +230,7 @@ def do_missing_revisions():
             obj_id, obj_type, obj_content, event.id, action, modified_by_id
         ))
     db.session.execute(revisions_table.insert(), revisions)
+    refresh_latest_revisions(event.id)
     db.session.commit()
   db.session.execute("truncate objects_without_revisions")
 
@@ -151,3 +251,37 @@ def get_last_revision_content(obj_type, obj_id):
   else:
     content = last_revision.content if last_revision else None
   return content
+
+
+def compress_revisions_content(chunk_size=COMPRESS_CHUNK_SIZE):
+  """Compress content of revisions stored before it was compressed.
+
+  Revisions are processed in chunks ordered by id and every chunk is
+  committed separately, so the task can be restarted after a failure.
+  """
+  revisions_table = all_models.Revision.__table__
+  content = revisions_table.c.content
+  uncompressed = sa.and_(
+      sa.func.length(content) >= CompressedJsonType.MIN_COMPRESSED_LENGTH,
+      sa.func.left(content, 1) != CompressedJsonType.ZLIB_HEADER,
+  )
+  update = revisions_table.update().where(
+      revisions_table.c.id == sa.bindparam("_id"),
+  ).values(content=sa.bindparam("_content"))
+  last_id = 0
+  compressed = 0
+  while True:
+    rows = db.session.execute(
+        sa.select([revisions_table.c.id, content]).where(sa.and_(
+            revisions_table.c.id > last_id,
+            uncompressed,
+        )).order_by(revisions_table.c.id).limit(chunk_size)
+    ).fetchall()
+    if not rows:
+      break
+    db.session.execute(update, [{"_id": id_, "_content": content_}
+                                for id_, content_ in rows])
+    db.session.commit()
+    last_id = rows[-1][0]
+    compressed += len(rows)
+    logger.info("Compressed content of %s revisions", compressed)
@@ -15,21 +15,28 @@ import sqlalchemy
 import flask
 from werkzeug import exceptions
 
-from ggrc import fulltext, login, models, settings, utils as ggrc_utils, \
-    extensions as ggrc_extensions, converters as ggrc_converters
+from ggrc import fulltext, login, models, settings, task_runner, \
+    utils as ggrc_utils, extensions as ggrc_extensions, \
+    converters as ggrc_converters
 from ggrc.app import app, db
 from ggrc.builder import json as builder_json
 from ggrc.cache import utils as cache_utils
-from ggrc.fulltext import mixin
+from ggrc.converters import export_parts
+from ggrc.converters import import_plan
+from ggrc.converters import status_watcher
+from ggrc.fulltext import reindex as fulltext_reindex
+from ggrc.fulltext import shadow as fulltext_shadow
 from ggrc.integrations import integrations_errors, issues
 from ggrc.models import background_task, reflection, revision
 from ggrc.models.hooks.issue_tracker import integration_utils
 from ggrc.notifications import common
+from ggrc.query import projection
+from ggrc.query import result_cache
 from ggrc.query import views as query_views
 from ggrc.rbac import permissions
 from ggrc.services import common as services_common, signals
 from ggrc.snapshotter import rules, indexer as snapshot_indexer
-from ggrc.utils import benchmark, helpers, log_event, revisions
+from ggrc.utils import benchmark, helpers, log_event, metrics, revisions
 from ggrc.utils import empty_revisions
 from ggrc.utils.contributed_objects import CONTRIBUTED_OBJECTS
 from ggrc.views import saved_searches  # noqa: F401
@@ -37,7 +44,6 @@ from ggrc.views import converters, cron, filters, notifications, registry, \
     utils, serializers, folder
 
 logger = logging.getLogger(__name__)
-REINDEX_CHUNK_SIZE = 100
 
 
 # Needs to be secured as we are removing @login_required
@@ -65,6 +71,14 @@ def find_empty_revisions(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/compress_revisions", methods=["POST"])
+@background_task.queued_task
+def compress_revisions(_):
+  """Web hook to compress content of revisions."""
+  revisions.compress_revisions_content()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/reindex_snapshots", methods=["POST"])
 @background_task.queued_task
 def reindex_snapshots(_):
@@ -91,6 +105,25 @@ def full_reindex(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/shadow_reindex", methods=["POST"])
+@background_task.queued_task
+def shadow_reindex(_):
+  """Web hook to rebuild the full text search index in a shadow table."""
+  do_full_reindex(shadow=True)
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+@app.route("/_background_tasks/swap_shadow_index", methods=["POST"])
+@background_task.queued_task
+def swap_shadow_index(_):
+  """Web hook to swap the rebuilt shadow full text search index in."""
+  fulltext_reindex.swap_shadow()
+  # Computed attributes are written into the live index table
+  from ggrc.data_platform import computed_attributes
+  computed_attributes.reindex_stored_values()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/compute_attributes", methods=["POST"])
 @background_task.queued_task
 def compute_attributes(task):
@@ -119,11 +152,27 @@ def compute_attributes(task):
 def bg_update_ft_records(task):
   """Background indexing endpoint"""
   fulltext.listeners.update_ft_records(task.parameters.get("models_ids", {}),
-                                       task.parameters.get("chunk_size"))
+                                       task.parameters.get("chunk_size"),
+                                       task.parameters.get("models_attrs"))
   db.session.plain_commit()
   return app.make_response(('success', 200, [('Content-Type', 'text/html')]))
 
 
+@app.route("/_background_tasks/indexing_queue", methods=["POST"])
+@background_task.queued_task
+def bg_process_indexing_queue(task):
+  """Background worker draining fulltext indexing queue"""
+  # pylint: disable=unused-argument
+  processed, drained = fulltext.queue.process()
+  if not drained:
+    # Worker time limit is reached, let another worker continue
+    fulltext.queue.schedule_worker(force=True)
+    db.session.commit()
+  return app.make_response((
+      "reindexed {}".format(processed), 200, [("Content-Type", "text/html")]
+  ))
+
+
 @app.route('/_background_tasks/update_audit_issues', methods=['POST'])
 @background_task.queued_task
 def update_audit_issues(args):
@@ -382,14 +431,16 @@ def _remove_dead_reindex_objects(indexed_models):
 
 
 @helpers.without_sqlalchemy_cache
-def do_reindex(with_reindex_snapshots=False, delete=False):
-  """Update the full text search index."""
+def do_reindex(with_reindex_snapshots=False, shadow=False):
+  """Update the full text search index.
+
+  Reindex is run in parallel and continues the previous unfinished reindex,
+  see ggrc.fulltext.reindex. Shadow reindex fills a copy of the index table
+  swapped with the live one at the end.
+  """
 
   indexer = fulltext.get_indexer()
-  indexed_models = {
-      m.__name__: m for m in models.all_models.all_models
-      if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
-  }
+  indexed_models = fulltext_reindex.get_indexed_models()
   people_query = db.session.query(
       models.all_models.Person.id,
       models.all_models.Person.name,
@@ -401,38 +452,21 @@ def do_reindex(with_reindex_snapshots=False, delete=False):
       models.all_models.AccessControlRole.name,
   ))
   _remove_dead_reindex_objects(indexed_models)
-  for model_name in sorted(indexed_models.keys()):
-    if delete:
-      with benchmark("Deleting records for %s" % model_name):
-        pass
-
-    logger.info("Updating index for: %s", model_name)
-    with benchmark("Create records for %s" % model_name):
-      model = indexed_models[model_name]
-      ids = [id_[0] for id_ in db.session.query(model.id)]
-      ids_count = len(ids)
-      handled_ids = 0
-      ids_chunks = ggrc_utils.list_chunks(ids, chunk_size=REINDEX_CHUNK_SIZE)
-      for ids_chunk in ids_chunks:
-        handled_ids += len(ids_chunk)
-        logger.info("%s: %s / %s", model.__name__, handled_ids, ids_count)
-        model.bulk_record_update_for(ids_chunk)
-        db.session.plain_commit()
-
-  if with_reindex_snapshots:
-    logger.info("Updating index for: %s", "Snapshot")
-    with benchmark("Create records for %s" % "Snapshot"):
-      snapshot_indexer.reindex()
-
+  fulltext_reindex.run(sorted(indexed_models),
+                       with_snapshots=with_reindex_snapshots,
+                       shadow=shadow)
   indexer.invalidate_cache()
 
 
 @helpers.without_sqlalchemy_cache
-def do_full_reindex():
+def do_full_reindex(shadow=False):
   """Update the full text search index for all models."""
 
-  do_reindex(with_reindex_snapshots=True)
-  start_compute_attributes(revision_ids="all_latest")
+  do_reindex(with_reindex_snapshots=True, shadow=shadow)
+  # Stored computed values are indexed without recomputing them, full
+  # recompute is started with /admin/compute_attributes
+  from ggrc.data_platform import computed_attributes
+  computed_attributes.reindex_stored_values()
 
 
 class SetEncoder(json.JSONEncoder):
@@ -746,6 +780,51 @@ def admin_full_reindex():
                          [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/shadow_reindex", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_shadow_reindex():
+  """Calls a webhook that rebuilds the index in a shadow table"""
+  bg_task = background_task.create_task(
+      name="shadow_reindex",
+      url=flask.url_for(shadow_reindex.__name__),
+      queued_callback=shadow_reindex
+  )
+  db.session.commit()
+  return bg_task.make_response(
+      app.make_response(("scheduled %s" % bg_task.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/swap_shadow_index", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_swap_shadow_index():
+  """Calls a webhook that swaps the rebuilt shadow index in"""
+  bg_task = background_task.create_task(
+      name="swap_shadow_index",
+      url=flask.url_for(swap_shadow_index.__name__),
+      queued_callback=swap_shadow_index
+  )
+  db.session.commit()
+  return bg_task.make_response(
+      app.make_response(("scheduled %s" % bg_task.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/compare_shadow_index", methods=["GET"])
+@login.login_required
+@login.admin_required
+def admin_compare_shadow_index():
+  """Compare shadow and live index records of a sample of objects."""
+  if not fulltext_shadow.exists():
+    raise exceptions.NotFound("Shadow index does not exist")
+  sample_size = flask.request.args.get("sample", 100, type=int)
+  body = fulltext_shadow.compare(sample_size)
+  return app.make_response(
+      (json.dumps(body), 200, [("Content-Type", "application/json")]))
+
+
 @app.route("/admin/compute_attributes", methods=["POST"])
 @login.login_required
 @login.admin_required
@@ -816,6 +895,44 @@ def admin_find_empty_revisions():
                         [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/compress_revisions", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_compress_revisions():
+  """Compress content of revisions stored uncompressed."""
+  bg_task = background_task.create_task(
+      name="compress_revisions",
+      url=flask.url_for(compress_revisions.__name__),
+      queued_callback=compress_revisions,
+  )
+  db.session.commit()
+  return bg_task.make_response(
+      app.make_response(("scheduled %s" % bg_task.name, 200,
+                        [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/metrics", methods=["GET"])
+@login.login_required
+@login.admin_required
+def admin_metrics():
+  """Get in-process metrics of the current instance."""
+  body = {
+      "collection_cache": cache_utils.get_collection_cache_stats(),
+      "export_content": metrics.get(converters.EXPORT_METRIC_GROUP),
+      "export_parts": metrics.get(export_parts.METRIC_GROUP),
+      "fulltext_indexing_queue": fulltext.queue.get_stats(),
+      "fulltext_reindex": fulltext_reindex.get_stats(),
+      "import_export_status": metrics.get(status_watcher.METRIC_GROUP),
+      "import_plan": metrics.get(import_plan.METRIC_GROUP),
+      "permissions_cache": cache_utils.get_permissions_cache_stats(),
+      "query_cache": result_cache.get_stats(),
+      "query_projection": metrics.get(projection.METRIC_GROUP),
+      "task_runner": task_runner.get_stats(),
+  }
+  return app.make_response(
+      (json.dumps(body), 200, [("Content-Type", "application/json")]))
+
+
 @app.route("/admin")
 @login.login_required
 @login.admin_required
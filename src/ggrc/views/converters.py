@@ -24,6 +24,7 @@ from flask import current_app
 from flask import json
 from flask import render_template
 from flask import request
+from flask import stream_with_context
 from werkzeug import exceptions as wzg_exceptions
 
 
@@ -37,6 +38,8 @@ from ggrc.cloud_api import task_queue
 from ggrc.converters import base
 from ggrc.converters import get_exportables
 from ggrc.converters import import_helper
+from ggrc.converters import import_plan
+from ggrc.converters import status_watcher
 from ggrc.gdrive import file_actions as fa
 from ggrc.models import all_models
 from ggrc.models import background_task
@@ -47,11 +50,14 @@ from ggrc.query import builder
 from ggrc.query import exceptions as query_exceptions
 from ggrc.utils import benchmark
 from ggrc.utils import errors as app_errors
+from ggrc.utils import metrics
 
 
 EXPORTABLES_MAP = {exportable.__name__: exportable for exportable
                    in get_exportables().values()}
 
+EXPORT_METRIC_GROUP = "export_content"
+
 IGNORE_FIELD_IN_TEMPLATE = {
     "Assessment": {"evidences_file",
                    "end_date"},
@@ -89,8 +95,14 @@ def parse_export_request():
 
 
 def export_file(export_to, filename, csv_string=None):
-  """Export file to csv file or gdrive file"""
+  """Export file to csv file or gdrive file
+
+  csv_string can be an iterable of csv parts, they are streamed to the
+  response without loading all of them for export to csv file.
+  """
   if export_to == "gdrive":
+    if not isinstance(csv_string, basestring):
+      csv_string = "".join(csv_string)
     gfile = fa.create_gdrive_file(csv_string, filename)
     headers = [('Content-Type', 'application/json'), ]
     return current_app.make_response((json.dumps(gfile), 200, headers))
@@ -99,6 +111,9 @@ def export_file(export_to, filename, csv_string=None):
         ("Content-Type", "text/csv"),
         ("Content-Disposition", "attachment"),
     ]
+    if not isinstance(csv_string, basestring):
+      return current_app.response_class(
+          stream_with_context(csv_string), 200, headers)
     return current_app.make_response((csv_string, 200, headers))
   raise wzg_exceptions.BadRequest(app_errors.BAD_PARAMS)
 
@@ -173,8 +188,12 @@ def handle_export_csv_template_request():
   return export_file(export_to, filename, csv_string)
 
 
-def make_export(objects, exportable_objects=None, ie_job=None):
-  """Make export"""
+def make_export(objects, exportable_objects=None, ie_job=None,
+                output_buffer=None):
+  """Make export
+
+  If output_buffer is set, csv data is written to it instead of returning.
+  """
   query_helper = builder.QueryHelper(objects)
   ids_by_type = query_helper.get_ids()
   converter = base.ExportConverter(
@@ -182,7 +201,7 @@ def make_export(objects, exportable_objects=None, ie_job=None):
       exportable_queries=exportable_objects,
       ie_job=ie_job,
   )
-  csv_data = converter.export_csv_data()
+  csv_data = converter.export_csv_data(output_buffer)
   object_names = "_".join(converter.get_object_names())
   return csv_data, object_names
 
@@ -227,12 +246,16 @@ def make_response(data):
   return current_app.make_response((response_json, 200, headers))
 
 
-def make_import(csv_data, dry_run, ie_job=None):
-  """Make import"""
+def make_import(csv_data, dry_run, ie_job=None, plan=None):
+  """Make import
+
+  If plan is set, object lookups are recorded to it or taken from it.
+  """
   try:
     converter = base.ImportConverter(ie_job,
                                      dry_run=dry_run,
-                                     csv_data=csv_data)
+                                     csv_data=csv_data,
+                                     plan=plan)
     converter.import_csv_data()
     return converter.get_info()
   except models_exceptions.ImportStoppedException:
@@ -257,23 +280,34 @@ def run_export(task):
 
   try:
     ie_job = import_export.get(ie_id)
-    content, _ = make_export(objects, exportable_objects, ie_job)
+    content_writer = import_export.ContentChunkWriter(ie_job)
+    make_export(objects, exportable_objects, ie_job, content_writer)
+    content_writer.close()
+    metrics.observe(EXPORT_METRIC_GROUP, "buffer_bytes",
+                    content_writer.max_buffer_size)
+    metrics.incr(EXPORT_METRIC_GROUP, "chunks", content_writer.chunks_count)
     db.session.refresh(ie_job)
     if ie_job.status == "Stopped":
+      import_export.delete_content_chunks(ie_id)
+      db.session.commit()
       return utils.make_simple_response()
     ie_job.status = "Finished"
     ie_job.end_at = datetime.utcnow()
-    ie_job.content = content
     db.session.commit()
 
     job_emails.send_email(job_emails.EXPORT_COMPLETED, user.email,
                           ie_job.title, ie_id)
   except models_exceptions.ExportStoppedException:
     logger.info("Export was stopped by user.")
+    db.session.rollback()
+    import_export.delete_content_chunks(ie_id)
+    db.session.commit()
   except Exception as e:  # pylint: disable=broad-except
     logger.exception("Export failed: %s", e.message)
-    ie_job = import_export.get(ie_id)
+    db.session.rollback()
     try:
+      import_export.delete_content_chunks(ie_id)
+      ie_job = import_export.get(ie_id)
       ie_job.status = "Failed"
       ie_job.end_at = datetime.utcnow()
       db.session.commit()
@@ -286,6 +320,16 @@ def run_export(task):
   return utils.make_simple_response()
 
 
+def _load_import_plan(ie_job):
+  """Load objects planned by the analysis phase of the import job."""
+  if not ie_job.import_plan:
+    return None
+  with benchmark("Load import plan"):
+    plan = import_plan.ImportPlan.loads(ie_job.import_plan)
+    plan.load()
+  return plan
+
+
 @app.route("/_background_tasks/run_import_phases", methods=["POST"])  # noqa: ignore=C901
 @background_task.queued_task
 def run_import_phases(task):
@@ -302,7 +346,8 @@ def run_import_phases(task):
     )
 
     if ie_job.status == "Analysis":
-      info = make_import(csv_data, True, ie_job)
+      plan = import_plan.ImportPlan()
+      info = make_import(csv_data, True, ie_job, plan)
       db.session.rollback()
       db.session.refresh(ie_job)
       if ie_job.status == "Stopped":
@@ -316,6 +361,7 @@ def run_import_phases(task):
           job_emails.send_email(job_emails.IMPORT_FAILED, user.email,
                                 ie_job.title)
           return utils.make_simple_response()
+      ie_job.import_plan = plan.dumps()
       for block_info in info:
         if block_info["block_warnings"] or block_info["row_warnings"]:
           ie_job.status = "Blocked"
@@ -327,10 +373,11 @@ def run_import_phases(task):
       db.session.commit()
 
     if ie_job.status == "In Progress":
-      info = make_import(csv_data, False, ie_job)
+      info = make_import(csv_data, False, ie_job, _load_import_plan(ie_job))
       if ie_job.status == "Stopped":
         return utils.make_simple_response()
       ie_job.results = json.dumps(info)
+      ie_job.import_plan = None
       for block_info in info:
         if block_info["block_errors"] or block_info["row_errors"]:
           ie_job.status = "Analysis Failed"
@@ -553,7 +600,9 @@ def handle_file_download(id2):
   try:
     export_to = request.args.get("export_to")
     ie = import_export.get(id2)
-    return export_file(export_to, ie.title, ie.content.encode("utf-8"))
+    content = (part.encode("utf-8")
+               for part in import_export.iter_content(ie))
+    return export_file(export_to, ie.title, content)
   except (wzg_exceptions.Forbidden,
           wzg_exceptions.NotFound,
           wzg_exceptions.Unauthorized):
@@ -659,6 +708,7 @@ def handle_import_stop(**kwargs):
         stop_ie_bg_tasks(ie_job)
       db.session.commit()
       expire_ie_cache(ie_job)
+      status_watcher.notify_stopped(ie_job.id)
       return make_import_export_response(ie_job.log_json())
     if ie_job.status == "Stopped":
       raise models_exceptions.ImportStoppedException()
@@ -686,6 +736,7 @@ def handle_export_stop(**kwargs):
         stop_ie_bg_tasks(ie_job)
       db.session.commit()
       expire_ie_cache(ie_job)
+      status_watcher.notify_stopped(ie_job.id)
       return make_import_export_response(ie_job.log_json())
     if ie_job.status == "Stopped":
       raise models_exceptions.ExportStoppedException()
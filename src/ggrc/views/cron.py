@@ -65,6 +65,11 @@ def import_health_cron_endpoint():
   return job_runner("IMPORT_EXPORT_JOBS")
 
 
+def fulltext_indexing_cron_endpoint():
+  """Endpoint running fulltext indexing jobs from all modules."""
+  return job_runner("FULLTEXT_INDEXING_JOBS")
+
+
 def init_cron_views(app):
   """Init all cron jobs' endpoints"""
   app.add_url_rule(
@@ -86,3 +91,8 @@ def init_cron_views(app):
       "/import_health_cron_endpoint", "import_health_cron_endpoint",
       view_func=import_health_cron_endpoint
   )
+
+  app.add_url_rule(
+      "/fulltext_indexing_cron_endpoint", "fulltext_indexing_cron_endpoint",
+      view_func=fulltext_indexing_cron_endpoint
+  )
@@ -6,6 +6,7 @@
 import datetime
 import itertools
 import logging
+import time
 
 import flask
 import sqlalchemy as sa
@@ -26,7 +27,7 @@ from ggrc.rbac.permissions_provider import DefaultUserPermissions
 from ggrc.cache import utils as cache_utils
 from ggrc.services import signals
 from ggrc.services.registry import service
-from ggrc.utils import benchmark, memcache
+from ggrc.utils import benchmark, memcache, metrics
 from ggrc_basic_permissions.contributed_roles import BasicRoleDeclarations
 from ggrc_basic_permissions.converters.handlers import COLUMN_HANDLERS
 from ggrc_basic_permissions.models import Role
@@ -159,15 +160,6 @@ def query_memcache(cache, key):
       permissions_cache (dict): dict with all permissions or None if there
                                 was a cache miss
   """
-
-  cached_keys_set = cache.get('permissions:list') or set()
-  if key not in cached_keys_set:
-    # We set the permissions:list variable so that we are able to batch
-    # remove all permissions related keys from memcache
-    cached_keys_set.add(key)
-    cache.set('permissions:list', cached_keys_set, PERMISSION_CACHE_TIMEOUT)
-    return None
-
   return memcache.blob_get(cache, key)
 
 
@@ -390,19 +382,17 @@ def store_results_into_memcache(permissions, cache, key):
       permissions (dict): dict where the permissions will be stored
       cache (cache_manager): Cache manager that should be used for storing
                              permissions
-      key (string): key of under which permissions should be stored
+      key (string): key of under which permissions should be stored, taken
+                    before the permissions were loaded
   Returns:
       None
   """
-
-  cached_keys_set = cache.get('permissions:list') or set()
-  if key in cached_keys_set and \
-     not memcache.blob_set(
-         cache,
-         key,
-         permissions,
-         exp_time=PERMISSION_CACHE_TIMEOUT,
-     ):
+  if not memcache.blob_set(
+      cache,
+      key,
+      permissions,
+      exp_time=PERMISSION_CACHE_TIMEOUT,
+  ):
     logger.error("Failed to set permissions data into memcache")
 
 
@@ -450,18 +440,22 @@ def load_permissions_for(user):
   'condition' is the string name of a conditional operator, such as 'contains'.
   'terms' are the arguments to the 'condition'.
   """
-  key = 'permissions:{}'.format(user.id)
-
   # try to get cached permissions from memcahe
   with benchmark("load_permissions > query memcache"):
     cache = _get_memcache_client()
     if cache:
+      key = cache_utils.get_permissions_cache_key(cache, user.id)
       result = query_memcache(cache, key)
       if result:
+        metrics.incr(cache_utils.PERMISSIONS_CACHE_METRIC, "hits")
         return result
+      metrics.incr(cache_utils.PERMISSIONS_CACHE_METRIC, "misses")
 
   # no permissions were stored in memcache for this user. Use DB to get perms
+  started = time.time()
   permissions = _load_permissions_from_database(user)
+  metrics.observe(cache_utils.PERMISSIONS_CACHE_METRIC, "rebuild_seconds",
+                  time.time() - started)
 
   # store calculated permissions into memcahe
   if not hasattr(flask.g, "referenced_object_stubs"):
@@ -772,3 +772,47 @@ class TestExportPerformance(TestCase):
       self.assertNotEqual(counter.get, 0)
       self.assertLessEqual(counter.get, query_limit)
     self.assertEqual(len(response[model_name]), 3)
+
+  def _create_objectives_with_ca(self, cad, count):
+    """Create objectives with person mapped by custom attribute."""
+    with factories.single_commit():
+      for _ in range(count):
+        objective = factories.ObjectiveFactory()
+        person = factories.PersonFactory()
+        factories.CustomAttributeValueFactory(
+            custom_attribute=cad,
+            attributable=objective,
+            attribute_value=person.type,
+            attribute_object_id=person.id,
+        )
+
+  def _export_objectives(self):
+    """Export all objectives and count queries per exported row."""
+    data = [{
+        "object_name": "Objective",
+        "filters": {
+            "expression": {},
+        },
+        "fields": "all",
+    }]
+    with utils.QueryCounter() as counter:
+      response = self.export_parsed_csv(data)["Objective"]
+    return response, float(counter.get) / len(response)
+
+  def test_queries_per_row(self):
+    """Export query count does not depend on exported rows count."""
+    cad = factories.CustomAttributeDefinitionFactory(
+        definition_type="objective",
+        attribute_type="Map:Person",
+        title="Person CA",
+    )
+    self._create_objectives_with_ca(cad, 2)
+    _, small_ratio = self._export_objectives()
+    self._create_objectives_with_ca(cad, 18)
+    response, large_ratio = self._export_objectives()
+
+    self.assertEqual(len(response), 20)
+    self.assertLess(large_ratio, small_ratio / 2)
+    emails = {value.attribute_object.email
+              for value in all_models.CustomAttributeValue.query}
+    self.assertEqual({row["Person CA"] for row in response}, emails)
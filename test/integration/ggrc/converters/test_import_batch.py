@@ -0,0 +1,75 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for batched commits of imported rows."""
+
+from collections import OrderedDict
+
+import mock
+
+from ggrc.converters import errors
+from ggrc.converters import import_batch
+from ggrc.models import all_models
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+
+
+class TestImportBatch(TestCase):
+  """Tests for import of rows committed in batches."""
+
+  def setUp(self):
+    super(TestImportBatch, self).setUp()
+    metrics.reset(import_batch.METRIC_GROUP)
+    self.client.get("/login")
+    patcher = mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", new=2)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _import_markets(self):
+    """Import three markets with an invalid one in the middle."""
+    rows = [
+        OrderedDict([
+            ("object_type", "Market"),
+            ("Code*", "market-{}".format(index)),
+            ("Title*", title),
+            ("Admin*", "user@example.com"),
+        ])
+        for index, title in enumerate(["first", "", "second", "third"])
+    ]
+    return self.import_data(*rows)
+
+  def _check_imported(self, response):
+    """Check that only valid markets are imported."""
+    self._check_csv_response(response, {
+        "Market": {
+            "row_errors": {
+                errors.MISSING_VALUE_ERROR.format(line=4, column_name="Title")
+            },
+        },
+    })
+    self.assertEqual(response[0]["created"], 3)
+    self.assertEqual(
+        sorted(market.title for market in all_models.Market.query),
+        ["first", "second", "third"],
+    )
+    self.assertEqual(
+        all_models.Revision.query.filter_by(resource_type="Market").count(),
+        3,
+    )
+
+  def test_batches(self):
+    """Valid rows are committed in batches with a single event."""
+    events_count = all_models.Event.query.count()
+    self._check_imported(self._import_markets())
+    self.assertEqual(all_models.Event.query.count() - events_count, 2)
+    self.assertEqual(metrics.get(import_batch.METRIC_GROUP),
+                     {"committed": 2, "rows": 3})
+
+  def test_failed_batch_replayed(self):
+    """Rows of the failed batch are committed one by one."""
+    with mock.patch.object(import_batch.ImportBatch, "_commit",
+                           side_effect=ValueError):
+      response = self._import_markets()
+    self._check_imported(response)
+    self.assertEqual(metrics.get(import_batch.METRIC_GROUP),
+                     {"replayed": 2})
@@ -9,8 +9,10 @@ import mock
 
 from appengine import base
 from ggrc import models
+from ggrc.cache import utils as cache_utils
 from ggrc.converters import errors
 from ggrc.models import all_models
+from ggrc.utils import memcache
 import ggrc_basic_permissions
 from integration.ggrc import TestCase, api_helper
 from integration.ggrc import generator
@@ -560,15 +562,13 @@ class TestImportPermissions(TestCase):
       rbac_factories.UserRoleFactory(role=system_role, person=user)
       market.add_person_with_role_name(user, "Admin")
 
-    user_perm_key = 'permissions:{}'.format(user_id)
-
     # Recalculate permissions under new user
     self.api.set_user(user)
     self.api.client.get("/permissions")
 
-    perm_ids = self.memcache_client.get('permissions:list')
-    self.assertEqual(perm_ids, {user_perm_key})
-    user_perm = self.memcache_client.get(user_perm_key)
+    user_perm_key = cache_utils.get_permissions_cache_key(
+        self.memcache_client, user_id)
+    user_perm = memcache.blob_get(self.memcache_client, user_perm_key)
     self.assertIsNotNone(user_perm)
 
     data = [
@@ -583,10 +583,10 @@ class TestImportPermissions(TestCase):
     self.assert200(response)
     self.assertEqual(all_models.Objective.query.count(), 1)
 
-    perm_ids = self.memcache_client.get('permissions:list')
-    self.assertEqual(perm_ids, set())
-    user_perm = self.memcache_client.get(user_perm_key)
-    self.assertIsNone(user_perm)
+    self.assertNotEqual(
+        cache_utils.get_permissions_cache_key(self.memcache_client, user_id),
+        user_perm_key,
+    )
 
   def test_import_without_code_object(self):
     """Test import csv without 'Code' but with existing title."""
@@ -0,0 +1,180 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Benchmark tests for incremental update of computed attributes."""
+
+import datetime
+
+import ddt
+import mock
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc.data_platform import computed_attributes
+from ggrc.fulltext import mysql
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class RowCounter(object):
+  """Context manager counting rows read by select statements."""
+
+  def __init__(self):
+    self.rows = 0
+
+  def _count(self, _conn, cursor, statement, *_):
+    if statement.lstrip().upper().startswith("SELECT"):
+      self.rows += cursor.rowcount
+
+  def __enter__(self):
+    sa.event.listen(sa.engine.Engine, "after_cursor_execute", self._count)
+    return self
+
+  def __exit__(self, *_):
+    sa.event.remove(sa.engine.Engine, "after_cursor_execute", self._count)
+
+
+@ddt.ddt
+class TestIncrementalComputedAttributes(TestCase):
+  """Compare incremental update of computed values with their recompute.
+
+  Every assessment is mapped to snapshots of all controls, so a recompute
+  reads values of all assessments for every affected control.
+  """
+
+  CONTROL_COUNT = 10
+  ASSESSMENT_COUNT = 5
+
+  def setUp(self):
+    super(TestIncrementalComputedAttributes, self).setUp()
+    with factories.single_commit():
+      audit = factories.AuditFactory()
+      controls = [factories.ControlFactory()
+                  for _ in range(self.CONTROL_COUNT)]
+    snapshots = self._create_snapshots(audit, controls)
+    with factories.single_commit():
+      assessments = [
+          factories.AssessmentFactory(
+              audit=audit,
+              status="Completed",
+              finished_date=datetime.datetime(2019, 1, day),
+          )
+          for day in range(1, self.ASSESSMENT_COUNT + 1)
+      ]
+      for assessment in assessments:
+        for snapshot in snapshots:
+          factories.RelationshipFactory(source=assessment,
+                                        destination=snapshot)
+    self.audit_id = audit.id
+    self.control_ids = [control.id for control in controls]
+    self.assessment_ids = [assessment.id for assessment in assessments]
+    computed_attributes.compute_attributes("all_latest")
+
+  @staticmethod
+  def _get_values():
+    """Get all stored computed values with their sources."""
+    attributes = all_models.Attributes
+    return sorted(db.session.query(
+        attributes.object_type,
+        attributes.object_id,
+        attributes.attribute_template_id,
+        attributes.value_datetime,
+        attributes.value_string,
+        attributes.source_id,
+    ))
+
+  def _change_finished_date(self, index, finished_date):
+    """Change finished date of the assessment and get its revision id."""
+    assessment = all_models.Assessment.query.get(self.assessment_ids[index])
+    assessment.finished_date = finished_date
+    return factories.RevisionFactory(
+        obj=assessment,
+        action="modified",
+        content=assessment.log_json(),
+    ).id
+
+  def _compare(self, revision_ids):
+    """Run incremental update and recompute for revisions.
+
+    Returns:
+      tuple of numbers of rows read by both of them.
+    """
+    with RowCounter() as incremental:
+      computed_attributes.compute_attributes(revision_ids, incremental=True)
+    values = self._get_values()
+
+    with RowCounter() as recompute:
+      computed_attributes.compute_attributes(revision_ids, incremental=False)
+    self.assertEqual(self._get_values(), values)
+
+    computed_attributes.compute_attributes("all_latest")
+    self.assertEqual(self._get_values(), values)
+    return incremental.rows, recompute.rows
+
+  def test_increased_value(self):
+    """Increased value is applied without reading other aggregates."""
+    old_values = self._get_values()
+    revision_id = self._change_finished_date(
+        0, datetime.datetime(2019, 2, 1))
+
+    incremental_rows, recompute_rows = self._compare([revision_id])
+
+    self.assertNotEqual(self._get_values(), old_values)
+    self.assertLess(incremental_rows, recompute_rows)
+
+  @ddt.data(
+      (4, datetime.datetime(2018, 12, 1)),
+      (4, None),
+      (0, datetime.datetime(2018, 12, 1)),
+  )
+  @ddt.unpack
+  def test_decreased_value(self, index, finished_date):
+    """Decreased value is recomputed if it is the source value."""
+    revision_id = self._change_finished_date(index, finished_date)
+    self._compare([revision_id])
+
+  def test_new_snapshots(self):
+    """New snapshots get stored values of their objects."""
+    controls = all_models.Control.query.filter(
+        all_models.Control.id.in_(self.control_ids[:3]),
+    ).all()
+    audit = factories.AuditFactory()
+    snapshots = self._create_snapshots(audit, controls)
+    revision_ids = [revision_id for revision_id, in db.session.query(
+        all_models.Revision.id,
+    ).filter(
+        all_models.Revision.resource_type == "Snapshot",
+        all_models.Revision.resource_id.in_([s.id for s in snapshots]),
+    )]
+
+    self._compare(revision_ids)
+
+    for snapshot in all_models.Snapshot.query.filter(
+        all_models.Snapshot.parent_id == audit.id,
+    ):
+      self.assertEqual(snapshot.last_assessment_date,
+                       datetime.datetime(2019, 1, self.ASSESSMENT_COUNT))
+
+  @ddt.data(computed_attributes.CA_CHUNK_SIZE, 3)
+  def test_reindex_stored_values(self, chunk_size):
+    """Index entries are written from stored values by chunks."""
+    record = mysql.MysqlRecordProperty
+    index_entries = record.query.filter(
+        record.property == "last_assessment_date",
+    )
+    expected = sorted(index_entries.values(record.type, record.key,
+                                           record.tags, record.content))
+    self.assertEqual(len(expected), self.CONTROL_COUNT * 2)
+    index_entries.delete(synchronize_session=False)
+    db.session.commit()
+
+    with mock.patch.object(computed_attributes, "CA_CHUNK_SIZE",
+                           new=chunk_size):
+      computed_attributes.reindex_stored_values()
+
+    self.assertEqual(
+        sorted(index_entries.values(record.type, record.key, record.tags,
+                                    record.content)),
+        expected,
+    )
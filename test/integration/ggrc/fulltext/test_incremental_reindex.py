@@ -0,0 +1,71 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Benchmark tests for incremental fulltext reindex."""
+
+import ddt
+
+from ggrc import db
+from ggrc.fulltext import mysql
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+class TestIncrementalReindex(TestCase):
+  """Compare rows written by full and incremental reindex."""
+
+  OBJ_COUNT = 10
+
+  def setUp(self):
+    super(TestIncrementalReindex, self).setUp()
+    with factories.single_commit():
+      self.control_ids = [factories.ControlFactory().id
+                          for _ in range(self.OBJ_COUNT)]
+
+  @staticmethod
+  def _get_index(ids):
+    """Get index rows stored for controls."""
+    return sorted(db.session.query(
+        mysql.MysqlRecordProperty.key,
+        mysql.MysqlRecordProperty.property,
+        mysql.MysqlRecordProperty.subproperty,
+        mysql.MysqlRecordProperty.content,
+    ).filter(
+        mysql.MysqlRecordProperty.type == "Control",
+        mysql.MysqlRecordProperty.key.in_(ids),
+    ).all())
+
+  def _edit_title(self, control_id, title):
+    """Change title in DB without triggering reindex."""
+    db.session.execute(
+        all_models.Control.__table__.update().where(
+            all_models.Control.id == control_id
+        ).values(title=title)
+    )
+    db.session.expire_all()
+
+  @ddt.data(True, False)
+  def test_same_index(self, incremental):
+    """Incremental and full reindex produce the same records."""
+    self._edit_title(self.control_ids[0], "new title")
+    all_models.Control.bulk_record_update_for(
+        self.control_ids, incremental=incremental)
+    index = self._get_index(self.control_ids)
+    all_models.Control.bulk_record_update_for(
+        self.control_ids, incremental=not incremental)
+    self.assertEqual(index, self._get_index(self.control_ids))
+    self.assertIn(
+        (self.control_ids[0], u"title", u"", u"new title"), index)
+
+  def test_rows_written_per_edited_object(self):
+    """Incremental reindex writes only changed rows."""
+    self._edit_title(self.control_ids[0], "title 1")
+    full = all_models.Control.bulk_record_update_for(
+        self.control_ids, incremental=False)
+    self._edit_title(self.control_ids[0], "title 2")
+    incremental = all_models.Control.bulk_record_update_for(
+        self.control_ids, incremental=True)
+    self.assertGreater(full, 2 * len(self.control_ids))
+    self.assertEqual(incremental, 1)
@@ -0,0 +1,121 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for DB backed fulltext indexing queue."""
+
+import mock
+
+from ggrc import db
+from ggrc.fulltext import listeners
+from ggrc.fulltext import mysql
+from ggrc.fulltext import queue
+from ggrc.models import all_models
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+from integration.ggrc import api_helper
+from integration.ggrc.models import factories
+
+
+# pylint: disable=protected-access
+class TestIndexingQueue(TestCase):
+  """Tests for enqueueing and processing of indexing queue entries."""
+
+  def setUp(self):
+    super(TestIndexingQueue, self).setUp()
+    metrics.reset(queue.METRIC_GROUP)
+    with factories.single_commit():
+      self.control_id = factories.ControlFactory().id
+
+  @staticmethod
+  def _get_entries():
+    """Get queue entries as tuples."""
+    item = queue.FulltextIndexQueueItem
+    return db.session.query(
+        item.object_type, item.object_id, item.attrs, item.batch,
+    ).order_by(item.id).all()
+
+  def _get_title_index(self):
+    """Get title index content of the control."""
+    record = mysql.MysqlRecordProperty
+    return db.session.query(record.content).filter(
+        record.type == "Control",
+        record.key == self.control_id,
+        record.property == "title",
+    ).scalar()
+
+  def test_coalesce_entries(self):
+    """Repeated changes of an object are stored in one entry."""
+    queue.enqueue({"Control": {self.control_id}},
+                  {"Control": {self.control_id: {"title"}}})
+    queue.enqueue({"Control": {self.control_id}},
+                  {"Control": {self.control_id: {"description"}}})
+    entries = self._get_entries()
+    self.assertEqual(len(entries), 1)
+    self.assertEqual(queue._parse_attrs(entries[0].attrs),
+                     {"title", "description"})
+
+    queue.enqueue({"Control": {self.control_id}})
+    self.assertEqual(self._get_entries(),
+                     [("Control", self.control_id, None, "")])
+
+  def test_claimed_entry_not_coalesced(self):
+    """Changes made during batch processing are queued separately."""
+    queue.enqueue({"Control": {self.control_id}})
+    batch = queue.claim_batch(10, 60)
+    queue.enqueue({"Control": {self.control_id}})
+    self.assertEqual(
+        [entry.batch for entry in self._get_entries()], [batch, ""])
+
+  def test_process(self):
+    """Queued objects are reindexed and removed from the queue."""
+    db.session.execute(
+        all_models.Control.__table__.update().where(
+            all_models.Control.id == self.control_id
+        ).values(title="new title")
+    )
+    queue.enqueue({"Control": {self.control_id}})
+    db.session.commit()
+
+    processed, drained = queue.process()
+
+    self.assertEqual((processed, drained), (1, True))
+    self.assertEqual(self._get_entries(), [])
+    self.assertEqual(self._get_title_index(), u"new title")
+    stats = queue.get_stats()
+    self.assertEqual(stats["processed"], 1)
+    self.assertEqual(stats["lag_seconds.count"], 1)
+    self.assertEqual(stats["size"], 0)
+
+  def test_expired_batch_taken_over(self):
+    """Batch of a failed worker is processed after the lease expiration."""
+    queue.enqueue({"Control": {self.control_id}})
+    batch = queue.claim_batch(10, -1)
+    self.assertEqual(queue.claim_batch(10, 60), batch)
+    self.assertIsNone(queue.claim_batch(10, 60))
+
+  def test_api_change_indexed(self):
+    """Objects changed through API are searchable after queue processing."""
+    api = api_helper.Api()
+    control = all_models.Control.query.get(self.control_id)
+    # Objects are queued only by requests not indexing them on commit
+    with mock.patch.object(listeners, "reindex_on_commit",
+                           return_value=False):
+      with mock.patch("ggrc.settings.FULLTEXT_INDEXING_QUEUE", new=True):
+        response = api.put(control, {"title": "api title"})
+    self.assert200(response)
+    self.assertEqual(self._get_entries(), [])
+    self.assertEqual(self._get_title_index(), u"api title")
+    self.assertEqual(queue.get_stats()["enqueued"], 1)
+
+  def test_workers_limit(self):
+    """Workers are not scheduled above the limit."""
+    with factories.single_commit():
+      factories.BackgroundTaskFactory(name="1_indexing_queue",
+                                      status="Pending")
+      factories.BackgroundTaskFactory(name="2_indexingXqueue",
+                                      status="Pending")
+    self.assertEqual(queue._active_workers_count(), 1)
+    with mock.patch("ggrc.settings.FULLTEXT_INDEXING_QUEUE_WORKERS", new=1):
+      self.assertIsNone(queue.schedule_worker())
+    db.session.commit()
+    self.assertEqual(queue.FulltextIndexQueueState.query.count(), 1)
@@ -0,0 +1,74 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for reindex of changed attributes only."""
+
+from ggrc import db
+from ggrc.fulltext import mysql
+from ggrc.models import all_models
+from integration.ggrc import TestCase, Api
+from integration.ggrc.models import factories
+
+
+class TestPartialReindex(TestCase):
+  """Tests for reindex of changed attributes only."""
+
+  def setUp(self):
+    super(TestPartialReindex, self).setUp()
+    self.api = Api()
+    with factories.single_commit():
+      control = factories.ControlFactory()
+      person = factories.PersonFactory()
+      factories.AccessControlPersonFactory(
+          ac_list=control.acr_name_acl_map["Admin"],
+          person=person,
+      )
+    self.control_id = control.id
+    self.person_email = person.email
+
+  def _get_content(self, prop):
+    """Get indexed content of control property."""
+    return set(content for content, in db.session.query(
+        mysql.MysqlRecordProperty.content,
+    ).filter(
+        mysql.MysqlRecordProperty.type == "Control",
+        mysql.MysqlRecordProperty.key == self.control_id,
+        mysql.MysqlRecordProperty.property == prop,
+    ))
+
+  def test_changed_attrs_only(self):
+    """Properties not depending on changed attributes are not rebuilt."""
+    db.session.execute(
+        all_models.Control.__table__.update().where(
+            all_models.Control.id == self.control_id
+        ).values(title="new title")
+    )
+    mysql.MysqlRecordProperty.query.filter_by(
+        type="Control", key=self.control_id, property="Admin",
+    ).delete()
+    db.session.expire_all()
+
+    all_models.Control.bulk_record_update_for(
+        [self.control_id], changed_attrs={"title"})
+
+    self.assertEqual(self._get_content("title"), {"new title"})
+    self.assertEqual(self._get_content("Admin"), set())
+
+  def test_put_title(self):
+    """Title update keeps ACL properties in index."""
+    control = all_models.Control.query.get(self.control_id)
+    response = self.api.put(control, {"title": "new title"})
+    self.assert200(response)
+    self.assertEqual(self._get_content("title"), {"new title"})
+    self.assertIn(self.person_email, self._get_content("Admin"))
+
+  def test_acl_change(self):
+    """Adding person to ACL reindexes role property."""
+    control = all_models.Control.query.get(self.control_id)
+    person = factories.PersonFactory()
+    factories.AccessControlPersonFactory(
+        ac_list=control.acr_name_acl_map["Admin"],
+        person=person,
+    )
+    db.session.commit()
+    self.assertIn(person.email, self._get_content("Admin"))
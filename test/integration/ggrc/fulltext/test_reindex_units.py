@@ -0,0 +1,80 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for parallel resumable full reindex."""
+
+import mock
+
+from ggrc import db
+from ggrc.fulltext import reindex
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestReindexUnits(TestCase):
+  """Tests for partitioning and resuming of full reindex."""
+
+  def setUp(self):
+    super(TestReindexUnits, self).setUp()
+    metrics.reset(reindex.METRIC_GROUP)
+    with factories.single_commit():
+      self.control_ids = sorted(factories.ControlFactory().id
+                                for _ in range(3))
+
+  @staticmethod
+  def _get_units():
+    """Get id ranges and reindexed records of units."""
+    unit = reindex.ReindexUnit
+    return db.session.query(
+        unit.first_id, unit.last_id, unit.records,
+    ).order_by(unit.id).all()
+
+  def test_partition(self):
+    """Objects are reindexed in units of consecutive ids."""
+    name = reindex.run(["Control"], unit_size=2)
+
+    ids = self.control_ids
+    self.assertEqual(self._get_units(),
+                     [(ids[0], ids[1], 2), (ids[2], ids[2], 1)])
+    stats = reindex.get_stats(name)["Control"]
+    self.assertEqual(
+        (stats["units"], stats["finished_units"], stats["records"]),
+        (2, 2, 3),
+    )
+    self.assertEqual(metrics.get(reindex.METRIC_GROUP),
+                     {"Control.records": 3, "units": 2})
+
+  def test_resume(self):
+    """Reindex continues unfinished units of the failed reindex."""
+    with mock.patch.object(reindex, "_reindex_objects",
+                           side_effect=[None, ValueError]):
+      with self.assertRaises(ValueError):
+        reindex.run(["Control"], unit_size=1)
+    self.assertEqual([records for _, _, records in self._get_units()],
+                     [1, None, None])
+    failed_name = db.session.query(reindex.ReindexUnit.reindex).first()[0]
+
+    with mock.patch.object(reindex, "_reindex_objects") as reindex_objects:
+      name = reindex.run(["Control"], unit_size=1)
+    self.assertEqual(name, failed_name)
+    self.assertEqual(
+        [call[0] for call in reindex_objects.call_args_list],
+        [("Control", [self.control_ids[1]], False),
+         ("Control", [self.control_ids[2]], False)],
+    )
+    self.assertEqual([records for _, _, records in self._get_units()],
+                     [1, 1, 1])
+    self.assertEqual(metrics.get(reindex.METRIC_GROUP)["resumed"], 1)
+
+  def test_snapshots_not_resumed(self):
+    """Reindex with snapshots does not continue reindex without them."""
+    with mock.patch.object(reindex, "_reindex_objects",
+                           side_effect=ValueError):
+      with self.assertRaises(ValueError):
+        reindex.run(["Control"], unit_size=1)
+    failed_name = db.session.query(reindex.ReindexUnit.reindex).first()[0]
+
+    name = reindex.run(["Control"], with_snapshots=True, unit_size=1)
+    self.assertNotEqual(name, failed_name)
+    self.assertEqual(len(self._get_units()), 3)
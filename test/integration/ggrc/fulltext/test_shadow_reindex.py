@@ -0,0 +1,134 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for fulltext reindex into the shadow table."""
+
+import mock
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc.fulltext import get_indexer
+from ggrc.fulltext import mysql
+from ggrc.fulltext import reindex
+from ggrc.fulltext import shadow
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc import api_helper
+from integration.ggrc.models import factories
+
+
+# pylint: disable=protected-access
+class TestShadowReindex(TestCase):
+  """Tests for filling, comparing and swapping of the shadow table."""
+
+  def setUp(self):
+    super(TestShadowReindex, self).setUp()
+    self.client.get("/login")
+    self.addCleanup(db.session.execute,
+                    "DROP TABLE IF EXISTS {}".format(shadow.SHADOW_TABLE))
+    with factories.single_commit():
+      self.control_ids = [factories.ControlFactory(title="control").id
+                          for _ in range(3)]
+
+  def _get_title(self, control_id):
+    """Get title of the control from the live index table."""
+    record = mysql.MysqlRecordProperty
+    return db.session.query(record.content).filter(
+        record.type == "Control",
+        record.key == control_id,
+        record.property == "title",
+    ).scalar()
+
+  def test_swap(self):
+    """Filled shadow table is caught up with changes and swapped in."""
+    live_counts = shadow.get_counts(shadow.LIVE_TABLE)
+    reindex.run(["Control"], shadow=True, swap=False)
+
+    self.assertTrue(shadow.exists())
+    self.assertEqual(shadow.get_counts(shadow.SHADOW_TABLE),
+                     {"Control": live_counts["Control"]})
+    self.assertEqual(shadow.compare()["Control"]["different"], 0)
+
+    with factories.single_commit():
+      control_id = factories.ControlFactory(title="new control").id
+    reindex.swap_shadow()
+
+    self.assertFalse(shadow.exists())
+    self.assertEqual(self._get_title(control_id), "new control")
+    self.assertEqual(self._get_title(self.control_ids[0]), "control")
+    # Records of other types are copied from the old live table
+    counts = shadow.get_counts(shadow.LIVE_TABLE)
+    del counts["Control"], live_counts["Control"]
+    self.assertEqual(counts, live_counts)
+
+  def test_deleted_during_rebuild(self):
+    """Object deleted while the shadow table is filled is not swapped in."""
+    reindex.run(["Control"], shadow=True, swap=False)
+    control = all_models.Control.query.get(self.control_ids[0])
+    response = api_helper.Api().delete(control)
+    self.assert200(response)
+    self.assertIn(self.control_ids[0],
+                  shadow.get_changes().get("Control", set()))
+
+    reindex.swap_shadow()
+
+    self.assertIsNone(self._get_title(self.control_ids[0]))
+    self.assertEqual(self._get_title(self.control_ids[1]), "control")
+    self.assertEqual(shadow.get_changes(), {})
+
+  def test_change_without_updated_at(self):
+    """Reindexed object keeping its updated_at time is swapped in."""
+    reindex.run(["Control"], shadow=True, swap=False)
+    control = all_models.Control.query.get(self.control_ids[0])
+    db.session.execute(
+        all_models.Control.__table__.update().where(
+            all_models.Control.id == control.id
+        ).values(title="new title", updated_at=control.updated_at)
+    )
+    all_models.Control.bulk_record_update_for([control.id])
+    db.session.commit()
+
+    reindex.swap_shadow()
+
+    self.assertEqual(self._get_title(self.control_ids[0]), "new title")
+
+  def test_existence_checked_once(self):
+    """Shadow table is looked up once per transaction by indexed writes."""
+    statements = []
+
+    def count_lookups(_conn, _cursor, statement, *_):
+      if statement.lstrip().upper().startswith("SHOW TABLES"):
+        statements.append(statement)
+    sa.event.listen(sa.engine.Engine, "before_cursor_execute", count_lookups)
+    self.addCleanup(sa.event.remove, sa.engine.Engine,
+                    "before_cursor_execute", count_lookups)
+
+    indexer = get_indexer()
+    for control in all_models.Control.query.filter(
+        all_models.Control.id.in_(self.control_ids),
+    ):
+      indexer.delete_record(control.id, "Control", commit=False)
+      indexer.create_record(control, commit=False)
+    all_models.Control.bulk_record_update_for(self.control_ids)
+    db.session.commit()
+
+    self.assertEqual(len(statements), 1)
+    self.assertEqual(shadow.get_changes(), {})
+
+  def test_invalid_not_swapped(self):
+    """Shadow table missing records is not swapped in."""
+    with mock.patch.object(shadow, "insert_records"):
+      reindex.run(["Control"], shadow=True, swap=False)
+      with self.assertRaises(ValueError):
+        reindex.swap_shadow()
+    self.assertTrue(shadow.exists())
+    self.assertEqual(self._get_title(self.control_ids[0]), "control")
+
+  def test_deferred_indexes(self):
+    """Secondary indexes are created after the shadow table is filled."""
+    shadow.create(defer_indexes=True)
+    self.assertEqual(shadow._get_indexes(shadow.SHADOW_TABLE), {})
+
+    shadow.create_indexes()
+    self.assertEqual(shadow._get_indexes(shadow.SHADOW_TABLE),
+                     shadow._get_indexes(shadow.LIVE_TABLE))
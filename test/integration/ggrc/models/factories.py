@@ -22,6 +22,7 @@ import factory
 
 from ggrc import db
 from ggrc.models import all_models
+from ggrc.utils import revisions as revision_utils
 
 from ggrc.access_control import roleable
 
@@ -618,6 +619,8 @@ class RevisionFactory(ModelFactory):
     rev = target_class(*args, **kwargs)
     rev.event_id = event.id
     db.session.add(rev)
+    db.session.flush()
+    revision_utils.refresh_latest_revisions(event.id)
     if getattr(db.session, "single_commit", True):
       db.session.commit()
     return rev
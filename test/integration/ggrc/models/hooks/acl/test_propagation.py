@@ -102,10 +102,7 @@ class TestPropagation(BaseTestPropagation):
         ).count(),
         count * 2
     )
-    self.assertEqual(
-        db.session.execute(child_ids.alias("counts").count()).scalar(),
-        count,
-    )
+    self.assertEqual(len(child_ids), count)
 
   def test_multi_acl_to_multiple(self):
     """Test multiple ACL propagation to multiple children."""
@@ -295,6 +292,21 @@ class TestPropagation(BaseTestPropagation):
     propagation.propagate_all()
     self.assertEqual(all_models.AccessControlList.query.count(), 27)
 
+  @mock.patch("ggrc.models.hooks.acl.propagation.PROPAGATION_CHUNK_SIZE", 2)
+  @mock.patch("ggrc.models.hooks.acl.propagation.PROPAGATE_ALL_CHUNK_SIZE", 1)
+  def test_propagate_all_chunks(self):
+    """Test propagation of all ACL entries in small chunks."""
+    with factories.single_commit():
+      wf_factories.TaskGroupTaskFactory()
+      audit = factories.AuditFactory()
+      factories.RelationshipFactory(
+          source=audit,
+          destination=audit.program,
+      )
+
+    propagation.propagate_all()
+    self.assertEqual(all_models.AccessControlList.query.count(), 27)
+
   def test_creating_missing_acl_entries(self):
     """Test clean propagation of all ACL entries."""
     with factories.single_commit():
@@ -19,6 +19,7 @@ from ggrc import models
 from ggrc.fulltext import get_indexer
 from ggrc.fulltext import mixin
 from ggrc.login import noop
+from ggrc.utils import revisions as revision_utils
 
 
 class ModelFactory(factory.Factory, object):
@@ -50,6 +51,8 @@ class ModelFactory(factory.Factory, object):
     )
     db.session.add(revision)
     db.session.add(event)
+    db.session.flush()
+    revision_utils.refresh_latest_revisions(event.id)
 
     indexer = get_indexer()
     if cls._is_reindex_needed(instance):
@@ -144,3 +144,26 @@ class TestAllModels(WithQueryApi, TestCase):
       if values[index]["created_at"] == values[index + 1]["created_at"]:
         self.assertGreater(values[index]["id"],
                            values[index + 1]["id"])
+
+  def test_total_opt_out(self):
+    """Query with "total": false does not count all matched objects."""
+    with ggrc_factories.single_commit():
+      for _ in xrange(5):
+        ggrc_factories.ControlFactory()
+    query = {
+        "object_name": "Control",
+        "type": "ids",
+        "filters": {"expression": {}},
+        "limit": [0, 2],
+    }
+    with QueryCounter() as counter:
+      response = self._post([query])
+    with_total_count = counter.get
+    self.assertEqual(response.json[0]["Control"]["total"], 5)
+
+    query["total"] = False
+    with QueryCounter() as counter:
+      response = self._post([query])
+    self.assertEqual(counter.get, with_total_count - 1)
+    self.assertEqual(len(response.json[0]["Control"]["ids"]), 2)
+    self.assertIs(response.json[0]["Control"]["total"], False)
@@ -2,14 +2,21 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 """ Tests for ggrc.models.Revision """
+import json
 from datetime import datetime
 
 from freezegun import freeze_time
 import ddt
 import mock
+import sqlalchemy as sa
 
 import ggrc.models
+from ggrc import db
+from ggrc.migrations.utils import update_acr
 from ggrc.models import all_models
+from ggrc.models.revision import LatestRevision
+from ggrc.models.types import CompressedJsonType
+from ggrc.utils import revisions as revision_utils
 import integration.ggrc.generator
 from integration.ggrc import TestCase
 
@@ -562,3 +569,78 @@ class TestRevisions(query_helper.WithQueryApi, TestCase):
     self.assertEqual(len(revisions), 2)
     self.assertFalse(revisions[0].is_empty)
     self.assertTrue(revisions[1].is_empty)
+
+  def test_latest_revisions(self):
+    """Test latest revisions are refreshed with every event."""
+    with factories.single_commit():
+      market = factories.MarketFactory()
+    market_id = market.id
+    stub = ("Market", market_id)
+    created = revision_utils.get_latest_revision_ids([stub])[stub]
+
+    response = self.api_helper.put(market, {"title": "new title"})
+    self.assert200(response)
+    modified = revision_utils.get_latest_revision_ids([stub])[stub]
+    self.assertGreater(modified, created)
+
+    response = self.api_helper.delete(all_models.Market.query.get(market_id))
+    self.assert200(response)
+    deleted = max(rev.id for rev in all_models.Revision.query.filter_by(
+        resource_type="Market", resource_id=market_id))
+    latest = LatestRevision.query.filter_by(
+        resource_type="Market", resource_id=market_id).one()
+    self.assertEqual((latest.revision_id, latest.action), (deleted, "deleted"))
+    self.assertEqual(
+        revision_utils.get_latest_revision_ids([stub], skip_deleted=True),
+        {stub: modified},
+    )
+    self.assertEqual(revision_utils.get_revisions_by_type("Market"),
+                     {market_id: deleted})
+
+  def test_compress_revisions(self):
+    """Test content of revisions stored uncompressed is compressed."""
+    with factories.single_commit():
+      market = factories.MarketFactory(description="text " * 100)
+    revision = all_models.Revision.query.filter_by(
+        resource_type="Market", resource_id=market.id).one()
+    revision_id, content = revision.id, revision.content
+    revisions_table = all_models.Revision.__table__
+    db.session.execute(revisions_table.update().where(
+        revisions_table.c.id == revision_id
+    ).values(content=sa.literal(json.dumps(content))))
+    db.session.commit()
+
+    revision_utils.compress_revisions_content()
+
+    stored = db.session.execute(
+        sa.select([sa.func.left(revisions_table.c.content, 1)]).where(
+            revisions_table.c.id == revision_id)
+    ).scalar()
+    self.assertEqual(stored, CompressedJsonType.ZLIB_HEADER)
+    self.assertEqual(all_models.Revision.query.get(revision_id).content,
+                     content)
+
+  def test_deleted_acr_compressed(self):
+    """Test deleted role is found in compressed revision content."""
+    role = factories.AccessControlRoleFactory(name="Compressed role",
+                                              object_type="Market")
+    content = role.log_json()
+    content["description"] = "text " * 100
+    factories.RevisionFactory(obj=role, action="deleted", content=content)
+    revisions_table = all_models.Revision.__table__
+    stored = db.session.execute(
+        sa.select([sa.func.left(revisions_table.c.content, 1)]).where(sa.and_(
+            revisions_table.c.resource_type == "AccessControlRole",
+            revisions_table.c.action == "deleted",
+        ))
+    ).scalar()
+    self.assertEqual(stored, CompressedJsonType.ZLIB_HEADER)
+
+    connection = db.session.connection()
+    self.assertEqual(
+        update_acr.get_deleted_acr_id(connection, "Compressed role", "Market"),
+        role.id,
+    )
+    self.assertIsNone(
+        update_acr.get_deleted_acr_id(connection, "Compressed role", "Risk"),
+    )
@@ -20,9 +20,16 @@ import mock
 from appengine import base
 
 from ggrc import db
+from ggrc.converters import export_parts
+from ggrc.converters import import_plan
+from ggrc.converters.base import ExportConverter
 from ggrc.models import all_models
+from ggrc.models.import_export import ContentChunkWriter
+from ggrc.models.import_export import ImportExportContentChunk
 from ggrc.notifications import import_export
 from ggrc.utils import errors as app_errors
+from ggrc.utils import metrics
+from ggrc.views import converters
 
 from integration.ggrc import api_helper
 from integration.ggrc.models import factories
@@ -283,6 +290,37 @@ class TestImportExports(TestImportExportBase):
     ).first()
     self.assertEqual(expected_bg.name, bg_task.name)
 
+  def test_import_plan_reused(self):
+    """Check if import phase reuses object lookups of analysis phase."""
+    self.init_taskqueue()
+    objective = factories.ObjectiveFactory(updated_at=datetime(2019, 1, 1))
+    data = "Object type,,,,\n" \
+           "Market,Code*,Title*,Admin*,map:objective\n" \
+           ",market-1,Market 1,user@example.com,{}".format(objective.slug)
+    user = all_models.Person.query.first()
+    imp_exp = factories.ImportExportFactory(
+        job_type="Import",
+        status="Not Started",
+        created_by=user,
+        created_at=datetime.now(),
+        content=data,
+    )
+    metrics.reset(import_plan.METRIC_GROUP)
+
+    response = self.client.put(
+        "/api/people/{}/imports/{}/start".format(user.id, imp_exp.id),
+        headers=self.headers,
+    )
+    self.assert200(response)
+
+    imp_exp = all_models.ImportExport.query.get(imp_exp.id)
+    self.assertEqual(imp_exp.status, "Finished")
+    self.assertIsNone(imp_exp.import_plan)
+    market = all_models.Market.query.filter_by(slug="market-1").one()
+    objective = all_models.Objective.query.get(objective.id)
+    self.assertIn(objective, market.related_objects())
+    self.assertGreaterEqual(metrics.get(import_plan.METRIC_GROUP)["hits"], 1)
+
   def test_imports_get_all(self):
     """Test imports get all items"""
     user = all_models.Person.query.first()
@@ -368,6 +406,126 @@ class TestImportExports(TestImportExportBase):
     self.assert200(response)
     self.assertEqual(response.data, "test content")
 
+  def test_export_content_chunks(self):
+    """Test export content is stored in chunks and streamed on download"""
+    user = all_models.Person.query.first()
+    with factories.single_commit():
+      slugs = [factories.MarketFactory().slug for _ in range(10)]
+    metrics.reset(converters.EXPORT_METRIC_GROUP)
+    with mock.patch("ggrc.settings.EXPORT_CONTENT_CHUNK_SIZE", new=200):
+      response = self.client.post(
+          "/api/people/{}/exports".format(user.id),
+          data=json.dumps({
+              "objects": [{
+                  "object_name": "Market",
+                  "fields": ["slug", "title"],
+                  "filters": {"expression": {}}}],
+              "current_time": str(datetime.now())}),
+          headers=self.headers)
+    self.assert200(response)
+    ie_id = json.loads(response.data)["id"]
+    chunks_count = ImportExportContentChunk.query.filter_by(
+        import_export_id=ie_id).count()
+    self.assertGreater(chunks_count, 1)
+
+    response = self.client.get(
+        "/api/people/{}/exports/{}/download?export_to=csv".format(
+            user.id, ie_id),
+        headers=self.headers)
+    self.assert200(response)
+    self.assertTrue(response.data.startswith("Object type"))
+    for slug in slugs:
+      self.assertIn(slug, response.data)
+    stats = metrics.get(converters.EXPORT_METRIC_GROUP)
+    self.assertEqual(stats["chunks"], chunks_count)
+    self.assertLess(stats["buffer_bytes.max"], len(response.data))
+
+  def test_failed_export_content_deleted(self):
+    """Test content chunks of failed export are deleted"""
+    user = all_models.Person.query.first()
+    with factories.single_commit():
+      for _ in range(10):
+        factories.MarketFactory()
+    with mock.patch("ggrc.settings.EXPORT_CONTENT_CHUNK_SIZE", new=200), \
+        mock.patch.object(ContentChunkWriter, "close",
+                          side_effect=Exception("close failed")):
+      response = self.client.post(
+          "/api/people/{}/exports".format(user.id),
+          data=json.dumps({
+              "objects": [{
+                  "object_name": "Market",
+                  "fields": ["slug", "title"],
+                  "filters": {"expression": {}}}],
+              "current_time": str(datetime.now())}),
+          headers=self.headers)
+    self.assert200(response)
+    ie_id = json.loads(response.data)["id"]
+    self.assertEqual(all_models.ImportExport.query.get(ie_id).status,
+                     "Failed")
+    self.assertEqual(ImportExportContentChunk.query.filter_by(
+        import_export_id=ie_id).count(), 0)
+
+  def _export_and_download(self, user, objects):
+    """Run background export of objects and download its content."""
+    response = self.client.post(
+        "/api/people/{}/exports".format(user.id),
+        data=json.dumps({
+            "objects": objects,
+            "current_time": str(datetime.now())}),
+        headers=self.headers)
+    self.assert200(response)
+    ie_id = json.loads(response.data)["id"]
+    response = self.client.get(
+        "/api/people/{}/exports/{}/download?export_to=csv".format(
+            user.id, ie_id),
+        headers=self.headers)
+    self.assert200(response)
+    return response.data
+
+  def test_export_in_worker_processes(self):
+    """Test export blocks rendered in worker processes are stitched in order"""
+    user = all_models.Person.query.first()
+    with factories.single_commit():
+      for _ in range(5):
+        factories.MarketFactory()
+      for _ in range(3):
+        factories.ObjectiveFactory()
+    objects = [{
+        "object_name": object_name,
+        "fields": "all",
+        "filters": {"expression": {}},
+    } for object_name in ("Objective", "Market")]
+    content = self._export_and_download(user, objects)
+
+    metrics.reset(export_parts.METRIC_GROUP)
+    with mock.patch("ggrc.settings.EXPORT_MAX_WORKERS", new=2):
+      with mock.patch("ggrc.settings.EXPORT_PART_SIZE", new=2):
+        parallel_content = self._export_and_download(user, objects)
+
+    self.assertEqual(parallel_content, content)
+    self.assertEqual(metrics.get(export_parts.METRIC_GROUP),
+                     {"exports": 1, "parts": 5})
+
+  def test_export_parts_rendered_lazily(self):
+    """Test export parts are rendered only when the blocks are written"""
+    user = all_models.Person.query.first()
+    with factories.single_commit():
+      ie_job = factories.ImportExportFactory(job_type="Export",
+                                             created_by=user)
+      market_ids = [factories.MarketFactory().id for _ in range(3)]
+    converter = ExportConverter(
+        ids_by_type=[{"object_name": "Market", "ids": market_ids,
+                      "fields": "all"}],
+        ie_job=ie_job,
+    )
+    converter.initialize_block_converters()
+    with mock.patch("ggrc.settings.EXPORT_PART_SIZE", new=2):
+      with mock.patch("multiprocessing.Pool") as pool:
+        block_parts = export_parts.render_parts(converter, 10, user.id)
+    self.assertEqual(len(block_parts), 1)
+    self.assertNotIsInstance(block_parts[0], list)
+    self.assertFalse(pool.called)
+
   @ddt.data(u'漢字.csv', u'фыв.csv', u'asd.csv')
   def test_download_unicode_filename(self, filename):
     """Test import history download unicode filename"""
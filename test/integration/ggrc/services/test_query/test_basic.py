@@ -216,6 +216,20 @@ class TestAdvancedQueryAPI(WithQueryApi, TestCase):
 
     self.assertEqual(programs_limit["total"], programs_no_limit["total"])
 
+  def test_query_total_out_of_range_page(self):
+    """Total is calculated for a page beyond the last matched object."""
+    programs_no_limit = self._get_first_result_set(
+        self._make_query_dict("Program"),
+        "Program",
+    )
+    total = programs_no_limit["total"]
+    programs = self._get_first_result_set(
+        self._make_query_dict("Program", limit=[total + 1, total + 5]),
+        "Program",
+    )
+    self.assertEqual(programs["count"], 0)
+    self.assertEqual(programs["total"], total)
+
   def test_query_limit(self):
     """The limit parameter trims the result set."""
     def make_query_dict(limit=None):
@@ -0,0 +1,76 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for concurrent evaluation of object queries."""
+
+import json
+
+import ddt
+import mock
+
+from ggrc import db
+from ggrc.query.default_handler import DefaultHandler
+from ggrc.utils import user_generator
+from integration.ggrc import TestCase
+from integration.ggrc.query_helper import WithQueryApi
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+class TestParallelQueries(TestCase, WithQueryApi):
+  """Results don't depend on the number of query evaluation threads."""
+
+  def setUp(self):
+    super(TestParallelQueries, self).setUp()
+    self.client.get("/login")
+    with factories.single_commit():
+      program = factories.ProgramFactory()
+      for _ in range(3):
+        control = factories.ControlFactory()
+        factories.RelationshipFactory(source=program, destination=control)
+      factories.MarketFactory()
+
+  def _make_batch(self):
+    """Make queries of different types with one dependent query."""
+    return [
+        self._make_query_dict("Program", type_="ids"),
+        self._make_query_dict("Control", limit=[0, 2],
+                              order_by=[{"name": "title"}]),
+        self._make_query_dict("Market", type_="count"),
+        {
+            "object_name": "Control",
+            "type": "ids",
+            "filters": {"expression": {
+                "object_name": "__previous__",
+                "op": {"name": "relevant"},
+                "ids": ["0"],
+            }},
+        },
+    ]
+
+  @ddt.data(2, 4)
+  def test_same_results(self, max_workers):
+    """Concurrent evaluation gives the same results as sequential one."""
+    with mock.patch("ggrc.settings.QUERY_API_MAX_WORKERS", new=1):
+      sequential = self._post(self._make_batch())
+    with mock.patch("ggrc.settings.QUERY_API_MAX_WORKERS", new=max_workers):
+      concurrent = self._post(self._make_batch())
+    self.assert200(concurrent)
+    self.assertEqual(json.loads(concurrent.data),
+                     json.loads(sequential.data))
+    self.assertEqual(json.loads(concurrent.data)[3]["Control"]["count"], 3)
+
+  def test_user_not_reloaded(self):
+    """Threads reuse the user loaded by the request."""
+    with mock.patch("ggrc.settings.QUERY_API_MAX_WORKERS", new=4):
+      with mock.patch.object(user_generator, "find_user_by_id",
+                             wraps=user_generator.find_user_by_id) as loader:
+        self.assert200(self._post(self._make_batch()))
+    self.assertLessEqual(loader.call_count, 1)
+
+  def test_workers_limited_by_pool(self):
+    """Number of threads is limited by DB connection pool size."""
+    # pylint: disable=protected-access
+    with mock.patch("ggrc.settings.QUERY_API_MAX_WORKERS", new=100):
+      with mock.patch.object(db.engine.pool, "size", return_value=3):
+        self.assertEqual(DefaultHandler._get_max_workers(), 2)
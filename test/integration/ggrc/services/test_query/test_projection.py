@@ -0,0 +1,53 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for column projection of "values" queries."""
+
+import json
+
+import mock
+
+from ggrc.query import projection
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+from integration.ggrc.query_helper import WithQueryApi
+from integration.ggrc.models import factories
+
+
+class TestProjection(TestCase, WithQueryApi):
+  """Projected values are the same as values of published objects."""
+
+  FIELDS = ["id", "title", "slug", "type", "status", "updated_at",
+            "selfLink", "viewLink", "unknown_field"]
+
+  def setUp(self):
+    super(TestProjection, self).setUp()
+    metrics.reset(projection.METRIC_GROUP)
+    self.client.get("/login")
+    with factories.single_commit():
+      for title in ("b", "a", "c"):
+        factories.ControlFactory(title=title)
+
+  def _query_values(self, fields):
+    """Query values of controls ordered by title."""
+    query = self._make_query_dict("Control", fields=fields,
+                                  order_by=[{"name": "title"}])
+    response = self._post([query])
+    self.assert200(response)
+    return json.loads(response.data)[0]["Control"]
+
+  def test_same_values(self):
+    """Projected values match the published ones."""
+    projected = self._query_values(self.FIELDS)
+    with mock.patch("ggrc.settings.QUERY_API_PROJECTION", new=False):
+      published = self._query_values(self.FIELDS)
+    self.assertEqual(projected, published)
+    self.assertEqual([value["title"] for value in projected["values"]],
+                     ["a", "b", "c"])
+    self.assertEqual(metrics.get(projection.METRIC_GROUP),
+                     {"projected": 1, "full": 1})
+
+  def test_custom_published_field(self):
+    """Fields with custom publish logic are taken from objects."""
+    self._query_values(["id", "access_control_list"])
+    self.assertEqual(metrics.get(projection.METRIC_GROUP), {"full": 1})
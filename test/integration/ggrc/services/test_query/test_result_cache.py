@@ -0,0 +1,78 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for query API results cache."""
+
+import json
+
+import mock
+
+from appengine import base
+from ggrc.query import result_cache
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+from integration.ggrc.query_helper import WithQueryApi
+from integration.ggrc.models import factories
+
+
+@base.with_memcache
+class TestResultCache(TestCase, WithQueryApi):
+  """Tests for caching of query API results."""
+
+  def setUp(self):
+    super(TestResultCache, self).setUp()
+    metrics.reset(result_cache.METRIC_GROUP)
+    patcher = mock.patch("ggrc.settings.QUERY_RESULT_CACHE", new=True)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    self.client.get("/login")
+    with factories.single_commit():
+      self.control_id = factories.ControlFactory(title="cached").id
+
+  def _query_ids(self, headers=None):
+    """Query ids of controls with "cached" title."""
+    query = self._make_query_dict(
+        "Control", expression=["title", "~", "cached"], type_="ids")
+    request_headers = {"Content-Type": "application/json"}
+    request_headers.update(headers or {})
+    response = self.client.post("/query", data=json.dumps([query]),
+                                headers=request_headers)
+    self.assert200(response)
+    return response.json[0]["Control"]["ids"]
+
+  def test_hit(self):
+    """Repeated query is served from cache."""
+    self.assertEqual(self._query_ids(), [self.control_id])
+    self.assertEqual(self._query_ids(), [self.control_id])
+    stats = result_cache.get_stats()
+    self.assertEqual((stats["misses"], stats["hits"]), (1, 1))
+
+  def test_invalidated_by_change(self):
+    """Change of queried model invalidates cached results."""
+    self._query_ids()
+    with factories.single_commit():
+      new_id = factories.ControlFactory(title="cached too").id
+    self.assertEqual(sorted(self._query_ids()),
+                     sorted([self.control_id, new_id]))
+    self.assertEqual(result_cache.get_stats()["misses"], 2)
+
+  def test_bypass(self):
+    """Cache is not read for requests with no-cache header."""
+    self._query_ids()
+    self._query_ids(headers={"Cache-Control": "no-cache"})
+    stats = result_cache.get_stats()
+    self.assertEqual((stats["bypassed"], stats.get("hits", 0)), (1, 0))
+
+  def test_invalidated_by_full_reindex(self):
+    """Full reindex invalidates cached results of all queries."""
+    self._query_ids()
+    result_cache.invalidate_all()
+    self._query_ids()
+    self.assertEqual(result_cache.get_stats()["misses"], 2)
+
+  def test_disabled_without_memcache(self):
+    """Cache is not used without memcache."""
+    with mock.patch("ggrc.settings.MEMCACHE_MECHANISM", new=False):
+      self._query_ids()
+      self._query_ids()
+    self.assertEqual(result_cache.get_stats().get("hits", 0), 0)
@@ -4,6 +4,7 @@
 """Test for indexing of snapshotted objects"""
 
 import ddt
+import mock
 
 from sqlalchemy.sql.expression import tuple_
 
@@ -11,6 +12,7 @@ from ggrc import db
 from ggrc import models
 from ggrc.models import all_models
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
+from ggrc.snapshotter import indexer
 from ggrc.snapshotter.indexer import delete_records
 
 from integration.ggrc.snapshotter import SnapshotterBaseTestCase
@@ -652,3 +654,25 @@ class TestSnapshotIndexing(SnapshotterBaseTestCase):
     self.assert_indexed_fields(snapshot, "kind", {
         "": option_title
     })
+
+  def test_records_built_once_per_revision(self):
+    """Records of snapshots of the same revision are built once."""
+    with factories.single_commit():
+      control = factories.ControlFactory(title="shared control")
+      audits = [factories.AuditFactory(), factories.AuditFactory()]
+    for audit in audits:
+      self._create_snapshots(audit, [control])
+
+    with mock.patch.object(
+        indexer, "get_searchable_attributes",
+        wraps=indexer.get_searchable_attributes,
+    ) as get_searchable_attributes:
+      self.client.post("/admin/reindex_snapshots")
+    self.assertEqual(get_searchable_attributes.call_count, 1)
+
+    snapshots = all_models.Snapshot.query.all()
+    self.assertEqual(len(snapshots), 2)
+    for audit in audits:
+      snapshot = all_models.Snapshot.query.filter_by(parent_id=audit.id).one()
+      self.assert_indexed_fields(snapshot, "title", {"": "shared control"})
+      self.assertEqual(get_records(audit, [snapshot]).count(), 1)
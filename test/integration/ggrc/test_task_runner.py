@@ -0,0 +1,136 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for local runner of background tasks."""
+
+import datetime
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc import task_runner
+from ggrc.models import all_models
+from ggrc.models.background_task import BackgroundTaskQueueItem
+from ggrc.utils import metrics
+from integration.ggrc import TestCase
+
+
+class TestTaskRunner(TestCase):
+  """Tests for queueing and running of background tasks."""
+
+  def setUp(self):
+    super(TestTaskRunner, self).setUp()
+    metrics.reset(task_runner.METRIC_GROUP)
+    self.client.get("/login")
+    patcher = mock.patch("ggrc.settings.BACKGROUND_TASK_RUNNER", new=True)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _schedule_reindex(self):
+    """Schedule full reindex task checking it is not run in the request."""
+    with mock.patch("ggrc.views.do_full_reindex") as do_full_reindex:
+      response = self.client.post("/admin/full_reindex")
+    self.assert200(response)
+    do_full_reindex.assert_not_called()
+    task = all_models.BackgroundTask.query.filter(
+        all_models.BackgroundTask.name.like("%_full_reindex"),
+    ).one()
+    self.assertEqual(task.status, task.PENDING_STATUS)
+    return task.id
+
+  @staticmethod
+  def _get_item():
+    """Get the only queued task."""
+    return BackgroundTaskQueueItem.query.one()
+
+  def test_run_queued_task(self):
+    """Queued task is run by the worker and dropped from the queue."""
+    task_id = self._schedule_reindex()
+    item = self._get_item()
+    self.assertEqual((item.bg_task_id, item.queue, item.url),
+                     (task_id, "ggrc", "/_background_tasks/full_reindex"))
+
+    with mock.patch("ggrc.views.do_full_reindex") as do_full_reindex:
+      self.assertTrue(task_runner.run_next("ggrc"))
+    do_full_reindex.assert_called_once_with()
+    task = all_models.BackgroundTask.query.get(task_id)
+    self.assertEqual(task.status, task.SUCCESS_STATUS)
+    self.assertEqual(BackgroundTaskQueueItem.query.count(), 0)
+    self.assertFalse(task_runner.run_next("ggrc"))
+    self.assertFalse(task_runner.run_next("ggrcImport"))
+
+  def test_failed_run_retried(self):
+    """Failed run is retried after a delay."""
+    task_id = self._schedule_reindex()
+    with mock.patch("ggrc.task_runner._run_view", side_effect=ValueError):
+      self.assertTrue(task_runner.run_next("ggrc"))
+
+    item = self._get_item()
+    self.assertEqual(item.attempts, 1)
+    self.assertIsNone(item.lease)
+    self.assertGreater(item.eta, datetime.datetime.utcnow())
+    self.assertFalse(task_runner.run_next("ggrc"))
+
+    item.eta = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    item.retry_options = dict(item.retry_options, task_retry_limit=1)
+    db.session.commit()
+    with mock.patch("ggrc.task_runner._run_view", return_value=503):
+      self.assertTrue(task_runner.run_next("ggrc"))
+    task = all_models.BackgroundTask.query.get(task_id)
+    self.assertEqual(task.status, task.FAILURE_STATUS)
+    self.assertEqual(BackgroundTaskQueueItem.query.count(), 0)
+    self.assertEqual(metrics.get(task_runner.METRIC_GROUP)["failed"], 1)
+
+  def test_failed_view_retried(self):
+    """Task failed by its view is run again from Pending status."""
+    task_id = self._schedule_reindex()
+    with mock.patch("ggrc.views.do_full_reindex",
+                    side_effect=ValueError) as do_full_reindex:
+      self.assertTrue(task_runner.run_next("ggrc"))
+    do_full_reindex.assert_called_once_with()
+    task = all_models.BackgroundTask.query.get(task_id)
+    self.assertEqual(task.status, task.PENDING_STATUS)
+    item = self._get_item()
+    self.assertEqual(item.attempts, 1)
+    self.assertEqual(metrics.get(task_runner.METRIC_GROUP)["retried"], 1)
+
+    item.eta = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.session.commit()
+    with mock.patch("ggrc.views.do_full_reindex") as do_full_reindex:
+      self.assertTrue(task_runner.run_next("ggrc"))
+    do_full_reindex.assert_called_once_with()
+    task = all_models.BackgroundTask.query.get(task_id)
+    self.assertEqual(task.status, task.SUCCESS_STATUS)
+    self.assertEqual(BackgroundTaskQueueItem.query.count(), 0)
+
+  def test_expired_lease_taken_over(self):
+    """Task running by a crashed worker is taken over and failed."""
+    task_id = self._schedule_reindex()
+    self.assertIsNotNone(task_runner.claim("ggrc", lease_time=60))
+    task = all_models.BackgroundTask.query.get(task_id)
+    task.status = task.RUNNING_STATUS
+    item = self._get_item()
+    item.leased_until = datetime.datetime.utcnow() - datetime.timedelta(1)
+    db.session.commit()
+
+    with mock.patch("ggrc.views.do_full_reindex") as do_full_reindex:
+      self.assertTrue(task_runner.run_next("ggrc"))
+    do_full_reindex.assert_not_called()
+    task = all_models.BackgroundTask.query.get(task_id)
+    self.assertEqual(task.status, task.FAILURE_STATUS)
+    self.assertEqual(BackgroundTaskQueueItem.query.count(), 0)
+    self.assertEqual(
+        metrics.get(task_runner.METRIC_GROUP)["expired_leases"], 1,
+    )
+
+  def test_retry_delay(self):
+    """Retry delay is doubled max_doublings times and then grows linearly."""
+    options = dict(settings.RETRY_OPTIONS, min_backoff_seconds=10,
+                   max_backoff_seconds=1000, max_doublings=2)
+    self.assertEqual(
+        [task_runner.get_retry_delay(options, attempts)
+         for attempts in range(1, 9)],
+        [10, 20, 40, 80, 120, 160, 200, 240],
+    )
+    self.assertEqual(task_runner.get_retry_delay(options, 100), 1000)
@@ -6,8 +6,11 @@ import mock
 
 from appengine import base
 
+from ggrc import db
 from ggrc.models import all_models
 from ggrc.cache import utils as cache_utils
+from ggrc.utils import memcache
+from ggrc.utils import metrics
 from integration.ggrc import TestCase, generator
 from integration.ggrc.api_helper import Api
 from integration.ggrc.models import factories
@@ -34,6 +37,16 @@ class TestMemcacheBase(TestCase):
 
     _lazy_load_module()
 
+  def get_cached_permission_keys(self):
+    """Get "permissions:<user_id>" for users with valid cached permissions."""
+    keys = set()
+    for person_id, in db.session.query(all_models.Person.id):
+      key = cache_utils.get_permissions_cache_key(self.memcache_client,
+                                                  person_id)
+      if memcache.blob_get_chunk_keys(self.memcache_client, key):
+        keys.add("permissions:{}".format(person_id))
+    return keys
+
 
 class TestPermissionsLoading(TestMemcacheBase):
   """Test user permissions loading."""
@@ -51,11 +64,12 @@ class TestPermissionsLoading(TestMemcacheBase):
 
   def set_dummy_permissions_in_cache(self, *user_ids):
     """Set dummy permissions for users in memcache.
-    This will reset already existing set."""
-    cached_keys = set()
+    This will invalidate permissions of all other users."""
+    cache_utils.clear_permission_cache()
     for user_id in user_ids:
-      cached_keys.add("permissions:{}".format(user_id))
-    self.memcache_client.set("permissions:list", cached_keys)
+      key = cache_utils.get_permissions_cache_key(self.memcache_client,
+                                                  user_id)
+      memcache.blob_set(self.memcache_client, key, {})
 
   def test_permissions_loading(self):
     """Test if permissions created only once for GET requests."""
@@ -94,7 +108,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             }],
         },
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -121,7 +135,7 @@ class TestPermissionsLoading(TestMemcacheBase):
     program = all_models.Program.query.get(response.json["program"]["id"])
     self.set_dummy_permissions_in_cache(self.user_id, self.user1_id)
     self.api.delete(program)
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -146,7 +160,7 @@ class TestPermissionsLoading(TestMemcacheBase):
         },
     })
     program = all_models.Program.query.get(response.json["program"]["id"])
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertNotIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -166,7 +180,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             }
         }],
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertNotIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -197,7 +211,7 @@ class TestPermissionsLoading(TestMemcacheBase):
         },
     })
     program = all_models.Program.query.get(response.json["program"]["id"])
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertNotIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -211,7 +225,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             }
         }]
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertNotIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -265,7 +279,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             "context": None,
         },
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -273,7 +287,7 @@ class TestPermissionsLoading(TestMemcacheBase):
     relationship = all_models.Relationship.query.get(
         response.json["relationship"]["id"])
     self.api.delete(relationship)
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -353,7 +367,7 @@ class TestPermissionsLoading(TestMemcacheBase):
 
     # logged user will be set as comment admin
     response = self.api.post(all_models.Comment, request_data)
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -365,7 +379,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             "type": "Comment"
         }]},
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertNotIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -459,7 +473,7 @@ class TestPermissionsLoading(TestMemcacheBase):
             "type": "Evidence"
         }]},
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
     self.assertIn("permissions:{}".format(self.user1_id), cached_keys)
 
@@ -483,18 +497,18 @@ class TestPermissionsLoading(TestMemcacheBase):
             }],
         },
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertNotIn("permissions:{}".format(self.user_id), cached_keys)
 
     self.api.get(all_models.Program, response.json["program"]["id"])
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(self.user_id), cached_keys)
 
     program = all_models.Program.query.get(response.json["program"]["id"])
     self.api.put(program, {
         "title": "Program title 1"
     })
-    cached_keys = self.memcache_client.get("permissions:list")
+    cached_keys = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(self.user_id), cached_keys)
 
 
@@ -553,13 +567,29 @@ class TestPermissionsCacheFlushing(TestMemcacheBase):
     # ensure that new permissions were returned instead of old ones
     self.assertEquals(result, {"11": "b"})
 
+  def test_users_permissions_flushing(self):
+    """Test that only permissions of given users are invalidated."""
+    metrics.reset(cache_utils.PERMISSIONS_CACHE_METRIC)
+    self.load_perms(11, {"11": "a"})
+    self.load_perms(12, {"12": "a"})
+
+    cache_utils.clear_users_permission_cache([11])
+
+    self.assertEqual(self.load_perms(11, {"11": "b"}), {"11": "b"})
+    self.assertEqual(self.load_perms(12, {"12": "b"}), {"12": "a"})
+    stats = cache_utils.get_permissions_cache_stats()
+    self.assertEqual(
+        (stats["hits"], stats["misses"], stats["user_invalidations"]),
+        (1, 3, 1),
+    )
+
   def test_permissions_flush_not_flush_on_simple_post(self):
     """Test that permissions in memcache are cleaned after POST request."""
     user = self.create_user_with_role("Creator")
     self.api.set_user(user)
     self.api.client.get("/permissions")
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertEqual(perm_ids, {"permissions:{}".format(user.id)})
 
     response = self.api.post(
@@ -568,7 +598,7 @@ class TestPermissionsCacheFlushing(TestMemcacheBase):
     )
     self.assert_status(response, 201)
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(user.id), perm_ids)
 
   def test_permissions_not_flush_on_simple_put(self):
@@ -582,14 +612,14 @@ class TestPermissionsCacheFlushing(TestMemcacheBase):
     self.api.set_user(user)
     self.api.client.get("/permissions")
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertEqual(perm_ids, {"permissions:{}".format(user.id)})
 
     objective = all_models.Objective.query.get(objective_id)
     response = self.api.put(objective, {"title": "new title"})
     self.assert200(response)
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertIn("permissions:{}".format(user.id), perm_ids)
 
   def test_permissions_flush_on_delete(self):
@@ -603,12 +633,12 @@ class TestPermissionsCacheFlushing(TestMemcacheBase):
     self.api.set_user(user)
     self.api.client.get("/permissions")
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertEqual(perm_ids, {"permissions:{}".format(user.id)})
 
     objective = all_models.Objective.query.get(objective_id)
     response = self.api.delete(objective)
     self.assert200(response)
 
-    perm_ids = self.memcache_client.get("permissions:list")
+    perm_ids = self.get_cached_permission_keys()
     self.assertEqual(perm_ids, set())
@@ -0,0 +1,84 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for batched MemCache operations."""
+
+import unittest
+
+import ddt
+
+from ggrc.cache.memcache import MemCache
+from ggrc.cache.memcache_stub import LocalMemcacheClient
+
+
+@ddt.ddt
+class TestMemCache(unittest.TestCase):
+  """Tests for MemCache on top of in-process memcache client."""
+
+  def setUp(self):
+    self.client = LocalMemcacheClient()
+    self.cache = MemCache(memcache_client=self.client)
+
+  def _add(self, ids):
+    self.cache.add("collection", "controls",
+                   {id_: {"id": id_, "title": str(id_)} for id_ in ids})
+    self.client.reset_stats()
+
+  def test_lookup_partial_hit(self):
+    """lookup reports cached and missing ids separately."""
+    self._add([1, 3])
+    result = self.cache.lookup("collection", "controls", {"ids": [1, 2, 3]})
+    self.assertEqual(result.hits.keys(), [1, 3])
+    self.assertEqual(result.misses, [2])
+    self.assertEqual(self.client.rpc_count, 1)
+
+  def test_lookup_attrs(self):
+    """lookup returns only requested attributes."""
+    self._add([1])
+    result = self.cache.lookup(
+        "collection", "controls", {"ids": [1], "attrs": ["title"]})
+    self.assertEqual(dict(result.hits[1]), {"title": "1"})
+
+  def test_get_all_or_none(self):
+    """get keeps All or None policy."""
+    self._add([1])
+    self.assertIsNone(
+        self.cache.get("collection", "controls", {"ids": [1, 2]}))
+    self.assertEqual(
+        self.cache.get("collection", "controls", {"ids": [1]}).keys(), [1])
+
+  def test_add_existing(self):
+    """add replaces entries already present in cache."""
+    self._add([1])
+    result = self.cache.add("collection", "controls",
+                            {1: {"title": "new"}, 2: {"title": "two"}})
+    self.assertEqual(sorted(result.keys()), [1, 2])
+    self.assertEqual(self.client.get("collection:controls:1"),
+                     {"title": "new"})
+
+  def test_update_missing(self):
+    """update changes only entries present in cache."""
+    self._add([1])
+    result = self.cache.update("collection", "controls",
+                               {1: {"title": "new"}, 2: {"title": "two"}}, 0)
+    self.assertEqual(result.keys(), [1])
+    self.assertIsNone(self.client.get("collection:controls:2"))
+
+  def test_remove(self):
+    """remove deletes entries with a single round trip."""
+    self._add([1, 2])
+    self.cache.remove("collection", "controls", {1: None, 2: None})
+    self.assertEqual(self.client.rpc_count, 1)
+    result = self.cache.lookup("collection", "controls", {"ids": [1, 2]})
+    self.assertEqual(result.misses, [1, 2])
+
+  @ddt.data(1, 50, 500)
+  def test_round_trips_per_collection(self, size):
+    """Collection of any size costs constant number of round trips."""
+    ids = range(size)
+    self._add(ids[::2])
+    result = self.cache.lookup("collection", "controls", {"ids": ids})
+    self.cache.add("collection", "controls",
+                   {id_: {"id": id_} for id_ in result.misses})
+    # one get_multi for lookup and one add_multi for misses
+    self.assertEqual(self.client.rpc_count, 2 if result.misses else 1)
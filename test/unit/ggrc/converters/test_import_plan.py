@@ -0,0 +1,46 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for object lookups plan of import phases."""
+
+import json
+import unittest
+from datetime import datetime
+
+import mock
+
+from ggrc import app  # noqa - this is needed for imports to work
+from ggrc.converters import import_plan
+
+
+class TestImportPlan(unittest.TestCase):
+  """Tests for recording and serialization of import plan."""
+
+  def test_dumps_loads(self):
+    """Plan is restored from its serialized form."""
+    plan = import_plan.ImportPlan(datetime(2019, 8, 12, 10, 41, 18, 204375))
+    plan.add("Market", "slug", u"MARKET-1", mock.Mock(id=3))
+    plan.add("Person", "email", u"user@example.com", mock.Mock(id=5))
+
+    restored = import_plan.ImportPlan.loads(plan.dumps())
+
+    self.assertEqual(restored.created_at, datetime(2019, 8, 12, 10, 41, 18))
+    self.assertEqual(restored.dumps(), plan.dumps())
+    self.assertEqual(json.loads(plan.dumps())["lookups"], {
+        "Market": {"slug": {"market-1": 3}},
+        "Person": {"email": {"user@example.com": 5}},
+    })
+
+  def test_not_found_ignored(self):
+    """Lookups of missing and new objects are not recorded."""
+    plan = import_plan.ImportPlan()
+    plan.add("Market", "slug", u"market-1", None)
+    plan.add("Market", "slug", u"market-2", mock.Mock(id=None))
+    plan.add("Market", "slug", u"", mock.Mock(id=1))
+    self.assertEqual(json.loads(plan.dumps())["lookups"], {})
+
+  def test_get_not_loaded(self):
+    """Values are looked up if planned objects are not loaded."""
+    plan = import_plan.ImportPlan()
+    plan.add("Market", "slug", u"market-1", mock.Mock(id=3))
+    self.assertIsNone(plan.get("Market", "slug", u"market-1"))
@@ -0,0 +1,64 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for import/export job status watcher."""
+
+import unittest
+
+import mock
+
+from ggrc import app  # noqa - this is needed for imports to work
+from ggrc.converters import status_watcher
+from ggrc.models import all_models
+
+
+class TestJobStatusWatcher(unittest.TestCase):
+  """Tests for reading job status on rows and time intervals."""
+
+  def setUp(self):
+    self.get_status = mock.Mock(
+        return_value=all_models.ImportExport.IN_PROGRESS_STATUS)
+
+  def test_rows_interval(self):
+    """Status is read once per rows interval."""
+    watcher = status_watcher.JobStatusWatcher(
+        1, self.get_status, rows_interval=10, time_interval=3600)
+    for _ in range(25):
+      self.assertFalse(watcher.is_stopped())
+    self.assertEqual(self.get_status.call_count, 3)
+
+  @mock.patch("ggrc.converters.status_watcher.time.time")
+  def test_time_interval(self, time_mock):
+    """Status is read when time interval passes."""
+    time_mock.return_value = 100
+    watcher = status_watcher.JobStatusWatcher(
+        1, self.get_status, rows_interval=1000, time_interval=5)
+    watcher.is_stopped()
+    watcher.is_stopped()
+    time_mock.return_value = 105
+    watcher.is_stopped()
+    self.assertEqual(self.get_status.call_count, 2)
+
+  def test_stopped_status(self):
+    """Stopped status is noticed on the next read."""
+    watcher = status_watcher.JobStatusWatcher(
+        1, self.get_status, rows_interval=2, time_interval=3600)
+    self.assertFalse(watcher.is_stopped())
+    self.get_status.return_value = all_models.ImportExport.STOPPED_STATUS
+    self.assertFalse(watcher.is_stopped())
+    self.assertTrue(watcher.is_stopped())
+
+  def test_notified(self):
+    """Stop notification is noticed without reading status."""
+    watcher = status_watcher.JobStatusWatcher(
+        2, self.get_status, rows_interval=1000, time_interval=3600)
+    watcher.is_stopped()
+    status_watcher.notify_stopped(2)
+    self.assertTrue(watcher.is_stopped())
+    self.assertEqual(self.get_status.call_count, 1)
+
+  def test_no_job(self):
+    """Converters without job are never stopped."""
+    watcher = status_watcher.JobStatusWatcher(None, self.get_status)
+    self.assertFalse(watcher.is_stopped())
+    self.get_status.assert_not_called()
@@ -0,0 +1,51 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for fulltext listeners."""
+
+import unittest
+
+from ggrc.fulltext import listeners
+
+
+# pylint: disable=protected-access
+class TestReindexSet(unittest.TestCase):
+  """Tests for merging changed attributes in ReindexSet."""
+
+  def setUp(self):
+    self.reindex_set = listeners.ReindexSet()
+
+  def test_merge_changed_attrs(self):
+    """Changed attributes of the same object are merged."""
+    self.reindex_set._mark("Control", 1, {"title"})
+    self.reindex_set._mark("Control", 1, {"status"})
+    self.assertEqual(self.reindex_set.model_ids_to_reindex["Control"], {1})
+    self.assertEqual(self.reindex_set.model_attrs_to_reindex["Control"],
+                     {1: {"title", "status"}})
+
+  def test_complete_reindex_wins(self):
+    """Complete reindex is not reduced to partial one."""
+    self.reindex_set._mark("Control", 1, None)
+    self.reindex_set._mark("Control", 1, {"title"})
+    self.reindex_set._mark("Control", 2, {"title"})
+    self.reindex_set._mark("Control", 2, None)
+    self.assertEqual(self.reindex_set.model_ids_to_reindex["Control"], {1, 2})
+    self.assertEqual(self.reindex_set.model_attrs_to_reindex["Control"], {})
+
+  def test_add_merges_pool(self):
+    """Attributes added for the same item are merged in pool."""
+    item = object()
+    self.reindex_set.add(item, ["title"])
+    self.reindex_set.add(item, ["status"])
+    self.assertEqual(self.reindex_set._pool[item], {"title", "status"})
+    self.reindex_set.add(item)
+    self.assertIsNone(self.reindex_set._pool[item])
+
+  def test_group_ids_by_attrs(self):
+    """Ids are grouped by changed attributes."""
+    groups = listeners._group_ids_by_attrs(
+        [1, 2, 3], {1: {"title"}, 2: {"title"}})
+    self.assertEqual(dict(groups), {
+        frozenset(["title"]): [1, 2],
+        None: [3],
+    })
@@ -0,0 +1,55 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for fulltext Indexed mixin helpers."""
+
+import unittest
+
+from ggrc.fulltext import mixin
+
+
+def _record(prop, content, subproperty=u""):
+  return {
+      "key": 1,
+      "type": "Control",
+      "tags": "",
+      "property": prop,
+      "subproperty": subproperty,
+      "content": content,
+  }
+
+
+class TestDiffRecords(unittest.TestCase):
+  """Tests for diff_records function."""
+
+  def test_no_changes(self):
+    """Nothing is written for unchanged records."""
+    records = [_record("title", u"a"), _record("slug", u"C-1")]
+    self.assertEqual(mixin.diff_records(records, list(records)),
+                     ([], [], []))
+
+  def test_changed_content(self):
+    """Records with changed content are updated."""
+    to_insert, to_update, to_delete = mixin.diff_records(
+        [_record("title", u"a"), _record("slug", u"C-1")],
+        [_record("title", u"b"), _record("slug", u"C-1")],
+    )
+    self.assertEqual(to_insert, [])
+    self.assertEqual(to_update, [_record("title", u"b")])
+    self.assertEqual(to_delete, [])
+
+  def test_new_and_obsolete(self):
+    """New records are inserted and obsolete ones deleted."""
+    to_insert, to_update, to_delete = mixin.diff_records(
+        [_record("owner", u"a@example.com", u"1-email")],
+        [_record("owner", u"b@example.com", u"2-email")],
+    )
+    self.assertEqual(to_insert, [_record("owner", u"b@example.com",
+                                         u"2-email")])
+    self.assertEqual(to_update, [])
+    self.assertEqual(to_delete, [{
+        "key": 1,
+        "type": "Control",
+        "property": "owner",
+        "subproperty": u"1-email",
+    }])
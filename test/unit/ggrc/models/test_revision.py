@@ -378,3 +378,21 @@ class TestCheckPopulatedContent(unittest.TestCase):
 
         for acl in revision.content["access_control_list"]:
           self.assertIsNone(acl.get("parent_id"))
+
+  def test_content_memoized(self):
+    """Test populated content is memoized until content is replaced."""
+    obj = mock.Mock()
+    obj.id = self.object_id
+    obj.__class__.__name__ = "Control"
+    revision = all_models.Revision(obj, mock.Mock(), mock.Mock(),
+                                   {"title": "first"})
+    with mock.patch.object(all_models.Revision, "_populate_content",
+                           side_effect=lambda: {"title": "populated"}) as pop:
+      self.assertEqual(revision.content, {"title": "populated"})
+      revision.content["title"] = "changed"
+      self.assertEqual(revision.content, {"title": "populated"})
+      self.assertEqual(pop.call_count, 1)
+
+      revision.content = {"title": "second"}
+      self.assertEqual(revision.content, {"title": "populated"})
+      self.assertEqual(pop.call_count, 2)
@@ -0,0 +1,43 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unittests for custom ORM data types."""
+
+import json
+import unittest
+
+from ggrc import app  # noqa - this is needed for imports to work
+from ggrc.models import types
+
+
+class TestCompressedJsonType(unittest.TestCase):
+  """Tests for storage of Json values with compression."""
+
+  def setUp(self):
+    super(TestCompressedJsonType, self).setUp()
+    self.type_ = types.CompressedJsonType()
+
+  def _round_trip(self, value):
+    """Store and load value, return the stored and the loaded values."""
+    stored = self.type_.process_bind_param(value, None)
+    return stored, self.type_.process_result_value(stored, None)
+
+  def test_long_value_compressed(self):
+    """Long values are stored compressed."""
+    value = {"title": u"\u0442\u0435\u043a\u0441\u0442" * 100}
+    stored, loaded = self._round_trip(value)
+    self.assertTrue(types.CompressedJsonType.is_compressed(stored))
+    self.assertLess(len(stored), len(json.dumps(value)))
+    self.assertEqual(loaded, value)
+
+  def test_short_value_not_compressed(self):
+    """Short values are stored as plain Json."""
+    stored, loaded = self._round_trip({"title": "short"})
+    self.assertFalse(types.CompressedJsonType.is_compressed(stored))
+    self.assertEqual(loaded, {"title": "short"})
+
+  def test_uncompressed_value_loaded(self):
+    """Values stored before compression are loaded."""
+    stored = json.dumps({"title": "x" * 1000})
+    self.assertEqual(self.type_.process_result_value(stored, None),
+                     {"title": "x" * 1000})
@@ -6,6 +6,7 @@
 import unittest
 
 import ddt
+import mock
 
 from ggrc.query import pagination
 
@@ -27,3 +28,18 @@ class TestPaginationHelper(unittest.TestCase):
     init_sorting = [{"name": "id", "desc": True}]
     order_by = pagination.get_sorting_by_id(init_sorting)
     self.assertEqual([], order_by)
+
+  @ddt.data(
+      ("mysql", (5, 6, 36), pagination.FOUND_ROWS_STRATEGY),
+      ("mysql", (8, 0, 16), pagination.WINDOW_STRATEGY),
+      ("postgresql", (9, 6), pagination.WINDOW_STRATEGY),
+  )
+  @ddt.unpack
+  def test_total_count_strategy(self, name, version, expected):
+    """Total count strategy is chosen by DB backend"""
+    # pylint: disable=protected-access
+    with mock.patch("ggrc.query.pagination.db") as db_mock:
+      dialect = db_mock.session.get_bind.return_value.dialect
+      dialect.name = name
+      dialect.server_version_info = version
+      self.assertEqual(pagination._get_total_count_strategy(), expected)
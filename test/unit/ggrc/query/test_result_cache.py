@@ -0,0 +1,47 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for query API results cache keys."""
+
+import unittest
+
+from ggrc.query import result_cache
+
+
+# pylint: disable=protected-access
+class TestResultCacheKeys(unittest.TestCase):
+  """Tests for query normalization and dependencies."""
+
+  def test_normalize_ids_order(self):
+    """Order of ids doesn't change normalized query."""
+    self.assertEqual(
+        result_cache._normalize({"expression": {"ids": [3, 1, 2]}}),
+        result_cache._normalize({"expression": {"ids": [1, 2, 3]}}),
+    )
+
+  def test_dependencies(self):
+    """Models referenced by expression are dependencies."""
+    dependencies = result_cache._get_dependencies({
+        "object_name": "Control",
+        "filters": {"expression": {
+            "left": {"object_name": "Program", "op": {"name": "relevant"},
+                     "ids": [1]},
+            "op": {"name": "AND"},
+            "right": {"left": "title", "op": {"name": "="}, "right": "a"},
+        }},
+    })
+    self.assertEqual(
+        dependencies,
+        sorted(("Control", "Program", result_cache.ALL_MODELS) +
+               result_cache.COMMON_DEPENDENCIES),
+    )
+
+  def test_previous_not_cached(self):
+    """Queries depending on other queries results are not cached."""
+    self.assertIsNone(result_cache._get_dependencies({
+        "object_name": "Control",
+        "filters": {"expression": {
+            "object_name": "__previous__", "op": {"name": "relevant"},
+            "ids": [0],
+        }},
+    }))
@@ -12,7 +12,9 @@ from ddt import ddt, data, unpack
 
 # pylint: disable=unused-import
 from ggrc import models  # NOQA
+from ggrc import cache
 from ggrc.app import app
+from ggrc.cache.memcache_stub import LocalMemcacheClient
 from ggrc.services import common
 from ggrc.utils import log_event
 from ggrc.utils.revisions_diff import builder as revisions_diff
@@ -158,3 +160,52 @@ class TestFilterResource(TestCase):
                                  depth=1,
                                  user_permissions=object())
     self.assertIsNone(res)
+
+
+class TestGetMatchedResources(TestCase):
+  """Tests for Resource.get_matched_resources cache merging"""
+
+  def setUp(self):
+    self.client = LocalMemcacheClient()
+    cache_manager = cache.CacheManager()
+    cache_manager.initialize(cache.MemCache(memcache_client=self.client))
+    self.resource = common.Resource.__new__(common.Resource)
+    self.resource._model = mock.Mock(__name__="Control")
+    self.request = mock.Mock()
+    patchers = [
+        mock.patch.object(common.Resource, "request", self.request),
+        mock.patch.object(common.Resource, "has_cache", return_value=True),
+        mock.patch.object(common.cache_utils, "get_cache_manager",
+                          return_value=cache_manager),
+        mock.patch.object(common.Resource, "get_resources_from_database",
+                          side_effect=self._from_database),
+    ]
+    for patcher in patchers:
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    self.database_matches = []
+
+  def _from_database(self, matches):
+    self.database_matches.extend(matches)
+    return {m: {"id": m[0], "selfLink": "/api/controls/%s" % m[0]}
+            for m in matches}
+
+  def test_partial_hit(self):
+    """Only matches missing in cache are loaded from database."""
+    matches = [(id_, "Control", None) for id_ in range(5)]
+    self.resource.get_matched_resources(matches[:2])
+    self.database_matches = []
+
+    cache_objs, database_objs = self.resource.get_matched_resources(matches)
+
+    self.assertEqual(sorted(cache_objs), matches[:2])
+    self.assertEqual(sorted(database_objs), matches[2:])
+    self.assertEqual(self.database_matches, matches[2:])
+    self.assertEqual(
+        common.cache_utils.get_cache_op(cache_objs, database_objs), "Partial")
+
+  def test_round_trips(self):
+    """Cache is queried and filled with one round trip each."""
+    matches = [(id_, "Control", None) for id_ in range(50)]
+    self.resource.get_matched_resources(matches)
+    self.assertEqual(self.client.rpc_count, 2)
@@ -0,0 +1,111 @@
+# Copyright (C) 2019 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for running functions in threads and processes."""
+
+import threading
+import time
+import unittest
+
+from ggrc.utils import concurrency
+
+
+def _square(value):
+  """Square the value in a worker process."""
+  return value * value
+
+
+def _slow_on_one(value):
+  """Return the value in a worker process, slowly for value 1."""
+  if value == 1:
+    time.sleep(2)
+  return value
+
+
+def _fail_on_three(value):
+  """Fail in a worker process for value 3."""
+  if value == 3:
+    raise ValueError("failed")
+  return value
+
+
+class TestMapInThreads(unittest.TestCase):
+  """Tests for map_in_threads function."""
+
+  def test_results_order(self):
+    """Results are returned in the order of items."""
+    def slow_square(value):
+      time.sleep(0.01 * (5 - value))
+      return value * value
+    self.assertEqual(concurrency.map_in_threads(slow_square, range(5), 3),
+                     [0, 1, 4, 9, 16])
+
+  def test_max_workers(self):
+    """No more than max_workers threads are used."""
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def track(_):
+      with lock:
+        running.append(1)
+        max_running.append(len(running))
+      time.sleep(0.01)
+      with lock:
+        running.pop()
+    concurrency.map_in_threads(track, range(10), 2)
+    self.assertLessEqual(max(max_running), 2)
+
+  def test_error_reraised(self):
+    """Exception raised in a thread is reraised."""
+    def fail(value):
+      if value == 3:
+        raise ValueError("failed")
+      return value
+    with self.assertRaises(ValueError):
+      concurrency.map_in_threads(fail, range(5), 2)
+
+
+class TestMapInProcesses(unittest.TestCase):
+  """Tests for map_in_processes function."""
+
+  def test_results_order(self):
+    """Results are returned in the order of items."""
+    self.assertEqual(concurrency.map_in_processes(_square, range(5), 3),
+                     [0, 1, 4, 9, 16])
+
+  def test_no_items(self):
+    """No worker processes are started for empty items."""
+    self.assertEqual(concurrency.map_in_processes(_square, [], 3), [])
+
+  def test_error_reraised(self):
+    """Exception raised in a worker process is reraised."""
+    with self.assertRaises(ValueError):
+      concurrency.map_in_processes(_fail_on_three, range(5), 2)
+
+
+class TestImapInProcesses(unittest.TestCase):
+  """Tests for imap_in_processes function."""
+
+  def test_results_order(self):
+    """Results are yielded in the order of items."""
+    self.assertEqual(
+        list(concurrency.imap_in_processes(_square, range(5), 3)),
+        [0, 1, 4, 9, 16])
+
+  def test_results_streamed(self):
+    """Ready results are yielded before all workers are finished."""
+    results = concurrency.imap_in_processes(_slow_on_one, range(2), 2)
+    started = time.time()
+    self.assertEqual(next(results), 0)
+    self.assertLess(time.time() - started, 1)
+    self.assertEqual(list(results), [1])
+
+  def test_no_items(self):
+    """No worker processes are started for empty items."""
+    self.assertEqual(list(concurrency.imap_in_processes(_square, [], 3)), [])
+
+  def test_error_reraised(self):
+    """Exception raised in a worker process is reraised."""
+    with self.assertRaises(ValueError):
+      list(concurrency.imap_in_processes(_fail_on_three, range(5), 2))